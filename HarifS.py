@@ -1,511 +1,74 @@
+import asyncio
 import streamlit as st
-import pandas as pd
-import re
-import random
 import time
+from collections import deque
 from pathlib import Path
 
+from harif.assets import resized_image
+from harif.editions import get_editions, warm_up_in_background
+from harif.engine import CSV_PATH, get_engine
+from harif.history import ChatHistory
+from harif.timing import summarize
+from harif.tracing import TRACER
+
 APP_DIR = Path(__file__).parent
-CSV_PATH = APP_DIR / "datasetFIFA.csv"          # put the CSV next to HarifS.py
 IMG_PATH = APP_DIR / "football-rb.png"          # put the image next to HarifS.py
-
-@st.cache_data
-def load_csv(p: Path):
-    for enc in ("utf-8", "cp1252"):
-        try:
-            return pd.read_csv(p, encoding=enc)
-        except Exception:
-            pass
-    raise FileNotFoundError(f"Could not read: {p}")
-
-# Load CSV
-if CSV_PATH.exists():
-    df = load_csv(CSV_PATH)
-else:
+LIVE_GOALS_PATH = APP_DIR / "live_goals.jsonl"  # append-only goal events, read while the app runs
+
+LATENCY_WINDOW = 500           # answer_QA timings kept per session for the debug panel
+HISTORY_WINDOW = 20            # turns rendered per page of the chat; older ones on request
+HISTORY_KEEP = 200             # turns kept in memory per session, the rest spill to disk
+ANSWER_BUDGET = 1.5            # seconds; a source slower than its timeout is skipped (harif.async_cascade)
+
+# The engine (QA, stats, goals table and their indexes) is built once per process;
+# other World Cup editions next to the knowledge file get one engine each. Nothing
+# heavy is loaded here: pandas, the goals table and the indexes come with the first
+# question that needs them, or from the warm-up started after the first render
+engine = get_engine()
+editions = get_editions()
+if not CSV_PATH.exists():
     st.error(f"❌ CSV not found at: {CSV_PATH}")
     st.stop()
 
-# Sidebar image
+# Goals appended to the live file show up in answers within a second (one tailer per process)
+if LIVE_GOALS_PATH.exists():
+    engine.follow(LIVE_GOALS_PATH)
+
+# Sidebar image, from a copy resized once to the sidebar's width (harif.assets)
 if IMG_PATH.exists():
-    st.sidebar.image(str(IMG_PATH), use_container_width=True)
+    st.sidebar.image(resized_image(IMG_PATH), use_container_width=True)
 else:
     st.sidebar.warning(f"⚠️ Image not found at: {IMG_PATH}")
 
-WC_2022_STATS = {
-    "total matches": 64,
-    "total goals": 172,
-    "teams count": 32,
-    "host country": "Qatar",
-    "duration days": 29,
-    "stadiums count": 8,
-    "champion": "Argentina",
-    "runner up": "France",
-    "third place": "Croatia",
-    "fourth place": "Morocco",
-    "top scorers": {
-        "kylian mbappé": 8,
-        "lionel messi": 7,
-        "julián álvarez": 4,
-        "olivier giroud": 4,
-        "cody gakpo": 3,
-        "marcus rashford": 3,
-        "richarlison": 3,
-        "bukayo saka": 3,
-        "álvaro morata": 3,
-        "gonçalo ramos": 3,
-        "enner valencia": 3
-    },
-    "individual awards": {
-        "golden ball": "Lionel Messi",
-        "golden glove": "Emiliano Martínez",
-        "best young player": "Enzo Fernández"
-    },
-    "opening match": {
-        "teams": ("Qatar", "Ecuador"),
-        "result": "0-2",
-        "scorer highlight": "Enner Valencia scored twice"
-    },
-    "final match": {
-        "teams": ("Argentina", "France"),
-        "score": "3-3",
-        "result": "Argentina won on penalties"
-    },
-    "matches count external": {
-        "argentina": 7,
-        "france": 7,
-        "croatia": 7,
-        "morocco": 7,
-        "brazil": 5,
-        "england": 5,
-        "netherlands": 5,
-        "portugal": 5,
-        "japan": 4,
-        "south korea": 4,
-        "switzerland": 4,
-        "usa": 4,
-        "germany": 3,
-        "poland": 3,
-        "serbia": 3,
-        "senegal": 3,
-        "cameroon": 3,
-        "ecuador": 3,
-        "tunisia": 3,
-        "canada": 3,
-        "mexico": 3,
-        "ghana": 3,
-        "wales": 3,
-        "iran": 3,
-        "saudi arabia": 3,
-        "australia": 3,
-        "costarica": 3,
-        "qatar": 3,
-        "belgium": 3,
-        "uruguay": 3,
-        "denmark": 3
-    }
-}
-WC_2022_QA = {
-    # 🏆 General Information
-    "location": "Qatar, the first Arab country to host the tournament",
-    "dates": "November 20 to December 18, 2022",
-    "teams count": 32,
-    "matches count": 64,
-    "stadiums count": "8 stadiums, all in Qatar",
-    "first match": "Qatar vs Ecuador (2-0 for Ecuador)",
-    "champion": "Argentina",
-    "runner up": "France",
-    "third place": "Croatia",
-    "argentina wins": "3 times: 1978, 1986, and 2022",
-    
-    # 👑 Individual Awards
-    "golden ball": "Lionel Messi (Argentina)",
-    "golden boot": "Kylian Mbappé (France) - 8 goals",
-    "golden glove": "Emiliano Martínez (Argentina)",
-    "best young player": "Enzo Fernández (Argentina)",
-    "fair play": "England national team",
-    
-    # ⚽️ Matches and Results
-    "total goals": "172 goals - record number",
-    "highest scoring match": "France 4-3 Argentina (Final after extra time, Argentina won 4-2 on penalties)",
-    "first goal": "Enner Valencia (Ecuador)",
-    "last goal": "Kylian Mbappé in the final (hat-trick)",
-    "penalty shootouts": "5 matches decided by penalty shootouts",
-    
-    # 🌍 Teams and Groups
-    "groups count": "8 groups (A to H)",
-    "arab knockout": "Morocco",
-    "first arab semifinal": "Morocco",
-    "arab teams count": "4 teams: Qatar, Saudi Arabia, Tunisia, Morocco",
-    "surprise team": "Morocco national team",
-    
-    # 🇸🇦 Arab Teams
-    "saudi argentina": "Saudi Arabia (2-1)",
-    "morocco achievement": "Fourth place, after losing to France and Croatia",
-    "tunisia group": "Eliminated in group stage despite beating France",
-    "qatar wins": "No, eliminated from group stage without any wins",
-    "tunisia goal": "Wahbi Khazri",
-    
-    # 🧠 Key Details
-    "argentina coach": "Lionel Scaloni",
-    "france coach": "Didier Deschamps",
-    "messi goals": 7,
-    "mbappe goals": 8,
-    "argentina goals final": ["Lionel Messi (2 goals)", "Ángel Di María"],
-    "france goals final": ["Kylian Mbappé (hat-trick)"],
-    "penalty shootout final": "4-2 for Argentina",
-    "first penalty final since 2006": True,
-    "final referee": "Szymon Marciniak (Poland)",
-    "teams beat champ runner": ["Saudi Arabia (beat Argentina)", "Tunisia (beat France)"],
-    
-    # 🎉 Notable Events
-    "oldest player": "Milan Borjan (Canada) - born 1987",
-    "youngest scorer": "Jude Bellingham (England) - 19 years old",
-    "semi automated offside": "Yes, for the first time",
-    "var used": "Yes",
-    "highest scoring team": "France - 16 goals",
-    "messi last world cup": "He said it was his last, but didn't officially retire after the tournament",
-    "argentina penalties": "Twice: against Netherlands in quarterfinals and against France in final",
-    "morocco spain": "0-0 draw, Morocco won 3-0 on penalties",
-    "super hattrick": "No, highest was hat-trick (Mbappé)",
-    "messi scored every round": "Yes, scored in group stage, round of 16, quarterfinals, semifinals, and final",
-    
-    # ⚽️ Teams and Matches (51-75)
-    "argentina croatia": "Argentina 3-0",
-    "croatia brazil scorers": "Neymar (Brazil) and Bruno Petković (Croatia)",
-    "croatia brazil result": "4-2 on penalties after 1-1 draw",
-    "morocco france": "France won 2-0",
-    "france final appearances": "Twice (2018, 2022)",
-    "england win": "No, eliminated in quarterfinals against France",
-    "portugal switzerland": "Gonçalo Ramos (hat-trick)",
-    "ronaldo switzerland": "No, he was on the bench",
-    "germany group stage": "No, eliminated on goal difference",
-    "group of death qualified": "Japan and Spain",
-    "japan spain goal": "Ao Tanaka",
-    "japan goal technology": "No, video technology showed the ball partially remained in play",
-    "group stage surprise": "Japan",
-    "saudi argentina first goal": "Saleh Al Shehri",
-    "saudi argentina winning goal": "Salem Al Dawsari",
-    "morocco wins": "3 wins in regulation time + 2 penalty shootout wins",
-    "morocco belgium scorers": "Abdelhamid Sabiri and Zakaria Aboukhlal",
-    "tunisia australia": "Australia won 1-0",
-    "qatar senegal": "Senegal won 3-1",
-    "african beat european": "Yes, like Morocco against Belgium and Spain",
-    "senegal wins": "Twice (against Qatar and Ecuador)",
-    "morocco top scorer": "Youssef En-Nesyri (2 goals)",
-    "morocco portugal goal": "Youssef En-Nesyri",
-    "brazil penalties": "Yes, against Croatia",
-    "mbappe goals every round": "No, didn't score in semifinals",
-    
-    # 📊 Stats and Records (76-100)
-    "messi goals": 7,
-    "messi assists": 3,
-    "most assists": "Antoine Griezmann (France) - 3 assists",
-    "red cards": "Only 4 red cards",
-    "first red card": "Goalkeeper Wayne Hennessey (Wales)",
-    "penalties awarded": 23,
-    "fastest goal": "Alphonso Davies (Canada) vs Croatia - 2nd minute",
-    "thousandth goal": "Marcus Rashford (England)",
-    "most goals conceded": "Costa Rica (11 goals)",
-    "least goals conceded": "Morocco (only 1 goal conceded until semifinals)",
-    "most goals scored": "France (16 goals)",
-    "highest scoring group match": "England 6-2 Iran",
-    "most draws": "United States (3 draws)",
-    "best penalty saver": "Emiliano Martínez (Argentina)",
-    "total goals record": "172 goals - broke 1998 and 2014 record (171 goals)",
-    "highest possession": "Spain - 76% in some matches",
-    "total attendance": "Over 3.4 million spectators",
-    "average attendance": "Approximately 53,000 spectators per match",
-    "highest attendance match": "Argentina vs Mexico - 88,966 spectators",
-    "most minutes played": "Nikola Vlašić (Croatia) - over 720 minutes",
-    "most world cup appearances player": "Lionel Messi - 26 World Cup matches",
-    "players 5 world cups": "Messi, Ronaldo, goalkeeper Guillermo Ochoa, and others",
-    "most goals by substitutes": "Portugal (4 goals by substitutes in one match)",
-    "most penalty goals conceded": "Poland (against France and Argentina)",
-    
-    # 🧠 Additional Stats and Events (101-125)
-    "only hattrick final": "Kylian Mbappé (France)",
-    "other hattrick": "Gonçalo Ramos (Portugal vs Switzerland)",
-    "biggest win": "England 6-2 Iran",
-    "best defence until semifinal": "Morocco (conceded only 1 goal which was an own goal)",
-    "own goal vs morocco": "Nayef Aguerd (against Canada)",
-    "argentina matches": 7,
-    "argentina goals": 15,
-    "argentina penalties converted": "4 (3 scored by Messi)",
-    "most penalty shootout wins": "Argentina - twice",
-    "france vs african": "Yes, against Tunisia in group stage, lost 1-0",
-    "ronaldo goal": "Yes, scored a penalty against Ghana",
-    "most chances created": "France",
-    "most shots": "Mbappé",
-    "france goals": 16,
-    "di maria final": "Yes, scored Argentina's second goal",
-    "croatia third place goal": "Joško Gvardiol",
-    "argentina losses": "Once (against Saudi Arabia)",
-    "japan germany": "Japan won 2-1",
-    "japan goals scorers": "Ritsu Dōan and Takuma Asano",
-    "germany goal": "İlkay Gündoğan",
-    "canada goal": "Alphonso Davies",
-    "qatar points": "Zero - lost all matches",
-    "most passes": "Rodri (Spain)",
-    "croatia coach": "Zlatko Dalić",
-    "croatia semifinals": "3 times (1998, 2018, 2022)",
-    
-    # 🏟️ Stadiums and Organization (126-150)
-    "stadiums used": 8,
-    "stadiums names": ["Lusail", "Al Bayt", "974", "Al Thumama", "Al Janoub", "Education City", "Ahmad bin Ali", "Khalifa International"],
-    "final venue": "Lusail Stadium",
-    "lusail capacity": "88,966 spectators",
-    "semi automated offside used": "Yes",
-    "smart ball tech": "Ball with internal sensor to precisely detect touch time",
-    "final referee": "Szymon Marciniak (Poland)",
-    "female referee": "Yes, like Stéphanie Frappart (first woman to referee men's World Cup match)",
-    "referees count": "36 referees, 69 assistant referees, 24 VAR officials",
-    "winter world cup": "Yes, in November/December instead of June/July",
-    "last 32 teams": "Yes, 2026 will have 48 teams",
-    "stadium 974 built": "Yes, from shipping containers - first temporary demountable stadium",
-    "stoppage time goals": "Many goals - long stoppage time added in most matches",
-    "official ball name": "Al Rihla by Adidas",
-    "mascot name": "La'eeb",
-    "official songs": ["Hayya Hayya (Better Together)", "Arhbo"],
-    "global artists": "Yes, like Jungkook from BTS",
-    "france wins": "Twice (1998, 2018)",
-    "france final losses": "Twice (2006, 2022)",
-    "morocco coach": "Walid Regragui",
-    "morocco coach first": "Yes, appointed months before tournament",
-    "controversial refereeing": "Yes, notably in Portugal vs Morocco match",
-    "belgium group stage exit": "Yes",
-    "croatia third place goals": ["Joško Gvardiol", "Mislav Oršić"],
-    "asian beat european": "Yes: Japan beat Germany and Spain, Saudi Arabia beat Argentina"
-}
-
-FOLLOW_UP_QUESTIONS = {
-    'goal': [
-        "What's your favorite goal celebration from the tournament?",
-        "Which player do you think scored the most beautiful goal?",
-        "Do you remember any crucial late goals that changed matches?",
-        "Which goal do you think was the most important of the tournament?"
-    ],
-    'result': [
-        "What was the most surprising result for you?",
-        "Which underdog performance impressed you the most?",
-        "Do you think any team exceeded expectations?",
-        "Which comeback victory was the most dramatic?"
-    ],
-    'tournament': [
-        "What was your favorite moment of the World Cup?",
-        "Which young player impressed you the most?",
-        "How do you think the next World Cup will compare?",
-        "Which team had the best tournament strategy?"
-    ],
-    'player': [
-        "Who would you pick as player of the tournament?",
-        "Which emerging star surprised you the most?",
-        "Do you think any player deserved more recognition?",
-        "Which player's performance was the most underrated?"
-    ],
-    'team': [
-        "Which team had the best attacking play?",
-        "What surprised you most about team performances?",
-        "How do you rate the underdog teams' performances?",
-        "Which team's defensive organization impressed you?"
-    ],
-    'general': [
-        "What's your most memorable World Cup moment?",
-        "Which stadium had the best atmosphere in your opinion?",
-        "How do you think VAR affected the tournament?",
-        "What was the biggest lesson from this World Cup?"
-    ],
-    
-    "golden boot": [
-        "Do you want to know how many goals Mbappé scored?",
-        "Interested in who was second in the scoring chart?"
-    ],
-    "golden ball": [
-        "Want to know Messi's stats during the tournament?",
-        "Would you like details on his goals and assists?"
-    ],
-    "total goals": [
-        "Do you want to know the average goals per match?",
-        "Curious which match had the most goals?"
-    ],
-    "host country": [
-        "Want to learn about Qatar's preparations?",
-        "Interested in stadiums used during the event?"
-    ],
-    "champion": [
-        "Want to know how Argentina reached the final?",
-        "Interested in the final match scoreline?"
-    ]
-}
-
-RESPONSES = {
-    "golden boot": [
-        "Mbappé secured the Golden Boot in Qatar 2022.",
-        "Top scorer of 2022? It was Kylian Mbappé!"
-    ],
-    "golden ball": [
-        "Messi was awarded the Golden Ball for his outstanding performance.",
-        "No surprise – Messi was the best player in the tournament."
-    ],
-    "total goals": [
-        "172 goals were netted during the tournament – a new record!",
-        "The 2022 edition saw the highest goal tally ever: 172."
-    ],
-    "host country": [
-        "Qatar made history as the first Arab country to host the World Cup.",
-        "The desert heat? Yep – Qatar hosted the 2022 tournament."
-    ],
-    "champion": [
-        "Argentina lifted the trophy after a dramatic final.",
-        "La Albiceleste won their third World Cup title in 2022."
-    ]
-}
-
 #___________________________________________________________________________
-def clean_text(text):
-    return text.lower().strip()
-
-def extract_keywords(user_input: str):
-    words = user_input.lower().replace("?", "").split()
-    stop_words = {"is", "the", "what", "who", "when", "where", "how", "and", "or", "of", "a", "an", "in", "to", "for"}
-    keywords = [w for w in words if w not in stop_words and len(w) > 2]
-    return keywords
-
-def search_in_qa(keywords, qa_data):
-    # بحث دقيق: المفاتيح التي تحتوي كل الكلمات المفتاحية
-    for key, answer in qa_data.items():
-        key_lower = key.lower()
-        if all(kw in key_lower for kw in keywords):
-            return answer
-
-    # بحث أقل دقة: المفاتيح التي تحتوي أي كلمة مفتاحية، لكن تحقق أقصى تطابق
-    best_match = None
-    best_match_count = 0
-    for key, answer in qa_data.items():
-        key_lower = key.lower()
-        count = sum(1 for kw in keywords if kw in key_lower)
-        if count > best_match_count:
-            best_match = answer
-            best_match_count = count
-
-    if best_match_count > 0:
-        return best_match
-
-    return None
-
-
-def search_in_stats(keywords, stats_data):
-    for key, val in stats_data.items():
-        if isinstance(val, dict):
-            for subkey, subval in val.items():
-                if any(kw in subkey.lower() for kw in keywords):
-                    return f"{subkey.title()}: {subval}"
-        else:
-            if any(kw in key.lower() for kw in keywords):
-                return f"{key.replace('_', ' ').title()}: {val}"
-    return None
-
-
-def search_in_dataset(keywords, df):
-    df_combined = df.astype(str).apply(lambda row: ' '.join(row.values).lower(), axis=1)
-    for i, row in enumerate(df_combined):
-        if all(kw in row for kw in keywords):
-            return df.iloc[i].to_dict()
-    return None
-
-def is_english(text: str) -> bool:
-    # If it contains Arabic script, treat as non-English
-    if re.search(r'[\u0600-\u06FF]', text):
-        return False
-    # Otherwise, consider it English if it has any Latin letters
-    return bool(re.search(r'[A-Za-z]', text))
-
-def is_external_topic(keywords):
-    external_keywords = {"basketball", "tennis", "politics", "music", "movie", "weather", "news", "technology", "stock", "economy"}
-    return any(kw in external_keywords for kw in keywords)
-
-def random_choice(choices):
-    return random.choice(choices) if choices else None
-
-def get_follow_up(keywords):
-    for kw in keywords:
-        if kw in FOLLOW_UP_QUESTIONS:
-            return random_choice(FOLLOW_UP_QUESTIONS[kw])
-    return random_choice(FOLLOW_UP_QUESTIONS.get('general', []))
-
-def get_random_response(keywords):
-    for kw in keywords:
-        if kw in RESPONSES:
-            return random_choice(RESPONSES[kw])
-    return None
-
-def eliza_reply(user_input):
-    msg = user_input.lower()
-
-    if "hello" in msg or "hi" in msg:
-        return "Hi there! How are you feeling today?"
-
-    elif "how are you" in msg:
-        return "I'm fine, What was your favorite moment of the World Cup?"
-        
-    elif "fine":
-        return "I'm fine too, What was your favorite moment of the World Cup?"
-
-    elif "your name":
-        return "I'm harif, What was your favorite moment of the World Cup?"
-        
-    elif "sad" in msg:
-        return "I'm sorry you're feeling sad. Want to talk about it?"
-
-    elif "mission" in msg or "your mission" in msg or "what is your mission" in msg:
-        return "My mission is to help you explore and learn about the FIFA World Cup 2022 — teams, matches, players, and moments!"
-
-    elif "bye" in msg or "exit" in msg:
-        return "Goodbye! 👋 Take care."
-        
-
-    elif "thank" in msg:
-        return "You're welcome!"
 
+def render_debug_panel(latencies, cache_stats):
+    stats = summarize(list(latencies))
+    st.subheader("🛠️ Debug")
+    if not stats["count"]:
+        st.caption("No answers timed yet.")
     else:
-        return "Tell me more about that..."
-
-def answer_QA(user_input, qa_data, stats_data, df):
-    # ✅ 1) Greeting fast-path → ELIZA first
-    low = user_input.strip().lower()
-    greeting_words = {"hi", "hello", "hey","thanks", "thank you", "bye", "goodbye","how are you","Mission","fine","your name"}
-    # match whole words or phrases
-    if any(g in low.split() for g in {"hi", "hello", "hey", "yo"}) or any(p in low for p in greeting_words):
-        return eliza_reply(user_input), None
-
-    # ✅ 2) Your original flow
-    keywords = extract_keywords(user_input)
-    if not keywords:
-        return ("Please enter more specific keywords.", get_follow_up(['general']))
-
-    if not is_english(user_input):
-        return ("Sorry, I only understand English and can respond only in English.", None)
-
-    if is_external_topic(keywords):
-        return ("That's an interesting topic! But I'm really an expert on the FIFA World Cup 2022. "
-                "What would you like to know about the tournament?", None)
-
-    answer = search_in_qa(keywords, qa_data)
-    if not answer:
-        answer = search_in_stats(keywords, stats_data)
-    if not answer:
-        answer = get_random_response(keywords)
-    if not answer:
-        answer = search_in_dataset(keywords, df)
-        if answer:
-            answer = "\n".join(f"{key}: {val}" for key, val in answer.items())
-
-    if not answer:
-        answer = eliza_reply(user_input)
-        follow_up = None
-    else:
-        follow_up = get_follow_up(keywords)
-
-    return answer, follow_up
+        st.caption(f"answer_QA wall time over the last {stats['count']} answers")
+        c1, c2, c3 = st.columns(3)
+        c1.metric("last", f"{stats['last_ms']:.1f} ms")
+        c2.metric("p50", f"{stats['p50_ms']:.1f} ms")
+        c3.metric("p95", f"{stats['p95_ms']:.1f} ms")
+
+    st.caption(f"Response cache (shared by all sessions): {cache_stats['size']}/{cache_stats['maxsize']} entries")
+    c1, c2, c3 = st.columns(3)
+    c1.metric("hits", cache_stats["hits"])
+    c2.metric("misses", cache_stats["misses"])
+    c3.metric("hit rate", f"{cache_stats['hit_rate']:.0%}")
+
+    # per-stage means, only when tracing is on (HARIF_TRACE=1)
+    if TRACER.tracing:
+        stages = TRACER.snapshot()["stages"]
+        if stages:
+            st.caption("Mean time per cascade stage (all sessions)")
+            st.table({name: f"{s['mean_ms']:.3f} ms × {s['count']}" for name, s in stages.items()})
+
+def show_history_page(page):
+    st.session_state.history_page = page
 
 def render_team():
     st.title("👥 Our Team — فريقنا")
@@ -532,6 +95,8 @@ st.sidebar.info(
     f"Simply chat with it and provide details about the World Cup 2022 — teams, winners, players or history!. "
 )
 menu = st.sidebar.radio("Navigate", ["Chat", "Team"])  # NEW
+show_debug = st.sidebar.toggle("Debug panel", value=False)
+debug_panel = st.sidebar.empty()  # filled at the end, after this run's answer is timed
 st.markdown("""
 <style>
 html, body, [data-testid="stAppViewContainer"] {
@@ -570,25 +135,43 @@ if menu == "Team":
     """)
 else:
     if "messages" not in st.session_state:
-        st.session_state.messages = [
+        st.session_state.messages = ChatHistory(window=HISTORY_WINDOW, keep=HISTORY_KEEP)
+        st.session_state.messages.append(
             {"role": "assistant", "content": "Hello! ⚽️ Ask me anything about the World Cup — teams, winners, players or history!"}
-        ]
-    
-    # عرض المحادثة السابقة
-    for msg in st.session_state.messages:
+        )
+    if "latencies" not in st.session_state:
+        st.session_state.latencies = deque(maxlen=LATENCY_WINDOW)
+    if "history_page" not in st.session_state:
+        st.session_state.history_page = 0
+    history = st.session_state.messages
+    # read first: a new message brings the chat back to the latest page
+    user_input = st.chat_input("Type your message...")
+    if user_input:
+        st.session_state.history_page = 0
+
+    # عرض المحادثة السابقة (آخر HISTORY_WINDOW جولة فقط، والأقدم عند الطلب)
+    page = min(st.session_state.history_page, history.pages - 1)
+    if history.pages > 1:
+        # callbacks run before the rerun, so the buttons below already see the new page
+        c1, c2, c3 = st.columns([1, 2, 1])
+        c1.button("⬆️ Earlier", disabled=page >= history.pages - 1, on_click=show_history_page, args=(page + 1,))
+        c3.button("⬇️ Latest", disabled=page == 0, on_click=show_history_page, args=(0,))
+        c2.caption(f"Page {page + 1} of {history.pages} ({history.turns} turns)")
+    for msg in history.page(page):
         with st.chat_message(msg["role"]):
             st.markdown(msg["content"])
     
     # إدخال المستخدم وجلب الرد
-    if user_input := st.chat_input("Type your message..."):
+    if user_input:
     
         st.session_state.messages.append({"role": "user", "content": user_input})
         with st.chat_message("user"):
             st.markdown(user_input)
     
         with st.spinner("Thinking... ⚽"):
-            time.sleep(2)
-            answer, follow_up = answer_QA(user_input, WC_2022_QA, WC_2022_STATS, df)
+            start = time.perf_counter()
+            answer, follow_up = asyncio.run(editions.answer_async(user_input, budget=ANSWER_BUDGET))
+            st.session_state.latencies.append(time.perf_counter() - start)
     
         st.session_state.messages.append({"role": "assistant", "content": answer})
         with st.chat_message("assistant"):
@@ -598,3 +181,10 @@ else:
             st.session_state.messages.append({"role": "assistant", "content": follow_up})
             with st.chat_message("assistant"):
                 st.markdown(follow_up)
+
+    if show_debug:
+        with debug_panel.container():
+            render_debug_panel(st.session_state.latencies, engine.cache.stats())
+
+# the page is on screen: build the indexes now, off the script thread (once per process)
+warm_up_in_background()
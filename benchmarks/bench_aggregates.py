@@ -0,0 +1,94 @@
+# GoalAggregates vs filtering the whole goals table per question, scaled to millions of rows.
+#
+#   python benchmarks/bench_aggregates.py
+#   python benchmarks/bench_aggregates.py --rows 100000 1000000 5000000
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from harif.aggregates import GoalAggregates
+from harif.dataset import read_csv
+
+QUESTIONS = [
+    "How many goals did Morocco score?",
+    "How many goals did Argentina concede?",
+    "How many goals were scored in group C?",
+    "How many goals were scored at Lusail Stadium?",
+    "Who scored after the 85th minute?",
+    "Which goals came before the 10th minute?",
+]
+
+
+def scale(df, rows, seed=2022):
+    # repeat the real table with fresh minutes and match numbers, so counts grow like a real archive would
+    copies = -(-rows // len(df))
+    big = pd.concat([df] * copies, ignore_index=True).head(rows)
+    rng = np.random.default_rng(seed)
+    big["Minute"] = rng.integers(1, 91, len(big))
+    big["Match Number"] = big["Match Number"] + 100 * (big.index // len(df))
+    return big
+
+
+def scan_counts(df):
+    # the same numbers, computed by filtering every row for each question
+    return [
+        int((df["Team"] == "Morocco").sum()),
+        int((df["Opponent"] == "Argentina").sum()),
+        int((df["Group"] == "C").sum()),
+        int((df["Stadium"] == "Lusail Iconic Stadium, Lusail").sum()),
+        int((df["Minute"] > 85).sum()),
+        int((df["Minute"] < 10).sum()),
+    ]
+
+
+def index_counts(agg):
+    return [
+        agg.team_goals.get("Morocco", 0),
+        agg.team_conceded.get("Argentina", 0),
+        agg.group_goals.get("C", 0),
+        agg.stadium_goals.get("Lusail Iconic Stadium, Lusail", 0),
+        int(len(agg.minute_index[0]) - np.searchsorted(agg.minute_index[0], 85, side="right")),
+        int(np.searchsorted(agg.minute_index[0], 10, side="left")),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 1_000_000, 3_000_000])
+    parser.add_argument("--csv", default=str(ROOT / "datasetFIFA.csv"))
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    base = read_csv(args.csv)
+    print(f"{'rows':>10} {'build ms':>9} {'scan ms/q':>10} {'answer us/q':>12} {'speedup':>9}")
+    for rows in args.rows:
+        df = scale(base, rows)
+
+        start = time.perf_counter()
+        agg = GoalAggregates(df)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        expected = scan_counts(df)
+        scan_t = (time.perf_counter() - start) / len(expected)
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for q in QUESTIONS:
+                agg.answer(q)
+        answer_t = (time.perf_counter() - start) / (args.repeat * len(QUESTIONS))
+
+        assert index_counts(agg) == expected, (index_counts(agg), expected)
+        print(f"{rows:>10} {build * 1e3:>9.0f} {scan_t * 1e3:>10.2f} {answer_t * 1e6:>12.1f} "
+              f"{scan_t / answer_t:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# Sync cascade vs the async one (harif.async_cascade): overhead on healthy
+# sources, then what a reply costs when a source hangs or fails.
+#
+#   python benchmarks/bench_async.py
+#   python benchmarks/bench_async.py --slow 3 --budget 0.8 --tasks 200
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from harif.async_cascade import default_sources, run_cascade_async
+from harif.engine import HarifEngine, run_cascade
+
+QUESTIONS = [
+    "who won the golden boot?",     # QA
+    "duration days",                # stats
+    "Gareth Bale United States",    # goals table
+    "xyzzy plugh",                  # nothing: ELIZA
+]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--tasks", type=int, default=100, help="questions in flight at once on one event loop")
+    parser.add_argument("--slow", type=float, default=2.0, help="seconds the hanging source takes")
+    parser.add_argument("--budget", type=float, default=0.5)
+    args = parser.parse_args()
+
+    engine = HarifEngine(cache_size=0).warm_up()
+    correct, aggregate = engine.correct_keywords, engine.answer_aggregate
+    timeouts = {"qa": 0.1, "stats": 0.1, "responses": 0.1, "dataset": 0.3}
+
+    def sources(qa=engine.search_qa, stats=engine.search_stats, dataset=engine.search_dataset):
+        return default_sources(qa, stats, dataset, timeouts)
+
+    async def answer_all(texts, srcs, concurrent):
+        if concurrent:
+            answers = []
+            for i in range(0, len(texts), args.tasks):
+                answers += await asyncio.gather(*(run_cascade_async(t, srcs, None, correct, aggregate, args.budget)
+                                                  for t in texts[i:i + args.tasks]))
+            return answers
+        return [await run_cascade_async(t, srcs, None, correct, aggregate, args.budget) for t in texts]
+
+    texts = QUESTIONS * args.repeat
+    start = time.perf_counter()
+    expected = [run_cascade(t, engine.search_qa, engine.search_stats, engine.search_dataset, None, correct, aggregate)
+                for t in texts]
+    sync_t = time.perf_counter() - start
+    start = time.perf_counter()
+    got = asyncio.run(answer_all(texts, sources(), False))
+    async_t = time.perf_counter() - start
+    start = time.perf_counter()
+    gathered = asyncio.run(answer_all(texts, sources(), True))
+    gather_t = time.perf_counter() - start
+    same = sum(a[0] == b[0] for a, b in zip(expected, got))
+    same_gathered = sum(a[0] == b[0] for a, b in zip(expected, gathered))
+    print(f"healthy sources, {len(texts)} answers (same answer as sync: {same}/{len(texts)})")
+    print(f"  sync cascade      {sync_t / len(texts) * 1e6:>8.1f} us/answer")
+    print(f"  async, one by one {async_t / len(texts) * 1e6:>8.1f} us/answer")
+    print(f"  async, {args.tasks} at once {gather_t / len(texts) * 1e6:>8.1f} us/answer "
+          f"(same answer: {same_gathered}/{len(texts)})")
+
+    def hanging(fn):
+        def slow(keywords):
+            time.sleep(args.slow)
+            return fn(keywords)
+        return slow
+
+    def failing(keywords):
+        raise RuntimeError("source down")
+
+    cases = [
+        ("goals table hangs", dict(dataset=hanging(engine.search_dataset))),
+        ("stats hangs", dict(stats=hanging(engine.search_stats))),
+        ("stats fails", dict(stats=failing)),
+    ]
+    print(f"\none source broken (timeouts {timeouts}, budget {args.budget * 1e3:.0f} ms, "
+          f"hanging source {args.slow:.1f} s):")
+    print(f"{'case':>18} {'question':>26} {'sync ms':>9} {'async ms':>9}  async answer")
+    for name, broken in cases:
+        merged = {"qa": engine.search_qa, "stats": engine.search_stats, "dataset": engine.search_dataset, **broken}
+        for text in QUESTIONS:
+            start = time.perf_counter()
+            try:
+                run_cascade(text, merged["qa"], merged["stats"], merged["dataset"], None, correct, aggregate)
+                sync_ms = f"{(time.perf_counter() - start) * 1e3:.0f}"
+            except RuntimeError:
+                sync_ms = "error"
+            start = time.perf_counter()
+            answer, _ = asyncio.run(run_cascade_async(text, sources(**broken), None, correct, aggregate, args.budget))
+            async_ms = (time.perf_counter() - start) * 1e3
+            print(f"{name:>18} {text:>26} {sync_ms:>9} {async_ms:>9.0f}  {answer.splitlines()[0][:40]}")
+
+
+if __name__ == "__main__":
+    main()
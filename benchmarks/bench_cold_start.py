@@ -0,0 +1,79 @@
+# Cold start of the Streamlit page: a fresh process runs HarifS.py once (time
+# to first render), then, after the user "types" for --pause seconds, gets a
+# greeting and a question that needs the goals table (time to first answer).
+#
+#   python benchmarks/bench_cold_start.py
+#   python benchmarks/bench_cold_start.py --runs 9 --pause 0 2
+#
+# Every run is a new interpreter, so imports, the knowledge base, the goals
+# table and its indexes all start cold, as in a new Streamlit process. Times
+# are medians over --runs; a chat answer is the whole rerun of the page.
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+GREETING = "hello"
+DATA_QUESTION = "Enner Valencia Qatar"    # needs the goals table: typo fixes and goal counts are built from it
+
+RUN = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+imported = time.perf_counter()
+at = AppTest.from_file({page!r}, default_timeout=120).run()
+rendered = time.perf_counter()
+time.sleep({pause})
+timings = {{"import_streamlit": imported - start, "first_render": rendered - imported}}
+for name, text in (("greeting", {greeting!r}), ("data_question", {data!r})):
+    t = time.perf_counter()
+    at.chat_input[0].set_value(text).run()
+    timings[name] = time.perf_counter() - t
+assert not at.exception, at.exception
+print(json.dumps(timings))
+"""
+
+
+def cold_run(pause):
+    # one fresh process; seconds per step
+    code = RUN.format(page=str(ROOT / "HarifS.py"), pause=pause, greeting=GREETING, data=DATA_QUESTION)
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def image_sizes():
+    # bytes of the sidebar image as shipped, and as the page sends it
+    original = ROOT / "football-rb.png"
+    sizes = {"original": original.stat().st_size}
+    try:
+        from harif.assets import SIDEBAR_IMAGE_WIDTH, resized_image
+    except ImportError:
+        return sizes
+    sizes[f"resized to {SIDEBAR_IMAGE_WIDTH} px"] = len(resized_image(original, SIDEBAR_IMAGE_WIDTH))
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--pause", type=float, nargs="+", default=[0.0, 2.0],
+                        help="seconds between the first render and the first message")
+    args = parser.parse_args()
+
+    print("sidebar image: " + ", ".join(f"{name} {size / 1024:.0f} KB" for name, size in image_sizes().items()))
+    print(f"{'pause s':>8} {'import st ms':>13} {'first render ms':>16} {'greeting ms':>12} "
+          f"{'data question ms':>17}")
+    for pause in args.pause:
+        runs = [cold_run(pause) for _ in range(args.runs)]
+        median = lambda key: statistics.median(r[key] for r in runs) * 1e3
+        print(f"{pause:>8.1f} {median('import_streamlit'):>13.0f} {median('first_render'):>16.0f} "
+              f"{median('greeting'):>12.0f} {median('data_question'):>17.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# DatasetIndex vs the per-query search_in_dataset scan on a scaled-up goals table.
+#
+#   python benchmarks/bench_dataset_index.py
+#   python benchmarks/bench_dataset_index.py --rows 1000 100000 500000
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from harif.dataset import DatasetIndex, read_csv
+from harif.search import search_in_dataset
+
+QUERIES = [
+    ["valencia", "qatar"],
+    ["mbappé", "argentina"],
+    ["messi", "lusail"],
+    ["morocco", "spain"],
+    ["nobody", "scored"],
+    ["gakpo"],
+]
+
+
+def scale(df, rows):
+    # repeat the real table, tagging each copy with its own "edition" so rows stay distinct
+    copies = -(-rows // len(df))
+    big = pd.concat([df] * copies, ignore_index=True).head(rows)
+    big["Player"] = big["Player"] + " " + (big.index // len(df)).astype(str)
+    return big
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 100_000, 300_000])
+    parser.add_argument("--csv", default=str(ROOT / "datasetFIFA.csv"))
+    parser.add_argument("--scan-queries", type=int, default=2,
+                        help="how many queries to also run through the (slow) old scan")
+    args = parser.parse_args()
+
+    base = read_csv(args.csv)
+    print(f"{'rows':>8} {'build ms':>9} {'scan ms/q':>10} {'index ms/q':>11} {'speedup':>8}")
+    for rows in args.rows:
+        df = scale(base, rows)
+
+        start = time.perf_counter()
+        index = DatasetIndex(df)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        got = [index.search(q) for q in QUERIES]
+        index_t = (time.perf_counter() - start) / len(QUERIES)
+
+        scanned = QUERIES[:args.scan_queries]
+        start = time.perf_counter()
+        expected = [search_in_dataset(q, df) for q in scanned]
+        scan_t = (time.perf_counter() - start) / len(scanned)
+
+        if got[:len(scanned)] != expected:
+            sys.exit(f"mismatch at {rows} rows")
+        print(f"{rows:>8} {build * 1e3:>9.1f} {scan_t * 1e3:>10.2f} "
+              f"{index_t * 1e3:>11.2f} {scan_t / index_t:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
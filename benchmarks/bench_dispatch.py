@@ -0,0 +1,90 @@
+# Bulk replay of chat messages through the follow-up / canned-reply lookup:
+# how many messages get a canned reply or a topic follow-up (not a "general"
+# one), and the cost per message, for the old one-keyword-at-a-time loop
+# against the phrase table (harif.dispatch).
+#
+#   python benchmarks/bench_dispatch.py
+#   python benchmarks/bench_dispatch.py --messages 500000 --log chat_log.jsonl
+#
+# The messages are the labeled questions plus phrasings built around every
+# follow-up / response key, or a chat log (one question per line, or .jsonl
+# with a "question" field) with --log.
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from harif.dispatch import phrase_table
+from harif.engine import get_engine
+from harif.knowledge import get_knowledge
+from harif.preprocess import preprocess
+
+TEMPLATES = ["who won the {}?", "tell me about the {}", "{} of the world cup", "what about {} in 2022",
+             "i love the {}", "the {} was amazing", "any news on {}", "{}"]
+
+
+def old_lookup(keywords, table):
+    # the lookup before the phrase table: one keyword at a time
+    for kw in keywords:
+        if kw in table:
+            return table[kw]
+    return None
+
+
+def read_messages(path):
+    with open(path, encoding="utf-8") as f:
+        lines = [line.strip() for line in f if line.strip()]
+    if path.endswith(".jsonl"):
+        return [json.loads(line)["question"] for line in lines]
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=200_000)
+    parser.add_argument("--log", help="replay this chat log instead of the synthetic messages")
+    parser.add_argument("--seed", type=int, default=2022)
+    args = parser.parse_args()
+
+    knowledge = get_knowledge()
+    follow_ups, responses = knowledge.follow_up_questions, knowledge.responses
+    if args.log:
+        pool = read_messages(args.log)
+    else:
+        pool = read_messages(str(Path(__file__).with_name("labeled_questions.jsonl")))
+        pool += [t.format(key) for key in {*follow_ups, *responses} - {"general"} for t in TEMPLATES]
+    rng = random.Random(args.seed)
+    messages = [rng.choice(pool) for _ in range(args.messages)]
+    # keywords as the cascade sees them: pre-processed and typo-fixed, once per distinct message
+    engine = get_engine()
+    keywords = {m: engine.correct_keywords(preprocess(m).keywords) for m in set(messages)}
+    replay = [keywords[m] for m in messages]
+
+    start = time.perf_counter()
+    table = phrase_table(knowledge)
+    build_us = (time.perf_counter() - start) * 1e6
+
+    def old(kw):
+        return old_lookup(kw, responses), old_lookup(kw, follow_ups)
+
+    def new(kw):
+        return table.lookup(kw, "responses"), table.lookup(kw, "follow_ups")
+
+    print(f"{len(messages):,} messages ({len(pool)} distinct), {len(table)} phrases, table built in {build_us:.0f} us")
+    print(f"{'':>14} {'canned reply':>13} {'topic follow-up':>16} {'us/message':>11}")
+    for name, fn in [("one keyword", old), ("phrase table", new)]:
+        start = time.perf_counter()
+        results = [fn(kw) for kw in replay]
+        us = (time.perf_counter() - start) / len(replay) * 1e6
+        canned = sum(r is not None for r, _ in results)
+        topic = sum(f is not None for _, f in results)
+        print(f"{name:>14} {canned / len(results):>13.1%} {topic / len(results):>16.1%} {us:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# Answer time vs number of World Cup editions loaded: routed by year (one
+# partition searched) against one engine over every edition's entries merged
+# (keys suffixed with the year), plus a question no edition can answer (the
+# cross-edition fallback walks all of them).
+#
+#   python benchmarks/bench_editions.py
+#   python benchmarks/bench_editions.py --editions 1 8 32 64 --repeat 500
+#
+# Extra editions are copies of the 2022 knowledge file under other years (no
+# goals table), written to a temporary folder.
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from harif.editions import EditionStore
+from harif.engine import HarifEngine, flatten_stats
+from harif.knowledge import KNOWLEDGE_PATH
+
+QUESTIONS = ["golden boot {year}", "who was the {year} champion", "{year} total goals", "mascot {year}"]
+
+
+def per_answer_us(fn, texts):
+    start = time.perf_counter()
+    for text in texts:
+        fn(text)
+    return (time.perf_counter() - start) / len(texts) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--editions", type=int, nargs="+", default=[1, 4, 16, 48])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    base = json.loads(KNOWLEDGE_PATH.read_text(encoding="utf-8"))
+    print(f"{'editions':>8} {'routed us':>10} {'merged us':>10} {'miss us':>9} {'load ms':>8}")
+    for count in args.editions:
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = []
+            for k in range(1, count):
+                year = 2022 - 4 * k
+                data = dict(base, version=f"{year}.1",
+                            edition={"year": year, "name": f"World Cup {year}", "hosts": [f"Hostland{year}"], "goals": None})
+                path = Path(tmp) / f"wc{year}.json"
+                path.write_text(json.dumps(data), encoding="utf-8")
+                paths.append(path)
+            start = time.perf_counter()
+            store = EditionStore(paths, default_engine=HarifEngine(cache_size=0), cache_size=0)
+            for edition in store.editions:
+                edition.engine.warm_up()
+            load_ms = (time.perf_counter() - start) * 1e3
+
+            years = sorted(store.by_year)
+            texts = [q.format(year=years[i % len(years)]) for i in range(args.repeat) for q in QUESTIONS]
+
+            # no partitions: every edition's QA and stats in one engine, the year part of each key
+            merged_qa, merged_stats = {}, {}
+            for edition in store.editions:
+                kb = edition.engine.knowledge
+                merged_qa.update({f"{key} {edition.year}": val for key, val in kb.qa.items()})
+                merged_stats.update({f"{key} {edition.year}": val for key, val in flatten_stats(kb.stats)})
+            merged = HarifEngine(merged_qa, merged_stats, df=store.default.engine.df, cache_size=0).warm_up()
+
+            routed = per_answer_us(store.answer, texts)
+            merged_us = per_answer_us(merged.answer, texts)
+            miss = per_answer_us(store.answer, ["xyzzy plugh"] * args.repeat)
+            print(f"{len(store):>8} {routed:>10.1f} {merged_us:>10.1f} {miss:>9.1f} {load_ms:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
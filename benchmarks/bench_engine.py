@@ -0,0 +1,61 @@
+# Headless HarifEngine: import cost, cold start and answers per second.
+#
+#   python benchmarks/bench_engine.py
+#   python benchmarks/bench_engine.py --repeat 2000
+import argparse
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+QUESTIONS = [
+    "hello",
+    "who won the golden boot?",
+    "how many total goals",
+    "who is the champion",
+    "argentina coach",
+    "top scorers mbappé",
+    "Enner Valencia Qatar",
+    "Gakpo Senegal",
+    "tell me about basketball",
+    "ما هو الفريق الفائز",
+    "xyzzy plugh",
+]
+
+
+def import_time():
+    # fresh interpreter so nothing is already in sys.modules
+    code = ("import sys, time; t = time.perf_counter(); import harif.engine; "
+            "print(time.perf_counter() - t, 'streamlit' in sys.modules, 'pandas' in sys.modules)")
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    seconds, streamlit, pandas = out.stdout.split()
+    return float(seconds), streamlit == "True", pandas == "True"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    seconds, streamlit, pandas = import_time()
+    print(f"import harif.engine: {seconds * 1e3:.1f} ms (streamlit loaded: {streamlit}, pandas loaded: {pandas})")
+
+    from harif.engine import HarifEngine
+
+    engine = HarifEngine()
+    start = time.perf_counter()
+    engine.answer_many(QUESTIONS)
+    print(f"first pass (builds indexes): {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+    texts = QUESTIONS * args.repeat
+    start = time.perf_counter()
+    engine.answer_many(texts)
+    elapsed = time.perf_counter() - start
+    print(f"warm: {len(texts)} answers in {elapsed:.2f} s -> {len(texts) / elapsed:,.0f} answers/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# FuzzyIndex: build time, correction latency and accuracy as the vocabulary grows.
+#
+#   python benchmarks/bench_fuzzy.py
+#   python benchmarks/bench_fuzzy.py --vocab 1000 10000 100000 --lookups 2000
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from harif.fuzzy import FuzzyIndex, max_edits
+
+CONSONANTS = "bcdfghjklmnprstvwz"
+VOWELS = "aeiou"
+
+
+def make_word(rng):
+    # pronounceable made-up names, 5-12 letters
+    letters = []
+    for i in range(rng.randint(5, 12)):
+        letters.append(rng.choice(VOWELS if i % 2 else CONSONANTS))
+    return "".join(letters)
+
+
+def typo(word, rng):
+    # one random edit: drop, double, swap or replace a letter
+    i = rng.randrange(len(word))
+    kind = rng.choice(["drop", "double", "swap", "replace"])
+    if kind == "drop":
+        return word[:i] + word[i + 1:]
+    if kind == "double":
+        return word[:i] + word[i] + word[i:]
+    if kind == "swap" and i < len(word) - 1:
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    return word[:i] + rng.choice("aeiourstnl") + word[i + 1:]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--vocab", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--lookups", type=int, default=2_000)
+    parser.add_argument("--seed", type=int, default=2022)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'vocab':>8} {'build ms':>9} {'us/lookup':>10} {'p99 us':>8} {'fixed':>7}")
+    for size in args.vocab:
+        words = set()
+        while len(words) < size:
+            words.add(make_word(rng))
+        words = sorted(words)
+
+        start = time.perf_counter()
+        index = FuzzyIndex(words)
+        build = time.perf_counter() - start
+
+        samples = [w for w in rng.sample(words, min(args.lookups, len(words))) if max_edits(w)]
+        typos = [(w, typo(w, rng)) for w in samples]
+        timings, fixed = [], 0
+        for word, wrong in typos:
+            start = time.perf_counter()
+            got = index.correct(wrong)
+            timings.append(time.perf_counter() - start)
+            fixed += got == word or wrong in index.known
+        timings.sort()
+        mean = sum(timings) / len(timings)
+        p99 = timings[int(len(timings) * 0.99) - 1]
+        print(f"{size:>8} {build * 1e3:>9.1f} {mean * 1e6:>10.1f} {p99 * 1e6:>8.1f} {fixed / len(typos):>6.0%}")
+
+
+if __name__ == "__main__":
+    main()
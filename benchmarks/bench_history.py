@@ -0,0 +1,110 @@
+# Rerender time and memory of a chat session as the conversation grows: the
+# old page (every message in a list, all rendered on every rerun) against
+# ChatHistory (only the latest window rendered, old turns interned / on disk).
+#
+#   python benchmarks/bench_history.py
+#   python benchmarks/bench_history.py --turns 10 100 1000 5000 --window 20
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from streamlit.testing.v1 import AppTest
+
+from harif.engine import get_engine
+from harif.history import ChatHistory
+
+QUESTIONS = ["who won the golden boot?", "how many goals did Morocco score", "Enner Valencia Qatar",
+             "who is the champion", "goals in group C", "xyzzy plugh"]
+
+
+def conversation(turns):
+    # (role, content) messages of a chat of this many turns, answered by the engine
+    engine = get_engine()
+    messages = [("assistant", "Hello! ⚽️ Ask me anything about the World Cup")]
+    for t in range(turns):
+        text = f"{QUESTIONS[t % len(QUESTIONS)]} #{t}"
+        answer, follow_up = engine.answer(QUESTIONS[t % len(QUESTIONS)])
+        messages += [("user", text), ("assistant", answer)]
+        if follow_up:
+            messages.append(("assistant", follow_up))
+    return messages
+
+
+def render_all():
+    # the page before ChatHistory: every message on every rerun
+    import streamlit as st
+    for msg in st.session_state.messages:
+        with st.chat_message(msg["role"]):
+            st.markdown(msg["content"])
+
+
+def render_window():
+    import streamlit as st
+    for msg in st.session_state.messages.page(0):
+        with st.chat_message(msg["role"]):
+            st.markdown(msg["content"])
+
+
+def rerun_ms(script, messages, rounds=3):
+    at = AppTest.from_function(script, default_timeout=600)
+    at.session_state.messages = messages
+    at.run()
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        at.run()
+        best = min(best, time.perf_counter() - start)
+    return best * 1e3, len(at.chat_message)
+
+
+def retained_kib(build):
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    return size / 1024, kept
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, nargs="+", default=[10, 100, 1000, 3000])
+    parser.add_argument("--window", type=int, default=20)
+    parser.add_argument("--keep", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"window {args.window} turns, {args.keep} turns kept in memory")
+    print(f"{'turns':>6} {'list ms':>8} {'shown':>6} {'window ms':>10} {'shown':>6} {'list KiB':>9} {'history KiB':>12}")
+    for turns in args.turns:
+        messages = conversation(turns)
+
+        def as_list():
+            # fresh strings, as a real session's answers would be
+            return [{"role": r, "content": "".join(c)} for r, c in messages]
+
+        def as_history():
+            history = ChatHistory(window=args.window, keep=args.keep)
+            for r, c in messages:
+                history.append({"role": r, "content": "".join(c)})
+            return history
+
+        list_kib, full = retained_kib(as_list)
+        history_kib, history = retained_kib(as_history)
+        assert list(history) == full, "history lost or reordered messages"
+        list_ms, list_shown = rerun_ms(render_all, full)
+        window_ms, window_shown = rerun_ms(render_window, history)
+        print(f"{turns:>6} {list_ms:>8.1f} {list_shown:>6} {window_ms:>10.1f} {window_shown:>6} "
+              f"{list_kib:>9.0f} {history_kib:>12.0f}")
+        history.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# Live goal ingestion: how long until a goal appended to the events file shows
+# up in answers, and what add_goals costs next to rebuilding the indexes.
+#
+#   python benchmarks/bench_ingest.py
+#   python benchmarks/bench_ingest.py --rows 100000 1000000 --goals 50 --poll 0.1
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from harif.aggregates import GoalAggregates
+from harif.dataset import DatasetIndex, load_goals
+from harif.engine import HarifEngine
+from harif.timing import summarize
+
+
+def scale(df, rows, seed=2022):
+    copies = -(-rows // len(df))
+    big = pd.concat([df] * copies, ignore_index=True).head(rows)
+    big["Minute"] = np.random.default_rng(seed).integers(1, 91, len(big)).astype(df["Minute"].dtype)
+    return big
+
+
+def event(base, k):
+    # a goal by a player nobody has heard of yet, so its first answer is unambiguous
+    row = base.iloc[k % len(base)].to_dict()
+    row.update({"Player": f"Zed Livescorer{k:05d}", "Minute": 45, "Group": None if pd.isna(row["Group"]) else row["Group"]})
+    return {key: (val.item() if hasattr(val, "item") else val) for key, val in row.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--goals", type=int, default=30)
+    parser.add_argument("--poll", type=float, default=0.1, help="tailer poll interval, seconds")
+    parser.add_argument("--csv", default=str(ROOT / "datasetFIFA.csv"))
+    args = parser.parse_args()
+
+    base = load_goals(args.csv, cache=False)
+    print(f"{'rows':>9} | {'rebuild s':>9} | {'add_goals ms':>12} | visible after (ms): {'p50':>6} {'p95':>6} {'max':>6}")
+    for rows in args.rows:
+        df = scale(base, rows)
+        start = time.perf_counter()
+        DatasetIndex(df)
+        GoalAggregates(df)
+        rebuild = time.perf_counter() - start
+
+        engine = HarifEngine(df=df).warm_up()
+        adds = []
+        add_goals = engine.add_goals
+        def timed_add(new):
+            t = time.perf_counter()
+            add_goals(new)
+            adds.append(time.perf_counter() - t)
+        engine.add_goals = timed_add
+
+        with tempfile.TemporaryDirectory() as folder:
+            path = Path(folder) / "live_goals.jsonl"
+            path.touch()
+            engine.follow(path, poll_interval=args.poll)
+            visible = []
+            with open(path, "a", encoding="utf-8") as f:
+                for k in range(args.goals):
+                    goal = event(base, k)
+                    question = f"how many goals did {goal['Player']} score"
+                    f.write(json.dumps(goal) + "\n")
+                    f.flush()
+                    written = time.perf_counter()
+                    while "scored 1 goal" not in str(engine.answer(question)[0]):
+                        if time.perf_counter() - written > 10:
+                            raise SystemExit(f"goal {k} never showed up")
+                        time.sleep(0.002)
+                    visible.append(time.perf_counter() - written)
+            engine._tailers[path.resolve()].stop()
+
+        s = summarize(visible)
+        print(f"{rows:>9} | {rebuild:>9.2f} | {summarize(adds)['p50_ms']:>12.1f} | "
+              f"{'':>20}{s['p50_ms']:>6.0f} {s['p95_ms']:>6.0f} {s['max_ms']:>6.0f}")
+
+
+if __name__ == "__main__":
+    main()
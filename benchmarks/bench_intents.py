@@ -0,0 +1,68 @@
+# Intents classified per second by IntentMatcher, compared with a
+# linear "any phrase in message" loop over the same table, as the intent table grows.
+#
+#   python benchmarks/bench_intents.py
+#   python benchmarks/bench_intents.py --messages 50000 --extra 0 100 500
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from harif.intents import INTENTS, IntentMatcher
+
+MESSAGES = [
+    "hello there", "hi", "hey, how are you?", "thanks a lot!", "thank you so much",
+    "what is your name", "bye", "who won the golden boot in 2022",
+    "how many goals did messi score", "which team won the final", "I am sad today",
+    "tell me about the morocco spain match", "what is your mission", "total goals",
+]
+
+
+def linear_classify(intents, text):
+    # the shape of the old code: one whole-word check per phrase, in order
+    for name, patterns in intents:
+        for p in patterns:
+            if p.search(text):
+                return name
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=20_000)
+    parser.add_argument("--extra", type=int, nargs="+", default=[0, 100, 1000],
+                        help="synthetic intents added on top of the built-in table")
+    parser.add_argument("--seed", type=int, default=2022)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    corpus = [rng.choice(MESSAGES) for _ in range(args.messages)]
+    print(f"{'intents':>8} {'matcher /s':>12} {'linear /s':>11}")
+    for extra in args.extra:
+        table = list(INTENTS) + [
+            (f"extra_{i}", [f"zq{i}word", f"phrase number {i}"], f"reply {i}", False) for i in range(extra)
+        ]
+        matcher = IntentMatcher(table)
+        linear = [(name, [re.compile(r"\b" + re.escape(p) + r"\b", re.IGNORECASE) for p in phrases])
+                  for name, phrases, _, _ in table]
+
+        start = time.perf_counter()
+        got = [matcher.classify(m) for m in corpus]
+        compiled_t = time.perf_counter() - start
+
+        start = time.perf_counter()
+        expected = [linear_classify(linear, m) for m in corpus]
+        linear_t = time.perf_counter() - start
+
+        if got != expected:
+            bad = next(i for i, (a, b) in enumerate(zip(got, expected)) if a != b)
+            sys.exit(f"mismatch on {corpus[bad]!r}: {got[bad]} != {expected[bad]}")
+        print(f"{len(table):>8} {len(corpus) / compiled_t:>12,.0f} {len(corpus) / linear_t:>11,.0f}")
+
+
+if __name__ == "__main__":
+    main()
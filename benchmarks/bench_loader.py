@@ -0,0 +1,73 @@
+# Goals-table loading: the old read_csv vs load_goals (typed columns + parquet cache).
+#
+#   python benchmarks/bench_loader.py
+#   python benchmarks/bench_loader.py --times 100 1000 --keep
+#
+# The table is repeated --times over into a temporary CSV (same cp1252 encoding
+# as the bundled one) and loaded cold (no cache yet), warm (cache hit), and
+# after a touch (mtime changed, content the same, so only the hash is checked).
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from harif.dataset import cache_paths, load_goals, read_csv
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def mb(df):
+    return df.memory_usage(deep=True).sum() / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--times", type=int, nargs="+", default=[1, 1000])
+    parser.add_argument("--csv", default=str(ROOT / "datasetFIFA.csv"))
+    parser.add_argument("--keep", action="store_true", help="leave the generated files behind")
+    args = parser.parse_args()
+
+    with open(args.csv, "rb") as f:
+        header, *lines = f.read().splitlines(keepends=True)
+
+    folder = Path(tempfile.mkdtemp(prefix="harif-loader-"))
+    print(f"{'rows':>9} {'csv MB':>7} | {'read_csv s':>10} {'MB':>7} | {'cold s':>7} {'warm s':>7} "
+          f"{'touch s':>8} {'MB':>7} {'parquet MB':>10}")
+    try:
+        for times in args.times:
+            path = folder / f"goals_x{times}.csv"
+            with open(path, "wb") as f:
+                f.write(header)
+                for _ in range(times):
+                    f.writelines(lines)
+
+            old, old_t = timed(read_csv, path)
+            _, cold_t = timed(load_goals, path)
+            new, warm_t = timed(load_goals, path)
+            os.utime(path)
+            _, touch_t = timed(load_goals, path)
+            assert old.astype(str).equals(new.astype(str))
+
+            parquet = cache_paths(path)[0]
+            parquet_mb = parquet.stat().st_size / 2**20 if parquet.exists() else float("nan")
+            print(f"{len(new):>9} {path.stat().st_size / 2**20:>7.1f} | {old_t:>10.3f} {mb(old):>7.1f} | "
+                  f"{cold_t:>7.3f} {warm_t:>7.3f} {touch_t:>8.3f} {mb(new):>7.1f} {parquet_mb:>10.1f}")
+    finally:
+        if args.keep:
+            print(f"files left in {folder}")
+        else:
+            shutil.rmtree(folder)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# Messages per second through the steps before the sources are searched, on a
+# large synthetic corpus (English questions with typos, Arabic, off-topic,
+# small talk): the old per-call helpers against harif.preprocess, first the
+# tokenizing and language/topic checks alone, then the whole gate stage
+# (greeting check, typo fixes, aggregates).
+#
+#   python benchmarks/bench_preprocess.py
+#   python benchmarks/bench_preprocess.py --messages 500000 --seed 7
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from harif.engine import HarifEngine, cascade_gates
+from harif.intents import INTENT_MATCHER, words
+from harif.preprocess import preprocess
+from harif.replies import EXTERNAL_KEYWORDS, get_follow_up
+from harif.search import STOP_WORDS
+
+ENGLISH = ["who won the golden boot?", "how many goals did Morocco score", "goldn glove winner",
+           "mbape goals in the final", "goals in group C", "total goals", "Enner Valencia Qatar",
+           "which stadium hosted the final", "xyzzy plugh", "who is the champion"]
+ARABIC = ["من فاز بكأس العالم", "كم هدف سجل ميسي", "مرحبا كيف حالك", "ما هي نتيجة المباراة النهائية"]
+OFF_TOPIC = [f"what about the {w} today" for w in sorted(EXTERNAL_KEYWORDS)]
+SMALL_TALK = ["hello there", "thanks a lot!", "bye", "what is your name"]
+
+
+# the helpers as they were: a regex search per call, separate splits per stage
+def old_is_english(text):
+    if re.search(r'[\u0600-\u06FF]', text):
+        return False
+    return bool(re.search(r'[A-Za-z]', text))
+
+
+def old_extract_keywords(text):
+    return [w for w in text.lower().replace("?", "").split() if w not in STOP_WORDS and len(w) > 2]
+
+
+def old_is_external_topic(keywords):
+    return any(kw in EXTERNAL_KEYWORDS for kw in keywords)
+
+
+def old_checks(text):
+    keywords = old_extract_keywords(text)
+    return words(text), keywords, old_is_english(text), old_is_external_topic(keywords)
+
+
+def new_checks(text):
+    message = preprocess(text)
+    return message.words, message.keywords, message.english, message.external
+
+
+def old_gates(text, correct, answer_aggregate):
+    # the gate order before the pre-processing stage: typo fixes before the language check
+    reply = INTENT_MATCHER.reply(text, fast_path_only=True)
+    if reply:
+        return (reply, None), None
+    keywords = old_extract_keywords(text)
+    if not keywords:
+        return ("Please enter more specific keywords.", get_follow_up(['general'])), None
+    keywords = correct(keywords)
+    english = old_is_english(text)
+    external = old_is_external_topic(keywords)
+    if english and not external:
+        answer = answer_aggregate(text, keywords)
+        if answer:
+            return (answer, get_follow_up(keywords)), None
+    return None, (keywords, english, external)
+
+
+def rate(fn, corpus):
+    start = time.perf_counter()
+    for text in corpus:
+        fn(text)
+    return len(corpus) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=2022)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    pools = [(ENGLISH, 0.55), (ARABIC, 0.2), (OFF_TOPIC, 0.15), (SMALL_TALK, 0.1)]
+    corpus = []
+    for _ in range(args.messages):
+        pool = rng.choices([p for p, _ in pools], [w for _, w in pools])[0]
+        # a random suffix word, so the typo-fix memo does not see the same message every time
+        corpus.append(f"{rng.choice(pool)} {rng.choice(['please', 'now', 'thx', f'x{rng.randint(0, 999)}'])}")
+
+    engine = HarifEngine(cache_size=0).warm_up()
+    correct, aggregate = engine.correct_keywords, engine.answer_aggregate
+    sample = corpus[:5000]
+    bad = [t for t in sample if old_checks(t) != new_checks(t)]
+    if bad:
+        sys.exit(f"pre-processing differs from the old helpers on {bad[0]!r}")
+    bad = [t for t in sample if (old_gates(t, correct, aggregate)[0] or [None])[0]
+           != (cascade_gates(t, correct, aggregate)[0] or [None])[0]]
+    if bad:
+        sys.exit(f"gate reply differs on {bad[0]!r}")
+
+    print(f"{len(corpus):,} messages (55% English, 20% Arabic, 15% off-topic, 10% small talk)")
+    print(f"{'stage':>28} {'old msg/s':>12} {'new msg/s':>12} {'speed-up':>9}")
+    for name, old, new in [
+        ("tokenize + language/topic", old_checks, new_checks),
+        ("gates (typo fixes, ...)", lambda t: old_gates(t, correct, aggregate),
+         lambda t: cascade_gates(t, correct, aggregate)),
+    ]:
+        old_rate, new_rate = rate(old, corpus), rate(new, corpus)
+        print(f"{name:>28} {old_rate:>12,.0f} {new_rate:>12,.0f} {new_rate / old_rate:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# QAIndex vs the linear search_in_qa scan on synthetic QA dictionaries.
+#
+#   python benchmarks/bench_qa_index.py
+#   python benchmarks/bench_qa_index.py --sizes 150 10000 100000 --queries 300
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from harif.qa_index import QAIndex
+from harif.search import search_in_qa
+
+WORDS = [
+    "argentina", "france", "croatia", "morocco", "brazil", "england", "portugal", "spain",
+    "japan", "germany", "qatar", "ecuador", "senegal", "tunisia", "saudi", "canada",
+    "messi", "mbappe", "giroud", "ramos", "valencia", "rashford", "gakpo", "modric",
+    "goal", "goals", "final", "semifinal", "group", "stage", "penalty", "penalties",
+    "coach", "captain", "wins", "losses", "draws", "assists", "scorer", "scorers",
+    "golden", "boot", "ball", "glove", "young", "player", "record", "stadium",
+    "attendance", "referee", "red", "cards", "offside", "first", "last", "most",
+]
+
+
+def make_qa(size, rng):
+    qa = {}
+    while len(qa) < size:
+        key = " ".join(rng.sample(WORDS, rng.randint(2, 4)))
+        if len(qa) >= len(WORDS) ** 2:
+            key += f" {len(qa)}"
+        qa[key] = f"answer #{len(qa)}"
+    return qa
+
+
+def make_queries(count, rng):
+    queries = []
+    for _ in range(count):
+        kws = rng.sample(WORDS, rng.randint(1, 3))
+        if rng.random() < 0.2:
+            kws.append(rng.choice(["bal", "oal", "basketball", "nope"]))
+        queries.append(kws)
+    return queries
+
+
+def timed(fn, queries):
+    start = time.perf_counter()
+    results = [fn(q) for q in queries]
+    return results, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[150, 10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=2022)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'entries':>8} {'build ms':>9} {'scan us/q':>10} {'index us/q':>11} {'speedup':>8}")
+    for size in args.sizes:
+        qa = make_qa(size, rng)
+        queries = make_queries(args.queries, rng)
+
+        start = time.perf_counter()
+        index = QAIndex(qa)
+        build = time.perf_counter() - start
+
+        expected, scan_t = timed(lambda q: search_in_qa(q, qa), queries)
+        got, index_t = timed(index.search, queries)
+        if got != expected:
+            bad = next(i for i, (a, b) in enumerate(zip(got, expected)) if a != b)
+            sys.exit(f"mismatch at {size} entries for {queries[bad]}: {got[bad]!r} != {expected[bad]!r}")
+
+        n = len(queries)
+        print(f"{size:>8} {build * 1e3:>9.1f} {scan_t / n * 1e6:>10.1f} "
+              f"{index_t / n * 1e6:>11.1f} {scan_t / index_t:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# Semantic retrieval (HarifEngine(retrieval="semantic")): paraphrases the
+# keyword cascade misses, then what a query costs as the knowledge base grows,
+# every entry scored against the IVF lists (recall: same best score as scoring all).
+#
+#   python benchmarks/bench_semantic.py
+#   python benchmarks/bench_semantic.py --rows 1000 20000 100000 --queries 300
+#
+# HARIF_EMBEDDING_MODEL=tfidf forces the hashed TF-IDF vectors even when
+# sentence-transformers is installed. The synthetic knowledge bases are written
+# to a temporary folder and read back memory-mapped, as the engine does.
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from harif.engine import HarifEngine
+from harif.semantic import SemanticIndex, get_encoder
+
+# worded so no key shares a word with them
+PARAPHRASES = [
+    ("who lifted the trophy", "Argentina"),
+    ("who were the winners", "Argentina"),
+    ("who took the title", "Argentina"),
+    ("how big was the crowd overall", "3.4 million"),
+    ("which arena staged the decider", "Lusail"),
+    ("who was the ref in the decider", "Marciniak"),
+    ("who managed the french", "Deschamps"),
+    ("the tournament's best striker", "Mbappé"),
+]
+
+
+def is_correct(answer, expected):
+    return answer is not None and expected.lower() in str(answer).lower()
+
+
+def accuracy(engine, labels):
+    return sum(is_correct(engine.answer(q)[0], expected) for q, expected in labels)
+
+
+def per_query_us(fn, queries):
+    start = time.perf_counter()
+    for q in queries:
+        fn(q)
+    return (time.perf_counter() - start) / len(queries) * 1e6
+
+
+def best_score(index, query):
+    # entries of one topic often tie, so recall compares the best score, not which entry has it
+    hits = index.search(query, k=1)
+    return round(hits[0].score, 5) if hits else None
+
+
+def synthetic_documents(rows, topics, vocabulary, rng):
+    # entries about one topic each (most words from its word list), like a real knowledge base
+    for i in range(rows):
+        words = rng.sample(rng.choice(topics), 5) + rng.sample(vocabulary, 1)
+        yield "qa", f"entry {i}", " ".join(words[:3]), " ".join(words[3:]), f"answer {i}"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--labels", default=str(Path(__file__).with_name("labeled_questions.jsonl")))
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 20000, 100000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=2022)
+    args = parser.parse_args()
+
+    with open(args.labels, encoding="utf-8") as f:
+        labeled = [(item["question"], item["expected"]) for item in map(json.loads, filter(str.strip, f))]
+    cascade = HarifEngine(cache_size=0).warm_up()
+    start = time.perf_counter()
+    semantic = HarifEngine(cache_size=0, retrieval="semantic").warm_up()
+    build_ms = (time.perf_counter() - start) * 1e3
+    index = semantic.semantic_index
+    print(f"encoder {index.encoder.name}, {len(index)} QA/stats entries, engine ready in {build_ms:.0f} ms")
+    print(f"{'':>22} {'cascade':>8} {'semantic':>9}")
+    print(f"{'labeled questions':>22} {accuracy(cascade, labeled):>5}/{len(labeled)} "
+          f"{accuracy(semantic, labeled):>6}/{len(labeled)}")
+    print(f"{'paraphrases':>22} {accuracy(cascade, PARAPHRASES):>5}/{len(PARAPHRASES)} "
+          f"{accuracy(semantic, PARAPHRASES):>6}/{len(PARAPHRASES)}")
+    questions = [q for q, _ in labeled + PARAPHRASES]
+    print(f"semantic search alone: {per_query_us(index.search, questions):.0f} us/query; "
+          f"answers: cascade {per_query_us(cascade.answer, questions):.0f} us, "
+          f"semantic mode {per_query_us(semantic.answer, questions):.0f} us")
+
+    rng = random.Random(args.seed)
+    vocabulary = sorted({w for q in questions for w in q.lower().split()}
+                        | {f"{a}{b}{c}" for a in "bcdfgk" for b in "aeiou" for c in "lmnrst"})
+    topics = [rng.sample(vocabulary, 12) for _ in range(500)]
+    queries = [" ".join(rng.sample(rng.choice(topics), 3)) for _ in range(args.queries)]
+    print(f"\n{'rows':>8} {'build s':>8} {'matvec us':>10} {'ivf us':>8} {'ivf recall':>11}")
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            documents = list(synthetic_documents(rows, topics, vocabulary, rng))
+            start = time.perf_counter()
+            exact = SemanticIndex(documents, get_encoder(), Path(tmp) / "kb.npy", ann_min_rows=rows + 1)
+            build_s = time.perf_counter() - start
+            ivf = SemanticIndex(documents, get_encoder(), Path(tmp) / "kb.npy", ann_min_rows=0)
+            exact_us = per_query_us(exact.search, queries)
+            ivf_us = per_query_us(ivf.search, queries)
+            same = sum(best_score(exact, q) == best_score(ivf, q) for q in queries)
+            print(f"{rows:>8} {build_s:>8.1f} {exact_us:>10.0f} {ivf_us:>8.0f} {same / len(queries):>11.1%}")
+            del exact, ivf
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# Memory and CPU cost of each extra chat session on one Streamlit process.
+#
+#   python benchmarks/bench_sessions.py
+#   python benchmarks/bench_sessions.py --sessions 50 --messages 5
+#
+# Every session is a Streamlit AppTest of HarifS.py that stays alive (like an
+# open browser tab) and sends a few messages. The knowledge base and the engine
+# are process-wide, so the per-session cost is only Streamlit's own session
+# state plus the chat history, whatever the size of the knowledge base.
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from streamlit.testing.v1 import AppTest
+
+from harif.engine import get_engine
+from harif.knowledge import get_knowledge
+
+MESSAGES = ["hello", "who won the golden boot?", "how many goals did Morocco score", "Enner Valencia Qatar",
+            "what is the weather", "goals in group C"]
+
+
+def deep_size(obj, seen=None):
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if hasattr(obj, "items"):
+        size += sum(deep_size(k, seen) + deep_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (tuple, list, set, frozenset)):
+        size += sum(deep_size(v, seen) for v in obj)
+    return size
+
+
+def open_session(messages):
+    at = AppTest.from_file(str(ROOT / "HarifS.py"), default_timeout=60).run()
+    for text in messages:
+        at.chat_input[0].set_value(text).run()
+    assert not at.exception, at.exception
+    return at
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--messages", type=int, default=3)
+    args = parser.parse_args()
+    messages = MESSAGES[:args.messages]
+
+    knowledge = get_knowledge()
+    print(f"knowledge {knowledge.version}: {deep_size(knowledge) / 1024:.0f} KiB, loaded once per process")
+
+    open_session(messages)            # first session pays for imports, the CSV and the indexes
+    engine, kb = get_engine(), get_knowledge()
+
+    gc.collect()
+    tracemalloc.start()
+    sessions, rows = [], []
+    base = tracemalloc.get_traced_memory()[0]
+    for n in range(1, args.sessions + 1):
+        cpu, wall = time.process_time(), time.perf_counter()
+        sessions.append(open_session(messages))
+        cpu, wall = time.process_time() - cpu, time.perf_counter() - wall
+        gc.collect()
+        rows.append((n, (tracemalloc.get_traced_memory()[0] - base) / 1024, cpu, wall))
+    tracemalloc.stop()
+
+    assert get_engine() is engine and get_knowledge() is kb, "a session rebuilt the shared state"
+    print(f"{'sessions':>8} {'retained KiB':>13} {'KiB/session':>12} {'cpu ms':>8} {'wall ms':>8}")
+    for n, kib, cpu, wall in rows:
+        if n in (1, 2, 5) or n % 10 == 0 or n == args.sessions:
+            print(f"{n:>8} {kib:>13.0f} {kib / n:>12.0f} {cpu * 1e3:>8.0f} {wall * 1e3:>8.0f}")
+    growth = (rows[-1][1] - rows[0][1]) / max(len(rows) - 1, 1)
+    print(f"marginal memory per extra session: {growth:.0f} KiB; engine and knowledge shared by all {args.sessions}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# Cost of the per-stage tracer: answers/s with tracing off, on, and on with a
+# JSONL log, then where the time went by stage and one cProfile report.
+#
+#   python benchmarks/bench_tracing.py
+#   python benchmarks/bench_tracing.py --repeat 2000 --cache --prometheus
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from harif.engine import HarifEngine, _cascade, run_cascade
+from harif.replies import eliza_reply
+from harif.tracing import TRACER
+
+# one question per branch of the cascade
+QUESTIONS = [
+    "hello",                        # greeting fast path
+    "who won the golden boot?",     # QA
+    "how many total goals",         # stats
+    "how many goals did morocco score",  # goals-table aggregate
+    "Enner Valencia Qatar",         # goals-table row
+    "Gakpo Senegal",
+    "tell me about basketball",     # off topic
+    "ما هو الفريق الفائز",            # not English
+    "xyzzy plugh",                  # ELIZA
+]
+
+
+def timed(fn, texts, rounds=5):
+    # best of a few rounds, microseconds per answer
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for text in texts:
+            fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best / len(texts) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=300)
+    parser.add_argument("--cache", action="store_true", help="keep the response cache on (stages after it mostly skipped)")
+    parser.add_argument("--prometheus", action="store_true", help="print the exported counters")
+    args = parser.parse_args()
+
+    engine = HarifEngine(cache_size=2048 if args.cache else 0).warm_up()
+    engine.answer_many(QUESTIONS)
+    texts = QUESTIONS * args.repeat
+    cache = engine.cache if args.cache else None
+    sources = (engine.search_qa, engine.search_stats, engine.search_dataset, cache, engine.correct_keywords,
+               engine.answer_aggregate)
+    untraced = lambda text: _cascade(text, *sources, eliza_reply, None)
+    cascade = lambda text: run_cascade(text, *sources)
+
+    TRACER.disable()
+    rows = [("no tracer (_cascade)", timed(untraced, texts)), ("tracing off", timed(cascade, texts))]
+    TRACER.enable()
+    rows.append(("tracing on", timed(cascade, texts)))
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, "trace.jsonl")
+        TRACER.reset()
+        TRACER.enable(log_path=log_path)
+        rows.append(("tracing on + JSONL", timed(cascade, texts, rounds=1)))
+        TRACER.disable()
+        log_lines = sum(1 for _ in open(log_path, encoding="utf-8"))
+
+    base = rows[0][1]
+    print(f"{len(texts)} answers, cache {'on' if args.cache else 'off'}")
+    print(f"{'':>22} {'us/answer':>10} {'overhead':>9}")
+    for name, us in rows:
+        print(f"{name:>22} {us:>10.2f} {(us - base) / base:>+9.1%}")
+    print(f"JSONL log: {log_lines} lines")
+
+    snap = TRACER.snapshot()
+    print(f"\n{'stage':>12} {'count':>7} {'mean us':>9} {'total ms':>9}")
+    for stage, s in sorted(snap["stages"].items(), key=lambda kv: -kv[1]["total_ms"]):
+        print(f"{stage:>12} {s['count']:>7} {s['mean_ms'] * 1e3:>9.2f} {s['total_ms']:>9.1f}")
+    print(f"\n{'answered by':>12} {'count':>7} {'mean us':>9}")
+    for source, s in snap["answers"].items():
+        print(f"{source:>12} {s['count']:>7} {s['mean_ms'] * 1e3:>9.2f}")
+
+    if args.prometheus:
+        print("\n" + TRACER.prometheus())
+
+    TRACER.profile_next()
+    engine.answer("Gakpo Senegal")
+    print("\ncProfile of one answer (\"Gakpo Senegal\"):")
+    print("\n".join(TRACER.last_profile.splitlines()[:25]))
+
+
+if __name__ == "__main__":
+    main()
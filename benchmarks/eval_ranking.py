@@ -0,0 +1,78 @@
+# Offline evaluation of the ranked retrieval against the first-hit cascade.
+#
+#   python benchmarks/eval_ranking.py
+#   python benchmarks/eval_ranking.py --labels my_questions.jsonl -k 5 --show-misses
+#
+# The label file has one {"question": ..., "expected": ...} object per line; an
+# answer counts as correct when it contains the expected text (case-insensitive).
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from harif.engine import HarifEngine
+from harif.search import extract_keywords
+
+
+def is_correct(answer, expected):
+    return answer is not None and expected.lower() in str(answer).lower()
+
+
+def qps(fn, questions, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for q in questions:
+            fn(q)
+    return len(questions) * repeat / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--labels", default=str(Path(__file__).with_name("labeled_questions.jsonl")))
+    parser.add_argument("-k", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--show-misses", action="store_true")
+    args = parser.parse_args()
+
+    with open(args.labels, encoding="utf-8") as f:
+        labels = [json.loads(line) for line in f if line.strip()]
+    questions = [item["question"] for item in labels]
+
+    # no response cache: every query does the full retrieval work
+    cascade = HarifEngine(cache_size=0).warm_up()
+    ranked = HarifEngine(cache_size=0, retrieval="ranked").warm_up()
+
+    cascade_ok = ranked_ok = topk_ok = 0
+    rr = 0.0
+    for item in labels:
+        q, expected = item["question"], item["expected"]
+        c = is_correct(cascade.answer(q)[0], expected)
+        hits = ranked.rank(q, k=args.k)
+        r = bool(hits) and is_correct(hits[0].answer, expected)
+        rank = next((i for i, h in enumerate(hits, 1) if is_correct(h.answer, expected)), None)
+        cascade_ok += c
+        ranked_ok += r
+        topk_ok += rank is not None
+        rr += 1 / rank if rank else 0.0
+        if args.show_misses and not (c and r):
+            top = hits[0].key if hits else None
+            print(f"  {'ok ' if c else 'MISS'} cascade | {'ok ' if r else 'MISS'} ranked ({top}) | {q!r} -> {expected!r}")
+
+    n = len(labels)
+    # retrieval only, no gates or follow-ups: keywords straight into each search
+    keyword_sets = [extract_keywords(q) for q in questions]
+    index = ranked.ranking_index
+    print(f"{n} labeled questions")
+    print(f"cascade      accuracy {cascade_ok / n:6.1%}   {qps(cascade.answer, questions, args.repeat):>9,.0f} answers/s")
+    print(f"ranked @1    accuracy {ranked_ok / n:6.1%}   {qps(ranked.answer, questions, args.repeat):>9,.0f} answers/s")
+    print(f"ranked @{args.k}    accuracy {topk_ok / n:6.1%}   MRR {rr / n:.3f}")
+    print(f"BM25 search only: {qps(index.search, keyword_sets, args.repeat):,.0f} queries/s "
+          f"over {len(index)} documents")
+
+
+if __name__ == "__main__":
+    main()
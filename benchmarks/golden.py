@@ -0,0 +1,216 @@
+# Golden answers and per-stage timings of the answer cascade, as a regression
+# check: a corpus built from the data (every QA key, every stats entry, every
+# team and player of the goals table, goal counts, greetings, typos, off-topic,
+# non-English and keyword-less messages, ELIZA fallbacks) is answered with the
+# follow-ups seeded per question and compared with golden_answers.jsonl; the
+# time spent in each stage (harif.tracing) is compared with golden_timings.json.
+#
+#   python benchmarks/golden.py                    # exit 1 on a changed answer or a slower stage
+#   python benchmarks/golden.py --tolerance 0.5 --rounds 9
+#   python benchmarks/golden.py --record           # after an intended change: rewrite both files
+#   python benchmarks/golden.py --record-timings   # on another machine: new timings, same answers
+#
+# The same checks run as test cases under pytest (tests/test_golden.py).
+#
+# Every question is answered twice, by the engine (indexes, typo fixes, goal
+# counts) and by answer_QA with the plain linear searches, and both replies are
+# stored: an index or a faster search that changes what either path says fails.
+# A stage's time is its mean per answer that reached it, the best of --rounds
+# passes over the corpus; timings only compare on the machine they were recorded on.
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from harif.engine import HarifEngine, answer_QA, flatten_stats
+from harif.intents import INTENTS
+from harif.replies import EXTERNAL_KEYWORDS
+from harif.tracing import TRACER
+
+ANSWERS = Path(__file__).with_name("golden_answers.jsonl")
+TIMINGS = Path(__file__).with_name("golden_timings.json")
+SEED = 2022
+SLACK_MS = 0.002              # on top of --tolerance: a stage of a few microseconds is mostly timer noise
+
+TYPOS = ["goldn boot", "who won the champinship", "argentna", "mbape goals", "lusial stadium"]
+NON_ENGLISH = ["مرحبا", "من فاز بكأس العالم؟", "كم هدف سجل ميسي", "¿quién ganó el mundial?"]
+NO_KEYWORDS = ["the", "is it?", "what is the", "???"]
+FALLBACK = ["xyzzy plugh", "i feel a bit tired today", "my cat likes boxes", "sad"]
+
+
+def corpus(engine):
+    # (kind, question) pairs, the same for the same data
+    df = engine.df
+    items = [("qa", key) for key in engine.qa_data]
+    items += [("stats", key.replace("_", " ")) for key, _ in flatten_stats(engine.stats_data)]
+    teams = sorted(df["Team"].dropna().unique())
+    items += [("team", team) for team in teams]
+    items += [("player", player) for player in sorted(df["Player"].dropna().unique())]
+    items += [("aggregate", f"how many goals did {team} score") for team in teams]
+    items += [("greeting", phrase) for _, phrases, _, _ in INTENTS for phrase in phrases]
+    items += [("off_topic", f"what do you think about {word}") for word in sorted(EXTERNAL_KEYWORDS)]
+    items += [("typo", q) for q in TYPOS]
+    items += [("non_english", q) for q in NON_ENGLISH]
+    items += [("no_keywords", q) for q in NO_KEYWORDS]
+    items += [("fallback", q) for q in FALLBACK]
+    with open(Path(__file__).with_name("labeled_questions.jsonl"), encoding="utf-8") as f:
+        items += [("labeled", json.loads(line)["question"]) for line in f if line.strip()]
+    # a key can also be a team name etc.: the first kind listed keeps it
+    seen = set()
+    return [(kind, q) for kind, q in items if not (q in seen or seen.add(q))]
+
+
+def plain(value):
+    # a reply as it reads back from JSON (tuples become lists)
+    return json.loads(json.dumps(value, ensure_ascii=False, default=str))
+
+
+def answer_corpus(items, answer):
+    # [answer, follow_up] per question, random drawn from a seed of its own
+    replies = []
+    for _, question in items:
+        random.seed(f"{SEED}:{question}")
+        replies.append(plain(list(answer(question))))
+    return replies
+
+
+def stage_timings(items, answer, rounds):
+    # stage -> best mean ms over the rounds, plus "answer": the whole reply
+    best = {}
+    for _ in range(rounds):
+        TRACER.reset()
+        TRACER.enable()
+        start = time.perf_counter()
+        for _, question in items:
+            answer(question)
+        elapsed = time.perf_counter() - start
+        TRACER.disable()
+        means = {stage: s["mean_ms"] for stage, s in TRACER.snapshot()["stages"].items()}
+        means["answer"] = elapsed / len(items) * 1e3
+        for stage, ms in means.items():
+            best[stage] = min(best.get(stage, ms), ms)
+    TRACER.reset()
+    return {stage: round(ms, 5) for stage, ms in sorted(best.items())}
+
+
+def git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True)
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def read_golden():
+    with open(ANSWERS, encoding="utf-8") as f:
+        return {item["question"]: item for item in map(json.loads, filter(str.strip, f))}
+
+
+def read_timings():
+    with open(TIMINGS, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_golden(items, engine_replies, linear_replies):
+    with open(ANSWERS, "w", encoding="utf-8") as f:
+        for (kind, question), engine_reply, linear_reply in zip(items, engine_replies, linear_replies):
+            record = {"kind": kind, "question": question, "engine": engine_reply, "answer_QA": linear_reply}
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def answer_diffs(items, engine_replies, linear_replies):
+    golden = read_golden()
+    diffs = []
+    for (kind, question), engine_reply, linear_reply in zip(items, engine_replies, linear_replies):
+        item = golden.pop(question, None)
+        if item is None:
+            diffs.append(f"[{kind}] {question!r}: not in {ANSWERS.name}")
+            continue
+        for path, reply in (("engine", engine_reply), ("answer_QA", linear_reply)):
+            if reply != item[path]:
+                diffs.append(f"[{kind}] {question!r} ({path}):\n      was {item[path]!r}\n      now {reply!r}")
+    diffs += [f"[{item['kind']}] {q!r}: no longer in the corpus" for q, item in golden.items()]
+    return diffs
+
+
+def timing_regressions(timings, baseline, tolerance):
+    worse = []
+    for path, stages in timings.items():
+        for stage, ms in stages.items():
+            before = baseline.get(path, {}).get(stage)
+            if before is not None and ms > before * (1 + tolerance) + SLACK_MS:
+                worse.append(f"{path} {stage}: {before:.4f} -> {ms:.4f} ms")
+    return worse
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=5, help="passes over the corpus per path; the best counts")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="allowed relative slowdown of a stage")
+    parser.add_argument("--record", action="store_true", help="rewrite the golden answers and the timings")
+    parser.add_argument("--record-timings", action="store_true", help="rewrite the timings only")
+    parser.add_argument("--out", help="also write this run's timings as JSON here")
+    args = parser.parse_args()
+
+    # no response cache: every round searches the sources
+    engine = HarifEngine(cache_size=0).warm_up()
+    qa, stats, df = engine.qa_data, engine.stats_data, engine.df
+    linear = lambda text: answer_QA(text, qa, stats, df)
+    items = corpus(engine)
+    kinds = {}
+    for kind, _ in items:
+        kinds[kind] = kinds.get(kind, 0) + 1
+    print(f"{len(items)} questions: " + ", ".join(f"{n} {kind}" for kind, n in kinds.items()))
+
+    engine_replies = answer_corpus(items, engine.answer)
+    linear_replies = answer_corpus(items, linear)
+    timings = {"engine": stage_timings(items, engine.answer, args.rounds),
+               "answer_QA": stage_timings(items, linear, args.rounds)}
+    results = {
+        "version": {"git": git_revision(), "knowledge": engine.knowledge.version, "python": platform.python_version(),
+                    "machine": platform.machine()},
+        "rounds": args.rounds,
+        "timings_ms": timings,
+    }
+
+    print(f"{'stage':>12} {'engine ms':>10} {'answer_QA ms':>13}")
+    for stage in sorted(set(timings["engine"]) | set(timings["answer_QA"])):
+        cells = [timings[path].get(stage) for path in ("engine", "answer_QA")]
+        print(f"{stage:>12} " + " ".join(f"{'-' if ms is None else f'{ms:.4f}':>{w}}" for ms, w in zip(cells, (10, 13))))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"results written to {args.out}")
+
+    if args.record:
+        write_golden(items, engine_replies, linear_replies)
+        print(f"golden answers written to {ANSWERS}")
+    if args.record or args.record_timings:
+        with open(TIMINGS, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"timings written to {TIMINGS}")
+        return
+
+    diffs = answer_diffs(items, engine_replies, linear_replies)
+    baseline = read_timings()
+    worse = timing_regressions(timings, baseline["timings_ms"], args.tolerance)
+    if diffs:
+        print(f"{len(diffs)} ANSWERS CHANGED vs {ANSWERS.name}:\n  " + "\n  ".join(diffs))
+    if worse:
+        print(f"REGRESSION vs {TIMINGS.name} (recorded at {baseline['version']['git']}):\n  " + "\n  ".join(worse))
+    if diffs or worse:
+        sys.exit(1)
+    print(f"{len(items)} golden answers unchanged; no stage slower than {args.tolerance:.0%} "
+          f"vs {TIMINGS.name} (recorded at {baseline['version']['git']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+# Load test of the HTTP answer service (harif.server) on localhost, against
+# the Streamlit path (a chat message = one rerun of HarifS.py, via AppTest):
+# requests/s and tail latency.
+#
+#   python benchmarks/load_server.py
+#   python benchmarks/load_server.py --workers 1 4 --clients 8 --requests 2000 --batch 20
+#   python benchmarks/load_server.py --budget 1.5      # the async cascade, as the chat page answers
+#
+# Each worker count starts its own server on 127.0.0.1 and stops it
+# afterwards; clients are separate processes on keep-alive connections.
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from harif.timing import percentile
+
+HOST = "127.0.0.1"            # never anything but this machine
+
+
+def questions():
+    with open(Path(__file__).with_name("labeled_questions.jsonl"), encoding="utf-8") as f:
+        labeled = [json.loads(line)["question"] for line in f if line.strip()]
+    return labeled + ["hello", "thanks!", "مرحبا", "what about tennis", "goldn boot", "xyzzy plugh"]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind((HOST, 0))
+        return s.getsockname()[1]
+
+
+def start_server(port, workers, budget):
+    command = [sys.executable, "-m", "harif.server", "--host", HOST, "--port", str(port), "--workers", str(workers)]
+    if budget:
+        command += ["--budget", str(budget)]
+    server = subprocess.Popen(command, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            sys.exit(f"server exited: {server.stderr.read().decode()}")
+        try:
+            conn = http.client.HTTPConnection(HOST, port, timeout=1)
+            conn.request("GET", "/health")
+            if conn.getresponse().status == 200:
+                # the first worker that is up answers; give the others time to warm up too
+                time.sleep(0.5 * workers)
+                return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    sys.exit("server did not come up")
+
+
+def client(args):
+    # one keep-alive connection; latencies of count requests
+    port, count, batch, offset = args
+    pool = questions()
+    conn = http.client.HTTPConnection(HOST, port, timeout=30)
+    latencies, errors = [], 0
+    for i in range(count):
+        if batch > 1:
+            body = {"questions": [pool[(offset + i * batch + j) % len(pool)] for j in range(batch)]}
+        else:
+            body = {"question": pool[(offset + i) % len(pool)]}
+        start = time.perf_counter()
+        conn.request("POST", "/answer", json.dumps(body), {"Content-Type": "application/json"})
+        response = conn.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - start)
+        errors += response.status != 200
+    conn.close()
+    return latencies, errors
+
+
+def run_clients(port, clients, requests, batch):
+    per_client = max(1, requests // clients)
+    with multiprocessing.Pool(clients) as pool:
+        start = time.perf_counter()
+        results = pool.map(client, [(port, per_client, batch, c * 7) for c in range(clients)])
+        elapsed = time.perf_counter() - start
+    latencies = [t for lat, _ in results for t in lat]
+    return latencies, sum(e for _, e in results), elapsed
+
+
+def streamlit_latencies(messages):
+    # one chat session: set the chat input, rerun the whole script
+    from streamlit.testing.v1 import AppTest
+    pool = questions()
+    at = AppTest.from_file(str(ROOT / "HarifS.py"), default_timeout=60).run()
+    latencies = []
+    for i in range(messages):
+        start = time.perf_counter()
+        at.chat_input[0].set_value(pool[i % len(pool)]).run()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def row(name, answers, latencies, elapsed, errors=0):
+    p = lambda pct: percentile(latencies, pct) * 1e3
+    print(f"{name:>24} {answers / elapsed:>10,.0f} {p(50):>8.2f} {p(95):>8.2f} {p(99):>8.2f} {errors:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=8, help="client processes, one connection each")
+    parser.add_argument("--requests", type=int, default=4000, help="requests per run, over all clients")
+    parser.add_argument("--batch", type=int, default=20, help="questions per request in the batched run")
+    parser.add_argument("--budget", type=float, default=None, help="server answers with the async cascade")
+    parser.add_argument("--streamlit", type=int, default=100, help="chat messages through HarifS.py (0: skip)")
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} cores, {args.clients} clients, "
+          f"{'async cascade, budget ' + str(args.budget) + ' s' if args.budget else 'sync answers'}")
+    print(f"{'path':>24} {'answers/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for workers in args.workers:
+        port = free_port()
+        server = start_server(port, workers, args.budget)
+        try:
+            latencies, errors, elapsed = run_clients(port, args.clients, args.requests, 1)
+            row(f"http, {workers} worker(s)", len(latencies), latencies, elapsed, errors)
+            latencies, errors, elapsed = run_clients(port, args.clients, args.requests // args.batch, args.batch)
+            # latency per request of batch questions
+            row(f"  batch of {args.batch}", len(latencies) * args.batch, latencies, elapsed, errors)
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+    if args.streamlit:
+        # last: AppTest runs the page as __main__, which the client processes need unchanged
+        latencies = streamlit_latencies(args.streamlit)
+        row("streamlit rerun", len(latencies), latencies, sum(latencies))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+# Load test: N simulated chat users on a thread pool, each replaying the chat
+# page's flow (append the question to its messages, answer, append the reply and
+# follow-up) with a configurable mix of message kinds.
+#
+#   python benchmarks/load_test.py
+#   python benchmarks/load_test.py --users 200 --messages 50 --out load.json
+#   python benchmarks/load_test.py --mix qa=50,dataset=30,greeting=20 --target answer_QA
+#   python benchmarks/load_test.py --out new.json --compare old.json
+#
+# Reports throughput, latency percentiles per cascade branch and memory growth,
+# and saves everything as JSON; --compare exits with status 1 when p95 latency or
+# throughput got worse than --tolerance against an earlier run.
+import argparse
+import json
+import platform
+import random
+import resource
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from harif.engine import HarifEngine, answer_QA, flatten_stats
+from harif.history import ChatHistory
+from harif.intents import INTENT_MATCHER
+from harif.replies import EXTERNAL_KEYWORDS, get_random_response, is_english, is_external_topic
+from harif.search import extract_keywords
+from harif.timing import percentile
+
+LATENCY_WINDOW = 500          # same per-session windows as HarifS.py
+HISTORY_WINDOW = 20
+HISTORY_KEEP = 200
+
+DEFAULT_MIX = {"greeting": 15, "qa": 30, "stats": 5, "responses": 5, "aggregate": 10,
+               "dataset": 15, "eliza": 5, "non_english": 5, "off_topic": 10}
+
+GREETINGS = ["hello", "hi there", "hey!", "good morning", "good evening", "hi, how are you?",
+             "thanks", "thank you so much", "bye", "who are you?"]
+NON_ENGLISH = ["مرحبا", "من فاز بكأس العالم؟", "كم عدد الأهداف", "ما هو الفريق الفائز", "أين أقيمت البطولة"]
+NONSENSE = ["xyzzy plugh", "frobnicate the quux", "blorp zazzle", "qwerty uiop asdf", "lorem ipsum dolor"]
+
+
+def rss_mb():
+    # current resident memory; falls back to the peak where /proc is missing
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * resource.getpagesize() / 2**20
+    except OSError:
+        scale = 1 if platform.system() == "Darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2**20
+
+
+def branch_of(engine, text):
+    # which step of the cascade answers text, in the order run_cascade tries them
+    if INTENT_MATCHER.reply(text, fast_path_only=True):
+        return "greeting"
+    keywords = extract_keywords(text)
+    if not keywords:
+        return "no_keywords"
+    keywords = engine.correct_keywords(keywords)
+    english, external = is_english(text), is_external_topic(keywords)
+    if english and not external and engine.answer_aggregate(text, keywords):
+        return "aggregate"
+    if not english:
+        return "non_english"
+    if external:
+        return "off_topic"
+    if engine.search_qa(keywords):
+        return "qa"
+    if engine.search_stats(keywords):
+        return "stats"
+    if get_random_response(keywords):
+        return "responses"
+    if engine.search_dataset(keywords):
+        return "dataset"
+    return "eliza"
+
+
+def candidates(engine):
+    # messages meant for each branch; kept only where the cascade really takes that branch
+    kb = engine.knowledge
+    df = engine.df
+    pools = {
+        "greeting": GREETINGS,
+        "qa": [f"{key}?" for key in engine.qa_data] + [f"tell me the {key}" for key in engine.qa_data],
+        "stats": [f"{key}" for key, _ in flatten_stats(engine.stats_data)] + [f"stats {key}" for key in engine.stats_data],
+        "responses": [f"{key}" for key in kb.responses] + [f"{key} please" for key in kb.responses],
+        "aggregate": [f"how many goals did {t} score" for t in df["Team"].dropna().unique()]
+                     + [f"goals in group {g}" for g in "ABCDEFGH"]
+                     + [f"who scored after the {m}th minute" for m in (60, 75, 85)],
+        "dataset": [f"{p} {o}" for p, o in zip(df["Player"], df["Opponent"])],
+        "eliza": NONSENSE,
+        "non_english": NON_ENGLISH,
+        "off_topic": [f"what about {w}" for w in sorted(EXTERNAL_KEYWORDS)],
+    }
+    return {name: [m for m in dict.fromkeys(msgs) if branch_of(engine, m) == name] for name, msgs in pools.items()}
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True)
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def summary(latencies, elapsed=None):
+    result = {"count": len(latencies)}
+    if latencies:
+        result.update({f"p{p}_ms": percentile(latencies, p) * 1e3 for p in (50, 90, 95, 99)})
+        result["max_ms"] = max(latencies) * 1e3
+        result["mean_ms"] = sum(latencies) / len(latencies) * 1e3
+    if elapsed:
+        result["per_s"] = len(latencies) / elapsed
+    return result
+
+
+class SimulatedUser:
+    """One chat session: the same chat history and latency window as the Streamlit page."""
+
+    def __init__(self, answer, script, think):
+        self.answer = answer
+        self.script = script
+        self.think = think
+        self.messages = ChatHistory(window=HISTORY_WINDOW, keep=HISTORY_KEEP)
+        self.messages.append({"role": "assistant", "content": "Hello! ⚽️ Ask me anything about the World Cup"})
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.timings = []             # (branch, seconds)
+        self.errors = 0
+
+    def run(self):
+        for branch, text in self.script:
+            self.messages.append({"role": "user", "content": text})
+            start = time.perf_counter()
+            try:
+                answer, follow_up = self.answer(text)
+            except Exception:
+                self.errors += 1
+                continue
+            elapsed = time.perf_counter() - start
+            self.latencies.append(elapsed)
+            self.timings.append((branch, elapsed))
+            self.messages.append({"role": "assistant", "content": answer})
+            if follow_up:
+                self.messages.append({"role": "assistant", "content": follow_up})
+            if self.think:
+                time.sleep(random.uniform(0, 2 * self.think))
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--messages", type=int, default=40, help="messages per user")
+    parser.add_argument("--workers", type=int, default=None, help="threads (default: one per user, max 256)")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help="e.g. qa=30,dataset=20,greeting=10")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="mean pause between a user's messages")
+    parser.add_argument("--target", choices=["engine", "answer_QA"], default="engine")
+    parser.add_argument("--no-cache", action="store_true", help="turn the response cache off")
+    parser.add_argument("--retrieval", choices=["cascade", "ranked"], default="cascade")
+    parser.add_argument("--seed", type=int, default=2022)
+    parser.add_argument("--out", help="write the results as JSON here")
+    parser.add_argument("--compare", help="earlier results JSON to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative slowdown for --compare")
+    args = parser.parse_args()
+
+    rss_start = rss_mb()
+    engine = HarifEngine(cache_size=0 if args.no_cache else 2048, retrieval=args.retrieval).warm_up()
+    if args.target == "answer_QA":
+        # the original function, with the engine's indexes passed in like the page used to
+        qa, stats, df, qa_index, dataset_index = (engine.qa_data, engine.stats_data, engine.df,
+                                                  engine.qa_index, engine.dataset_index)
+        answer = lambda text: answer_QA(text, qa, stats, df, qa_index, dataset_index)
+    else:
+        answer = engine.answer
+
+    pools = candidates(engine)
+    mix = {name: w for name, w in args.mix.items() if w > 0}
+    unknown = set(mix) - set(pools)
+    if unknown:
+        parser.error(f"unknown branches in --mix: {', '.join(sorted(unknown))} (known: {', '.join(pools)})")
+    empty = [name for name in mix if not pools[name]]
+    for name in empty:
+        print(f"note: no message reaches the {name} branch with this data, dropped from the mix")
+        del mix[name]
+    names, weights = list(mix), list(mix.values())
+
+    rng = random.Random(args.seed)
+    users = []
+    for _ in range(args.users):
+        script = [(b, rng.choice(pools[b])) for b in rng.choices(names, weights, k=args.messages)]
+        users.append(SimulatedUser(answer, script, args.think_ms / 1e3))
+    rss_ready = rss_mb()
+
+    samples = []
+    done = threading.Event()
+
+    def sample_memory():
+        t0 = time.perf_counter()
+        while not done.wait(0.25):
+            samples.append((round(time.perf_counter() - t0, 2), round(rss_mb(), 1)))
+
+    monitor = threading.Thread(target=sample_memory, daemon=True)
+    monitor.start()
+    workers = args.workers or min(args.users, 256)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(SimulatedUser.run, users))
+    elapsed = time.perf_counter() - start
+    done.set()
+    monitor.join()
+    rss_end = rss_mb()
+
+    by_branch = defaultdict(list)
+    for user in users:
+        for branch, seconds in user.timings:
+            by_branch[branch].append(seconds)
+    every = [s for timings in by_branch.values() for s in timings]
+    session_messages = sum(len(u.messages) for u in users)
+
+    results = {
+        "version": {"git": git_revision(), "knowledge": engine.knowledge.version, "python": platform.python_version()},
+        "config": {k: v for k, v in vars(args).items() if k not in ("out", "compare")},
+        "workers": workers,
+        "elapsed_s": elapsed,
+        "throughput_per_s": len(every) / elapsed,
+        "errors": sum(u.errors for u in users),
+        "latency": summary(every),
+        "branches": {name: summary(by_branch[name], elapsed) for name in sorted(by_branch)},
+        "memory_mb": {"start": rss_start, "after_warm_up": rss_ready, "end": rss_end,
+                      "growth_during_run": rss_end - rss_ready,
+                      "per_user_kb": (rss_end - rss_ready) * 1024 / max(args.users, 1),
+                      "samples": samples},
+        "session_messages": session_messages,
+        "cache": engine.cache.stats(),
+    }
+
+    print(f"{args.users} users x {args.messages} messages on {workers} threads ({args.target}, "
+          f"cache {'off' if args.no_cache else 'on'}): {len(every)} answers in {elapsed:.2f} s "
+          f"-> {results['throughput_per_s']:,.0f} answers/s, {results['errors']} errors")
+    print(f"{'branch':>12} {'count':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for name, s in [("all", results["latency"])] + list(results["branches"].items()):
+        print(f"{name:>12} {s['count']:>7} {s['p50_ms']:>8.2f} {s['p95_ms']:>8.2f} {s['p99_ms']:>8.2f} {s['max_ms']:>8.1f}")
+    m = results["memory_mb"]
+    print(f"memory: {m['start']:.0f} MB at start, {m['after_warm_up']:.0f} MB warm, {m['end']:.0f} MB at the end "
+          f"({m['growth_during_run']:+.1f} MB, {m['per_user_kb']:.1f} KB/user, {session_messages} session messages)")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"results written to {args.out}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            old = json.load(f)
+        worse = []
+        if results["throughput_per_s"] < old["throughput_per_s"] * (1 - args.tolerance):
+            worse.append(f"throughput {old['throughput_per_s']:,.0f} -> {results['throughput_per_s']:,.0f}/s")
+        for name, s in [("all", results["latency"])] + list(results["branches"].items()):
+            before = old["latency"] if name == "all" else old["branches"].get(name)
+            if before and before.get("p95_ms") and s["p95_ms"] > before["p95_ms"] * (1 + args.tolerance):
+                worse.append(f"{name} p95 {before['p95_ms']:.2f} -> {s['p95_ms']:.2f} ms")
+        if worse:
+            print("REGRESSION vs " + args.compare + ":\n  " + "\n  ".join(worse))
+            sys.exit(1)
+        print(f"no regression vs {args.compare} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
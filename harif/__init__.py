@@ -0,0 +1,10 @@
+# Harif (حريف) — World Cup 2022 chatbot logic, usable without Streamlit.
+from harif.engine import HarifEngine, answer_QA, get_engine
+from harif.qa_index import QAIndex
+from harif.search import (
+    clean_text,
+    extract_keywords,
+    search_in_dataset,
+    search_in_qa,
+    search_in_stats,
+)
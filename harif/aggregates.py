@@ -0,0 +1,341 @@
+# Aggregate questions over the goals table ("how many goals did Morocco score",
+# "goals in group C", "who scored after the 90th minute", "match 18").
+#
+# Every group-by is computed once when the table is loaded; answering a
+# question is then a dict lookup or a binary search, whatever the table size.
+import re
+
+import numpy as np
+
+from harif.ranking import fold
+
+WORD_RE = re.compile(r"\w+")
+MINUTE_RE = re.compile(r"\b(after|before|since|from|in the first|in the last)\s+(?:the\s+)?(\d{1,3})(?:st|nd|rd|th)?\s*(?:minutes?|mins?|')")
+GROUP_RE = re.compile(r"\bgroup\s+([a-h])\b")
+MATCH_RE = re.compile(r"\bmatch\s+(?:number\s+|no\.?\s*|#)?(\d{1,4})\b")
+COUNT_RE = re.compile(r"\b(how many|number of|total|count)\b")
+CONCEDED_RE = re.compile(r"\b(concede|conceded)\b")
+AGAINST_RE = re.compile(r"\bagainst\b")
+GOAL_RE = re.compile(r"\b(goals?|scored?|scorers?|scoring)\b")
+
+MAX_LISTED = 5
+KINDS = ("team", "player", "stadium")
+
+
+def _ordinal(n):
+    if 10 <= n % 100 <= 20:
+        return f"{n}th"
+    return f"{n}{ {1: 'st', 2: 'nd', 3: 'rd'}.get(n % 10, 'th') }"
+
+
+def _goals(n):
+    return "1 goal" if n == 1 else f"{n} goals"
+
+
+def _curated_total(name, totals):
+    # the curated total for a team or player, by its full name or one of its
+    # words ("Kylian Mbappé" -> "mbappe goals"); None when there is none
+    if not totals:
+        return None
+    name = fold(name)
+    total = totals.get(name)
+    if total is None:
+        total = next((totals[w] for w in WORD_RE.findall(name) if w in totals), None)
+    return total
+
+
+def _scored(name, total):
+    return f"{name} scored {_goals(total)}" if isinstance(total, int) else f"{name}: {total}"
+
+
+def _counts(series):
+    # value -> count, as a plain dict for O(1) lookups
+    return {k: int(v) for k, v in series.value_counts().items() if v}
+
+
+def _nested_counts(df, outer, inner):
+    # outer value -> {inner value: count}
+    counts = {}
+    for (a, b), n in df.groupby([outer, inner], observed=True).size().items():
+        if n:
+            counts.setdefault(a, {})[b] = int(n)
+    return counts
+
+
+def _name_rank(kind, value):
+    # teams before players before stadiums, then a clean spelling over one
+    # with stray quotes or spaces ("'  Niclas Füllkrug"), then alphabetical
+    value = str(value)
+    return KINDS.index(kind), value != value.strip(" '"), value
+
+
+def _clean_players(df):
+    # one spelling per player: "' Ferran Torres" and "Ferran Torres" are one scorer
+    return df.assign(Player=df["Player"].str.strip(" '"))
+
+
+def _add_counts(counts, more):
+    for key, n in more.items():
+        counts[key] = counts.get(key, 0) + n
+
+
+class GoalAggregates:
+    """Per-team, per-player, per-match, per-stadium and per-group tables for the goals table.
+
+    add() folds in goals appended to the table later, touching only the new rows.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self.size = len(df)
+        df = _clean_players(df)
+        self.team_goals = _counts(df["Team"])
+        self.team_conceded = _counts(df["Opponent"])
+        self.player_goals = _counts(df["Player"])
+        self.player_team = df.drop_duplicates("Player").set_index("Player")["Team"].to_dict()
+        self.stadium_goals = _counts(df["Stadium"])
+        self.group_goals = _counts(df["Group"].dropna())
+
+        self.team_players = _nested_counts(df, "Team", "Player")
+        self.team_opponents = _nested_counts(df, "Team", "Opponent")
+        self.group_teams = _nested_counts(df.dropna(subset=["Group"]), "Group", "Team")
+        self.team_scorers, self.group_top_team = {}, {}
+        self._rank(self.team_players, self.group_teams)
+
+        # row positions of every match, for its score line and scorers: rows sorted
+        # by match number plus (start, end) per match, one sort instead of a dict of arrays
+        numbers = df["Match Number"].to_numpy()
+        self.match_order = np.argsort(numbers, kind="stable")
+        keys, starts = np.unique(numbers[self.match_order], return_index=True)
+        ends = np.append(starts[1:], len(numbers))
+        self.match_spans = dict(zip(keys.tolist(), zip(starts.tolist(), ends.tolist())))
+        self.match_added = {}                    # match number -> rows appended by add()
+
+        # plain lists for listing a handful of goals; picking rows out of the
+        # (arrow-backed) frame itself costs milliseconds on a big table, and
+        # add() extends a list without copying it
+        self.players = df["Player"].tolist()
+        self.teams = df["Team"].tolist()
+        self.minutes = df["Minute"].tolist()
+        minutes = df["Minute"].to_numpy()
+
+        # (minutes sorted, row of each), so "after the 90th minute" is a binary search;
+        # one tuple so a reader never pairs an old array with a new one
+        order = np.argsort(minutes, kind="stable")
+        self.minute_index = (minutes[order], order)
+
+        # lower-cased, accent-free names -> canonical name, for spotting them in a question
+        self.names = {}
+        self.max_name_words = 0
+        self._add_names(list(self.team_goals) + list(self.team_conceded), list(self.player_goals),
+                        list(self.stadium_goals))
+
+    def _rank(self, team_players, group_teams):
+        # refresh the top scorers of the given teams and the top team of the given groups
+        for team in team_players:
+            ranked = sorted(self.team_players[team].items(), key=lambda item: (-item[1], str(item[0])))
+            self.team_scorers[team] = ranked[:MAX_LISTED]
+        for group in group_teams:
+            team, n = min(self.group_teams[group].items(), key=lambda item: (-item[1], str(item[0])))
+            self.group_top_team[group] = (team, n)
+
+    def _add_names(self, teams, players, stadiums):
+        for kind, values in (("team", teams), ("player", players), ("stadium", stadiums)):
+            for value in values:
+                for alias in self._aliases(kind, value):
+                    current = self.names.get(alias)
+                    # the same winner whatever order names arrive in
+                    if current is None or _name_rank(kind, value) < _name_rank(*current):
+                        self.names[alias] = (kind, value)
+                        self.max_name_words = max(self.max_name_words, len(alias))
+
+    def add(self, df, start):
+        # count the goals of df from row position start on; df is the whole,
+        # already appended table. Not safe to call from two threads at once
+        new = df.iloc[start:]
+        if new.empty:
+            return
+        self.df = df
+        new = _clean_players(new)
+        players = new["Player"].tolist()
+        teams = new["Team"].tolist()
+        minutes = new["Minute"].to_numpy()
+
+        counts = {"team": _counts(new["Team"]), "opponent": _counts(new["Opponent"]),
+                  "player": _counts(new["Player"]), "stadium": _counts(new["Stadium"])}
+        self._add_names([t for t in counts["team"].keys() | counts["opponent"].keys()
+                         if t not in self.team_goals and t not in self.team_conceded],
+                        [p for p in counts["player"] if p not in self.player_goals],
+                        [s for s in counts["stadium"] if s not in self.stadium_goals])
+        _add_counts(self.team_goals, counts["team"])
+        _add_counts(self.team_conceded, counts["opponent"])
+        _add_counts(self.player_goals, counts["player"])
+        _add_counts(self.stadium_goals, counts["stadium"])
+        _add_counts(self.group_goals, _counts(new["Group"].dropna()))
+        for player, team in zip(players, teams):
+            self.player_team.setdefault(player, team)
+
+        team_players = _nested_counts(new, "Team", "Player")
+        for team, counts in _nested_counts(new, "Team", "Opponent").items():
+            _add_counts(self.team_opponents.setdefault(team, {}), counts)
+        group_teams = _nested_counts(new.dropna(subset=["Group"]), "Group", "Team")
+        for team, counts in team_players.items():
+            _add_counts(self.team_players.setdefault(team, {}), counts)
+        for group, counts in group_teams.items():
+            _add_counts(self.group_teams.setdefault(group, {}), counts)
+        self._rank(team_players, group_teams)
+
+        for number, rows in new.groupby("Match Number").indices.items():
+            number = int(number)
+            rows = rows.astype(np.int64) + start
+            if number in self.match_added:
+                rows = np.concatenate([self.match_added[number], rows])
+            self.match_added[number] = rows
+
+        # the row arrays grow before the minute index points at the new rows
+        self.players.extend(players)
+        self.teams.extend(teams)
+        self.minutes.extend(minutes.tolist())
+        sorted_minutes, order = self.minute_index
+        new_order = np.argsort(minutes, kind="stable")
+        at = np.searchsorted(sorted_minutes, minutes[new_order], side="right")
+        self.minute_index = (np.insert(sorted_minutes, at, minutes[new_order]), np.insert(order, at, new_order + start))
+        self.size = len(df)
+
+    def _aliases(self, kind, value):
+        words = tuple(WORD_RE.findall(fold(value)))
+        if not words:
+            return
+        yield words
+        if kind == "player" and len(words) > 1:
+            yield words[-1:]                     # "mbappe"
+        if kind == "stadium":
+            name = tuple(WORD_RE.findall(fold(str(value).split(",")[0])))
+            yield name                           # "al bayt stadium"
+            if name and name[-1] == "stadium":
+                yield name[:-1]                  # "al bayt"
+            if name and len(name[0]) > 3 and name[0] != "stadium":
+                yield name[:1] + ("stadium",)    # "lusail stadium"
+                yield name[:1]                   # "lusail"
+
+    def find_names(self, text):
+        # (kind, canonical name) for every team/player/stadium mentioned, longest match first
+        words = WORD_RE.findall(text)
+        found, i = [], 0
+        while i < len(words):
+            for n in range(min(self.max_name_words, len(words) - i), 0, -1):
+                hit = self.names.get(tuple(words[i:i + n]))
+                if hit:
+                    found.append(hit)
+                    i += n
+                    break
+            else:
+                i += 1
+        return found
+
+    def answer(self, question, curated_totals=None):
+        # text answer for an aggregate question, or None when it isn't one.
+        # curated_totals: folded team or player name ("france", "mbappe") ->
+        # tournament total to give instead of the table's count
+        text = fold(question)
+        if not GOAL_RE.search(text):
+            return None
+
+        m = MINUTE_RE.search(text)
+        if m:
+            return self.goals_by_minute(m.group(1), int(m.group(2)))
+        m = GROUP_RE.search(text)
+        if m:
+            return self.goals_in_group(m.group(1).upper())
+        m = MATCH_RE.search(text)
+        if m:
+            return self.match_summary(int(m.group(1)))
+
+        names = self.find_names(text)
+        for kind, name in names:
+            if kind == "stadium":
+                return self.goals_at_stadium(name)
+        if not COUNT_RE.search(text):
+            return None
+        # in the order named; the corrected keywords after the question repeat names
+        teams = list(dict.fromkeys(name for kind, name in names if kind == "team"))
+        if teams:
+            if CONCEDED_RE.search(text):
+                return self.goals_conceded(teams[0])
+            if AGAINST_RE.search(text):
+                # "did Morocco score against Canada"; with no second team, leave it to the cascade
+                return self.goals_against(teams[0], teams[1]) if len(teams) > 1 else None
+            total = _curated_total(teams[0], curated_totals)
+            if total is not None:
+                return _scored(teams[0], total)
+            return self.goals_by_team(teams[0])
+        for kind, name in names:
+            if kind == "player":
+                total = _curated_total(name, curated_totals)
+                return self.goals_by_player(name) if total is None else _scored(name, total)
+        return None
+
+    def goals_by_team(self, team):
+        n = self.team_goals.get(team, 0)
+        scorers = ", ".join(f"{p} ({g})" for p, g in self.team_scorers.get(team, []))
+        return f"{team} scored {_goals(n)} in the goals table" + (f" — top scorers: {scorers}" if scorers else "")
+
+    def goals_conceded(self, team):
+        return f"{team} conceded {_goals(self.team_conceded.get(team, 0))} in the goals table"
+
+    def goals_against(self, team, opponent):
+        n = self.team_opponents.get(team, {}).get(opponent, 0)
+        return f"{team} scored {_goals(n)} against {opponent} in the goals table"
+
+    def goals_by_player(self, player):
+        team = self.player_team.get(player)
+        who = f"{player} ({team})" if team else player
+        return f"{who} scored {_goals(self.player_goals.get(player, 0))} in the goals table"
+
+    def goals_at_stadium(self, stadium):
+        n = self.stadium_goals.get(stadium, 0)
+        return f"{_goals(n)} {'was' if n == 1 else 'were'} scored at {stadium}"
+
+    def goals_in_group(self, group):
+        n = self.group_goals.get(group, 0)
+        top = self.group_top_team.get(group)
+        extra = f" — most by {top[0]} ({top[1]})" if top else ""
+        return f"{_goals(n)} {'was' if n == 1 else 'were'} scored in group {group}{extra}"
+
+    def match_summary(self, number):
+        span = self.match_spans.get(number)
+        added = self.match_added.get(number)
+        if span is None and added is None:
+            return f"The goals table has no goals for match {number}"
+        rows = self.match_order[span[0]:span[1]] if span else np.empty(0, dtype=np.int64)
+        if added is not None:
+            rows = np.concatenate([rows, added])
+        first = self.df.iloc[rows[0]]
+        return (f"Match {number}: {first['Team']} {first['Team_Score']}-{first['Opponent_Score']} "
+                f"{first['Opponent']}, {first['Date']} at {first['Stadium']}. Scorers: {self._list_goals(rows)}")
+
+    def _list_goals(self, rows):
+        return ", ".join(f"{self.players[i]} ({self.teams[i]}, {self.minutes[i]}')" for i in rows)
+
+    def goals_by_minute(self, direction, minute):
+        sorted_minutes, order = self.minute_index
+        if direction in ("after", "since", "from", "in the last"):
+            if direction == "in the last":
+                minute = 90 - minute
+            side = "left" if direction in ("since", "from") else "right"
+            start = np.searchsorted(sorted_minutes, minute, side=side)
+            positions = order[start:][::-1]                   # latest first
+            if direction in ("since", "from"):
+                when = f"from the {_ordinal(minute)} minute on"    # that minute included
+            else:
+                when = f"after the {_ordinal(minute)} minute"
+        else:
+            end = np.searchsorted(sorted_minutes, minute, side="left")
+            positions = order[:end]                           # earliest first
+            when = f"before the {_ordinal(minute)} minute"
+        if len(positions) == 0:
+            return f"No goals in the goals table were scored {when}"
+        listed = self._list_goals(positions[:MAX_LISTED])
+        more = f" and {len(positions) - MAX_LISTED} more" if len(positions) > MAX_LISTED else ""
+        n = len(positions)
+        return f"{_goals(n)} {'was' if n == 1 else 'were'} scored {when}: {listed}{more}"
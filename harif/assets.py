@@ -0,0 +1,61 @@
+# Images for the page, resized once to the width they are shown at.
+#
+# st.image reads and re-encodes the file it is given on every rerun of every
+# session, and the browser downloads it at full size. resized_image() writes a
+# copy at the display width next to the original (football-rb.400w.png), kept
+# until the original changes, and holds its bytes in memory for the process.
+import io
+import os
+import threading
+from pathlib import Path
+
+SIDEBAR_IMAGE_WIDTH = 400     # px; the sidebar is ~300 px wide, a little extra for high-DPI screens
+
+_images = {}                  # (path, width) -> (original's mtime_ns, bytes)
+_images_lock = threading.Lock()
+
+
+def cached_path(path, width):
+    path = Path(path)
+    return path.with_name(f"{path.stem}.{width}w.png")
+
+
+def _resize(path, width):
+    # PNG bytes of the image scaled down to width (never up), alpha kept
+    from PIL import Image      # installed with streamlit; only needed when the copy is (re)built
+    with Image.open(path) as image:
+        if image.width > width:
+            image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+        out = io.BytesIO()
+        image.save(out, "PNG", optimize=True)
+    return out.getvalue()
+
+
+def resized_image(path, width=SIDEBAR_IMAGE_WIDTH):
+    # the image at width as PNG bytes: from memory, else the copy on disk, else built now
+    path = Path(path)
+    mtime_ns = path.stat().st_mtime_ns
+    entry = _images.get((path, width))
+    if entry is not None and entry[0] == mtime_ns:
+        return entry[1]
+    with _images_lock:
+        entry = _images.get((path, width))
+        if entry is None or entry[0] != mtime_ns:
+            copy = cached_path(path, width)
+            try:
+                fresh = copy.stat().st_mtime_ns >= mtime_ns
+            except OSError:
+                fresh = False
+            if fresh:
+                data = copy.read_bytes()
+            else:
+                data = _resize(path, width)
+                try:
+                    # written aside and renamed, so another process never reads half a file
+                    tmp = copy.with_name(f"{copy.name}.{os.getpid()}.tmp")
+                    tmp.write_bytes(data)
+                    os.replace(tmp, copy)
+                except OSError:
+                    pass      # read-only app folder: this process keeps its copy in memory
+            entry = _images[(path, width)] = (mtime_ns, data)
+    return entry[1]
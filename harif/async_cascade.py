@@ -0,0 +1,191 @@
+# The answer cascade with its sources searched at the same time.
+#
+# QA, stats, canned replies and the goals table each run in a worker thread
+# with their own timeout, and the highest-priority answer that arrives within
+# the latency budget (which starts once the in-memory gates are done) wins, exactly the one the sync cascade would pick when
+# every source is on time. A slow or failing source is skipped (the ones after
+# it still answer) and when nothing arrives in time ELIZA replies, as for a
+# question nothing matched. Answers given while a higher source was missing
+# are not cached.
+#
+# The sources are plain functions, so the threads pay off when one blocks (a
+# file, a network lookup); in-memory lookups gain nothing under the GIL. The
+# sync run_cascade / answer_QA are unchanged; HarifEngine.answer_async uses this.
+import asyncio
+import logging
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from harif.cache import MISSING
+from harif.engine import cache_key, cascade_gates, gate_reply
+from harif.replies import eliza_reply, get_follow_up, get_random_response
+from harif.search import format_row, search_in_dataset, search_in_qa, search_in_stats
+from harif.tracing import TRACER
+
+log = logging.getLogger(__name__)
+
+LATENCY_BUDGET = 1.5          # seconds for the sources, once the gates are done
+SOURCE_TIMEOUTS = {"qa": 0.5, "stats": 0.5, "responses": 0.5, "dataset": 1.0, "semantic": 0.5}
+SOURCE_WORKERS = 16
+MAX_OVERDUE = 4               # calls of one source still running past their timeout before new ones skip it
+
+# fn(keywords) -> answer or None; format turns a hit into the reply text;
+# cacheable False for sources that answer differently every time
+Source = namedtuple("Source", "name fn timeout format cacheable", defaults=(None, True))
+
+_executor = None
+_executor_lock = threading.Lock()
+_overdue = {}                 # source name -> calls running past their timeout
+_overdue_lock = threading.Lock()
+
+
+def get_executor():
+    # one worker pool per process for every source call
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=SOURCE_WORKERS, thread_name_prefix="harif-source")
+    return _executor
+
+
+def default_sources(search_qa, search_stats, search_dataset, timeouts=None, search_semantic=None, knowledge=None):
+    # the sync cascade's sources, in its order, with SOURCE_TIMEOUTS unless overridden;
+    # canned replies from knowledge (an edition's), the shared knowledge base when None
+    timeouts = {**SOURCE_TIMEOUTS, **(timeouts or {})}
+    sources = [
+        Source("qa", search_qa, timeouts["qa"]),
+        Source("stats", search_stats, timeouts["stats"]),
+        # canned replies are drawn at random on every call, don't freeze one in a cache
+        Source("responses", lambda keywords: get_random_response(keywords, knowledge), timeouts["responses"],
+               cacheable=False),
+        Source("dataset", search_dataset, timeouts["dataset"], format_row),
+    ]
+    if search_semantic is not None:
+        sources.append(Source("semantic", search_semantic, timeouts["semantic"]))
+    return sources
+
+
+def _call(source, keywords, late):
+    # late[0] is set by the waiter that gave up on this call
+    try:
+        return source.fn(keywords)
+    finally:
+        with _overdue_lock:
+            if late[0]:
+                _overdue[source.name] -= 1
+            late[0] = None
+
+
+def _give_up(source, late):
+    # count the call as overdue if it is still running
+    with _overdue_lock:
+        if late[0] is False:
+            late[0] = True
+            _overdue[source.name] = _overdue.get(source.name, 0) + 1
+
+
+def _submit(loop, source, keywords):
+    # (future, late flag) for the call, or None while the source has too many
+    # calls hanging: a stuck source should not take every worker thread
+    with _overdue_lock:
+        if _overdue.get(source.name, 0) >= MAX_OVERDUE:
+            return None
+    late = [False]
+    future = loop.run_in_executor(get_executor(), _call, source, keywords, late)
+    # a source nobody waits for any more may still fail; don't log it as unhandled
+    future.add_done_callback(lambda f: f.cancelled() or f.exception())
+    return future, late
+
+
+async def search_sources(sources, keywords, deadline, trace=None):
+    # (answer, wants_follow_up, cacheable) from the first source in order that
+    # answers in time; all of them are started at once
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    calls = [(source, _submit(loop, source, keywords)) for source in sources]
+    complete = True
+    for source, call in calls:
+        if call is None:
+            log.warning("skipping source %s: %d calls still running past their timeout", source.name, MAX_OVERDUE)
+            complete = False
+            continue
+        future, late = call
+        remaining = min(deadline, start + source.timeout) - loop.time()
+        try:
+            answer = await asyncio.wait_for(asyncio.shield(future), timeout=max(remaining, 0))
+        except asyncio.TimeoutError:
+            log.info("source %s gave no answer within %.0f ms", source.name, source.timeout * 1e3)
+            _give_up(source, late)
+            complete = False
+            continue
+        except Exception:
+            log.exception("source %s failed", source.name)
+            complete = False
+            continue
+        if answer:
+            if trace is not None:
+                trace.mark(source.name, hit=True)
+            if source.format is not None:
+                answer = source.format(answer)
+            return answer, True, complete and source.cacheable
+    if trace is not None:
+        trace.mark("sources")
+    return None, False, complete
+
+
+async def run_cascade_async(user_input, sources, cache=None, correct=None, answer_aggregate=None,
+                            budget=LATENCY_BUDGET, fallback=eliza_reply, knowledge=None):
+    # run_cascade with concurrent sources; same (answer, follow_up) result.
+    # budget is for the sources, counted from when the gates are done: on a cold
+    # engine the gates build the indexes, which must not eat the sources' time
+    loop = asyncio.get_running_loop()
+    trace = TRACER.begin(user_input) if TRACER.active else None
+    try:
+        # greeting, keywords, typo fixes and aggregates are in-memory steps, but
+        # the first call builds indexes, so they too run off the event loop
+        reply, gates = await loop.run_in_executor(get_executor(), cascade_gates, user_input, correct,
+                                                  answer_aggregate, trace, knowledge)
+        if reply is not None:
+            return reply
+        keywords, english, external = gates
+        deadline = loop.time() + budget
+
+        cached = MISSING
+        if cache is not None:
+            key = cache_key(keywords, english, external)
+            generation = cache.generation
+            cached = cache.get(key)
+            if trace is not None:
+                trace.mark("cache", hit=cached is not MISSING)
+        if cached is MISSING:
+            result = gate_reply(english, external) or await search_sources(sources, keywords, deadline, trace)
+            answer, follow, cacheable = result
+            if cache is not None and cacheable:
+                cache.put(key, (answer, follow), generation)
+        else:
+            answer, follow = cached
+
+        if answer is None:
+            if fallback is None:
+                return None, None
+            reply = fallback(user_input)
+            if trace is not None:
+                trace.mark("eliza", hit=True)
+            return reply, None
+        return answer, (get_follow_up(keywords, knowledge) if follow else None)
+    finally:
+        if trace is not None:
+            TRACER.end(trace)
+
+
+async def answer_QA_async(user_input, qa_data, stats_data, df, qa_index=None, dataset_index=None,
+                          budget=LATENCY_BUDGET, timeouts=None):
+    # answer_QA's signature, sources searched concurrently
+    search_qa = qa_index.search if qa_index is not None else (lambda keywords: search_in_qa(keywords, qa_data))
+    search_dataset = (dataset_index.search if dataset_index is not None
+                      else (lambda keywords: search_in_dataset(keywords, df)))
+    sources = default_sources(search_qa, lambda keywords: search_in_stats(keywords, stats_data), search_dataset,
+                              timeouts)
+    return await run_cascade_async(user_input, sources, budget=budget)
@@ -0,0 +1,151 @@
+# Answer a whole file of questions at once, optionally across a process pool.
+#
+#   python -m harif.batch questions.txt
+#   python -m harif.batch chat_log.jsonl --workers 8 --seed 7 -o answers.jsonl
+#
+# Input is one question per line, or JSON lines (a string, or an object with a
+# "question" / "text" / "content" field) when the file ends in .jsonl/.json.
+# Output is one JSON object per question, in input order.
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+
+from harif.engine import HarifEngine, get_engine
+from harif.timing import summarize
+
+QUESTION_FIELDS = ("question", "text", "content")
+
+# set in the parent right before the pool starts so forked workers inherit the
+# already-built engine (knowledge base and indexes) instead of receiving a copy
+_worker_engine = None
+_worker_seed = None
+
+
+def read_questions(lines, jsonl=False):
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if not jsonl:
+            yield line
+            continue
+        item = json.loads(line)
+        if isinstance(item, dict):
+            item = next((item[f] for f in QUESTION_FIELDS if f in item), None)
+        if isinstance(item, str) and item.strip():
+            yield item
+
+
+def _plain(value):
+    # dict copies of the (read-only, unpicklable) mappingproxies of a knowledge base
+    if isinstance(value, Mapping):
+        return {key: _plain(val) for key, val in value.items()}
+    return value
+
+
+def _init_worker(knowledge_path, qa_data, stats_data, csv_path, seed):
+    global _worker_engine, _worker_seed
+    _worker_seed = seed
+    if _worker_engine is None:
+        # spawn start method: nothing inherited, build once for this worker; the shared
+        # knowledge base (qa_data None) is read from its file, as in the parent
+        _worker_engine = HarifEngine(qa_data, stats_data, csv_path, knowledge_path=knowledge_path).warm_up()
+
+
+def _answer_one(item):
+    i, question = item
+    if _worker_seed is not None:
+        # seeded per question, so follow-ups don't depend on which worker ran it
+        random.seed(f"{_worker_seed}:{i}")
+    start = time.perf_counter()
+    answer, follow_up = _worker_engine.answer(question)
+    return {
+        "index": i,
+        "question": question,
+        "answer": answer,
+        "follow_up": follow_up,
+        "latency_ms": (time.perf_counter() - start) * 1e3,
+    }
+
+
+def answer_batch(questions, workers=None, seed=None, engine=None, chunksize=None):
+    """Yield one result dict per question, in input order.
+
+    workers=None uses every core, 0 or 1 answers inline in this process.
+    """
+    global _worker_engine, _worker_seed
+    engine = (engine or get_engine()).warm_up()
+    items = list(enumerate(questions))
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers <= 1 or len(items) <= 1:
+        _worker_engine, _worker_seed = engine, seed
+        try:
+            yield from map(_answer_one, items)
+        finally:
+            _worker_engine = _worker_seed = None
+        return
+
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else None)
+    chunksize = chunksize or max(1, len(items) // (workers * 8))
+    _worker_engine = engine
+    if engine.shared_knowledge:
+        knowledge = (engine.knowledge_path, None, None)
+    else:
+        knowledge = (None, _plain(engine.qa_data), _plain(engine.stats_data))
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(*knowledge, engine.csv_path, seed),
+        ) as pool:
+            yield from pool.map(_answer_one, items, chunksize=chunksize)
+    finally:
+        _worker_engine = _worker_seed = None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Answer a file of questions with Harif.")
+    parser.add_argument("path", help="questions file (one per line, or .jsonl); '-' reads stdin")
+    parser.add_argument("-o", "--output", help="write JSON lines here instead of stdout")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="process pool size (default: all cores)")
+    parser.add_argument("--seed", type=int, default=None, help="seed follow-up selection for comparable runs")
+    parser.add_argument("--jsonl", action="store_true", help="treat input as JSON lines regardless of extension")
+    args = parser.parse_args(argv)
+
+    jsonl = args.jsonl or args.path.endswith((".jsonl", ".json"))
+    if args.path == "-":
+        questions = list(read_questions(sys.stdin, jsonl))
+    else:
+        with open(args.path, encoding="utf-8") as f:
+            questions = list(read_questions(f, jsonl))
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    latencies = []
+    start = time.perf_counter()
+    try:
+        for result in answer_batch(questions, workers=args.workers, seed=args.seed):
+            latencies.append(result["latency_ms"] / 1e3)
+            out.write(json.dumps(result, ensure_ascii=False, default=str) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.perf_counter() - start
+    stats = summarize(latencies)
+    if stats["count"]:
+        print(f"{stats['count']} questions in {elapsed:.2f} s ({stats['count'] / elapsed:,.0f}/s), "
+              f"p50 {stats['p50_ms']:.2f} ms, p95 {stats['p95_ms']:.2f} ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
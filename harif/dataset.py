@@ -0,0 +1,264 @@
+import codecs
+import hashlib
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# every text column of the goals table has few distinct values, so they are
+# stored once per value instead of once per row
+GOALS_COLUMNS = ("Match Number", "Team", "Player", "Minute", "Opponent", "Date", "Stadium", "Group", "Day", "Time",
+                 "Team_Role", "Team_Score", "Opponent_Score")
+CATEGORY_COLUMNS = ("Team", "Player", "Opponent", "Date", "Stadium", "Group", "Day", "Time", "Team_Role")
+INT_COLUMNS = {"Match Number": "int16", "Minute": "int16", "Team_Score": "int8", "Opponent_Score": "int8"}
+CACHE_VERSION = 1
+
+
+def read_csv(p):
+    for enc in ("utf-8", "cp1252"):
+        try:
+            return pd.read_csv(p, encoding=enc)
+        except Exception:
+            pass
+    raise FileNotFoundError(f"Could not read: {p}")
+
+
+def detect_encoding(path, chunk_size=1 << 20):
+    # (encoding, sha256) from a single pass over the file
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    digest = hashlib.sha256()
+    encoding = "utf-8"
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+            if encoding == "utf-8":
+                try:
+                    decoder.decode(chunk)
+                except UnicodeDecodeError:
+                    encoding = "cp1252"
+    if encoding == "utf-8":
+        try:
+            decoder.decode(b"", final=True)
+        except UnicodeDecodeError:
+            encoding = "cp1252"
+    return encoding, digest.hexdigest()
+
+
+def read_goals_csv(path, encoding):
+    # the CSV with compact dtypes; the values (and so every answer) are unchanged
+    df = pd.read_csv(path, encoding=encoding, dtype={c: "category" for c in CATEGORY_COLUMNS})
+    for col, dtype in INT_COLUMNS.items():
+        if col in df.columns and pd.api.types.is_integer_dtype(df[col]) and len(df):
+            info = np.iinfo(dtype)
+            if info.min <= df[col].min() and df[col].max() <= info.max:
+                df[col] = df[col].astype(dtype)
+    if "Date" in df.columns:
+        # "Nov/20" has no year; order the categories by calendar day so sorting,
+        # min() and max() on the column are chronological
+        dates = df["Date"].cat.categories
+        days = pd.Series(pd.to_datetime(dates, format="%b/%d", errors="coerce"))
+        order = days.sort_values(kind="stable", na_position="last").index
+        df["Date"] = df["Date"].cat.reorder_categories(dates[order], ordered=True)
+    return df
+
+
+def empty_goals():
+    # a goals table with no rows, for an edition without a goals CSV (live goals can still be added)
+    return pd.DataFrame({col: pd.Series(dtype="category" if col in CATEGORY_COLUMNS else INT_COLUMNS[col])
+                         for col in GOALS_COLUMNS})
+
+
+def cache_paths(path):
+    path = Path(path)
+    return path.with_suffix(".parquet"), path.with_suffix(".cache.json")
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get("version") == CACHE_VERSION else None
+
+
+def _write_meta(meta_path, meta):
+    tmp = meta_path.with_name(meta_path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(tmp, meta_path)
+
+
+def _write_cache(df, parquet_path, meta_path, meta):
+    # temp file + rename, so a reader never sees half a cache
+    try:
+        tmp = parquet_path.with_name(parquet_path.name + ".tmp")
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, parquet_path)
+        _write_meta(meta_path, meta)
+    except (ImportError, OSError):
+        # no pyarrow or a read-only folder: the CSV is simply parsed every time
+        pass
+
+
+def _read_cache(parquet_path):
+    try:
+        return pd.read_parquet(parquet_path, memory_map=True)
+    except (ImportError, OSError):
+        return None
+
+
+def load_goals(path, cache=True):
+    # the goals table with compact dtypes, from a parquet copy next to the CSV
+    # while the CSV is unchanged (same size and mtime, or same sha256 after a touch)
+    path = Path(path)
+    stat = path.stat()
+    parquet_path, meta_path = cache_paths(path)
+    meta = _read_meta(meta_path) if cache else None
+    if meta and (meta["size"], meta["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+        df = _read_cache(parquet_path)
+        if df is not None:
+            return df
+
+    encoding, digest = detect_encoding(path)
+    new_meta = {"version": CACHE_VERSION, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                "sha256": digest, "encoding": encoding}
+    if meta and meta["sha256"] == digest:
+        df = _read_cache(parquet_path)
+        if df is not None:
+            try:
+                _write_meta(meta_path, new_meta)
+            except OSError:
+                pass
+            return df
+
+    df = read_goals_csv(path, encoding)
+    if cache:
+        _write_cache(df, parquet_path, meta_path, new_meta)
+    return df
+
+
+def append_rows(df, rows):
+    # df with rows (a DataFrame or a list of dicts) added at the end, keeping
+    # df's columns and dtypes; categories are only ever added, never recoded
+    new = rows if isinstance(rows, pd.DataFrame) else pd.DataFrame.from_records(list(rows))
+    new = new.reindex(columns=df.columns).reset_index(drop=True)
+    columns = {}
+    for col in df.columns:
+        old, add = df[col], new[col]
+        if isinstance(old.dtype, pd.CategoricalDtype):
+            unseen = pd.Index(add.dropna().unique()).difference(old.cat.categories)
+            if len(unseen):
+                old = old.cat.add_categories(unseen)
+            add = add.astype(old.dtype)
+        elif pd.api.types.is_integer_dtype(old.dtype):
+            add = pd.to_numeric(add)
+            if pd.api.types.is_integer_dtype(add.dtype) and len(add):
+                info = np.iinfo(old.dtype)
+                if info.min <= add.min() and add.max() <= info.max:
+                    add = add.astype(old.dtype)
+        columns[col] = pd.concat([old, add], ignore_index=True)
+    return pd.DataFrame(columns)
+
+
+def build_corpus(df):
+    # one lower-cased "row as text" string per row, same text the old
+    # df.astype(str).apply(' '.join) produced, but built column by column
+    if len(df.columns) == 0:
+        corpus = pd.Series("", index=df.index)
+    else:
+        # fillna: newer pandas keeps NaN through astype(str), older ones wrote "nan"
+        columns = [df[c].astype(str).fillna("nan") for c in df.columns]
+        corpus = columns[0]
+        for col in columns[1:]:
+            corpus = corpus + " " + col
+        corpus = corpus.str.lower()
+    return corpus.reset_index(drop=True)
+
+
+def build_postings(corpus):
+    # token -> sorted row positions, for every whitespace-separated token in the corpus
+    tokens = corpus.str.split().explode().dropna()
+    codes, vocab = pd.factorize(tokens)
+    rows = tokens.index.to_numpy()
+    # sort by (token, row) and drop repeats of a token inside the same row
+    order = np.lexsort((rows, codes))
+    codes, rows = codes[order], rows[order]
+    keep = np.ones(len(rows), dtype=bool)
+    keep[1:] = (codes[1:] != codes[:-1]) | (rows[1:] != rows[:-1])
+    codes, rows = codes[keep], rows[keep]
+    bounds = np.flatnonzero(np.diff(codes)) + 1
+    postings = np.split(rows, bounds) if len(rows) else []
+    return list(vocab), postings
+
+
+class DatasetIndex:
+    """The goals table plus its search corpus, built once per loaded CSV.
+
+    A keyword without spaces can only match inside a single token of a row's
+    text, so the rows containing it are the union of the postings of every
+    vocabulary token that contains it. The vocabulary is much smaller than the
+    table, so lookups never loop over rows.
+    """
+
+    def __init__(self, df, cache_size=4096):
+        self.df = df
+        self.corpus = build_corpus(df)
+        self.vocab, self.postings = build_postings(self.corpus)
+        self.token_ids = {token: i for i, token in enumerate(self.vocab)}
+        # rows a search may look at; set last by append(), so a search running
+        # alongside an append sees either the old rows or all of the new ones
+        self.size = len(df)
+        self.rows_with = lru_cache(maxsize=cache_size)(self._rows_with)
+
+    def __len__(self):
+        return self.size
+
+    def _rows_with(self, kw, size):
+        if not kw or any(ch.isspace() for ch in kw):
+            mask = self.corpus.iloc[:size].str.contains(kw, regex=False).to_numpy(dtype=bool, na_value=False)
+            return np.flatnonzero(mask)
+        hits = [self.postings[i] for i, token in enumerate(self.vocab) if kw in token]
+        if not hits:
+            return np.empty(0, dtype=np.int64)
+        rows = np.unique(np.concatenate(hits))
+        return rows[:np.searchsorted(rows, size)]
+
+    def append(self, rows):
+        # index new goal rows without touching the ones already indexed; only
+        # the tokens of the new rows are visited. Not safe to call from two
+        # threads at once (the engine serialises appends)
+        start = self.size
+        self.df = append_rows(self.df, rows)
+        added = build_corpus(self.df.iloc[start:])
+        self.corpus = pd.concat([self.corpus, added], ignore_index=True)
+        vocab, postings = build_postings(added)
+        for token, ids in zip(vocab, postings):
+            ids = ids + start
+            i = self.token_ids.get(token)
+            if i is None:
+                # postings first: a search walking the vocab never sees a token without them
+                self.postings.append(ids)
+                self.vocab.append(token)
+                self.token_ids[token] = len(self.vocab) - 1
+            else:
+                self.postings[i] = np.concatenate([self.postings[i], ids])
+        self.size = len(self.df)
+        return added
+
+    def search(self, keywords):
+        # first row whose text contains every keyword, like search_in_dataset
+        size = self.size
+        if size == 0 or self.df.empty:
+            return None
+        rows = None
+        for kw in keywords:
+            ids = self.rows_with(kw, size)
+            rows = ids if rows is None else np.intersect1d(rows, ids, assume_unique=True)
+            if len(rows) == 0:
+                return None
+        first = 0 if rows is None else int(rows[0])
+        return self.df.iloc[first].to_dict()
@@ -0,0 +1,67 @@
+# Follow-up questions and canned replies picked by phrase, not by single word.
+#
+# Keys of FOLLOW_UP_QUESTIONS and RESPONSES can be several words ("golden
+# boot", "host country"), which a lookup of one keyword at a time never finds.
+# Both dicts go into one table keyed by the tuple of a key's words, built once
+# per knowledge version, and the keywords are scanned once: at each position
+# the longest phrase starting there is tried first, so "golden boot" wins over
+# a "golden" key. As before, the first match in the message wins.
+import string
+import threading
+from collections import namedtuple
+
+# the follow-ups and canned replies stored under one phrase (None: not a key of that dict)
+Entry = namedtuple("Entry", "follow_ups responses")
+
+
+class PhraseTable:
+    """Phrase (tuple of words) -> Entry for the keys of the follow-up and response dicts."""
+
+    def __init__(self, follow_ups, responses):
+        phrases = {}
+        for field, table in (("follow_ups", follow_ups), ("responses", responses)):
+            for key, choices in table.items():
+                words = tuple(key.lower().split())
+                if words:
+                    entry = phrases.get(words, Entry(None, None))
+                    phrases[words] = entry._replace(**{field: choices})
+        self.phrases = phrases
+        # first word -> words of the longest phrase starting with it; other words cost one dict miss
+        self.starts = {}
+        for words in phrases:
+            self.starts[words[0]] = max(self.starts.get(words[0], 0), len(words))
+
+    def __len__(self):
+        return len(self.phrases)
+
+    def lookup(self, keywords, field):
+        # choices of the first phrase in keywords that is a key of field's dict, or None
+        tokens = [kw.strip(string.punctuation) for kw in keywords]
+        phrases, starts = self.phrases, self.starts
+        for start, token in enumerate(tokens):
+            longest = starts.get(token)
+            if longest is None:
+                continue
+            for n in range(min(longest, len(tokens) - start), 0, -1):
+                entry = phrases.get(tuple(tokens[start:start + n]))
+                if entry is not None:
+                    choices = getattr(entry, field)
+                    if choices is not None:
+                        return choices
+        return None
+
+
+_tables = {}                  # knowledge path -> (version, PhraseTable)
+_tables_lock = threading.Lock()
+
+
+def phrase_table(knowledge):
+    # the table for this knowledge version, built on first use after each reload
+    entry = _tables.get(knowledge.path)
+    if entry is None or entry[0] != knowledge.version:
+        with _tables_lock:
+            entry = _tables.get(knowledge.path)
+            if entry is None or entry[0] != knowledge.version:
+                entry = _tables[knowledge.path] = (
+                    knowledge.version, PhraseTable(knowledge.follow_up_questions, knowledge.responses))
+    return entry[1]
@@ -0,0 +1,214 @@
+# Every World Cup edition from one process. Each tournament has its own
+# knowledge file (harif/data/wc2018.json, wc2022.json, ...) whose "edition"
+# section gives its year, hosts and goals CSV, and is answered by its own
+# HarifEngine: a partition with its own indexes, goals table and cache.
+#
+# A question naming a loaded year ("golden boot 2018") or a host only one
+# loaded edition had ("... in Russia") is answered by that edition; anything
+# else by the default one (KNOWLEDGE_PATH, the current tournament). Only when
+# that partition has nothing does the question go to the other editions,
+# newest first, and such an answer says which edition it comes from. So does
+# any answer to a question naming a World Cup year that is not loaded ("total
+# goals 2014"): it can only come from another edition. Finding
+# the edition is a dict lookup per word, so a question that gets answered
+# searches one partition however many editions are loaded.
+import asyncio
+import os
+import re
+import threading
+from collections import namedtuple
+from pathlib import Path
+
+from harif.engine import APP_DIR, CSV_PATH, HarifEngine, get_engine
+from harif.knowledge import KNOWLEDGE_PATH, get_knowledge
+from harif.replies import eliza_reply
+
+EDITIONS_DIR = Path(os.environ.get("HARIF_EDITIONS", KNOWLEDGE_PATH.parent))
+EDITION_SUFFIXES = (".json", ".yaml", ".yml")
+YEAR_RE = re.compile(r"\b(?:19|20)\d\d\b")
+WORD_RE = re.compile(r"[^\W\d_]+")
+
+Edition = namedtuple("Edition", "year name hosts path engine")
+
+
+def edition_files(folder=EDITIONS_DIR):
+    # knowledge files in folder that describe an edition (a year in their "edition" section)
+    paths = []
+    for path in sorted(Path(folder).iterdir()):
+        if path.suffix.lower() in EDITION_SUFFIXES:
+            try:
+                if get_knowledge(path).edition.get("year"):
+                    paths.append(path)
+            except (OSError, ValueError, ImportError):
+                pass          # not a knowledge file (or YAML without PyYAML)
+    return paths
+
+
+def world_cup_year(year):
+    # a year a World Cup was (or will be) played: every four years from 1930, none during the war
+    return year >= 1930 and year % 4 == 2 and year not in (1942, 1946)
+
+
+def goals_path(edition):
+    # the edition's goals CSV, relative paths from the app folder; None when it has none
+    goals = edition.get("goals")
+    if not goals:
+        return None
+    path = Path(goals)
+    return path if path.is_absolute() else APP_DIR / path
+
+
+class EditionStore:
+    """One partition (HarifEngine) per World Cup edition, with routing by year or host."""
+
+    def __init__(self, paths=None, default_path=KNOWLEDGE_PATH, default_engine=None, **engine_options):
+        default_path = Path(default_path).resolve()
+        paths = {Path(p).resolve() for p in (edition_files() if paths is None else paths)} | {default_path}
+        self.editions = []
+        for path in paths:
+            edition = get_knowledge(path).edition
+            year = edition.get("year")
+            name = edition.get("name") or (f"World Cup {year}" if year else "World Cup")
+            if path == default_path:
+                engine = default_engine or HarifEngine(csv_path=goals_path(edition) or CSV_PATH,
+                                                       knowledge_path=path, **engine_options)
+            else:
+                engine = HarifEngine(csv_path=goals_path(edition), knowledge_path=path, **engine_options)
+            entry = Edition(year, name, tuple(h.lower() for h in edition.get("hosts", ())), path, engine)
+            self.editions.append(entry)
+            if path == default_path:
+                self.default = entry
+        # newest first: the order other editions are tried in
+        self.editions.sort(key=lambda e: e.year or 0, reverse=True)
+        self.by_year = {e.year: e for e in self.editions if e.year}
+        hosts = {}
+        for e in self.editions:
+            for host in e.hosts:
+                hosts.setdefault(host, []).append(e)
+        # a host of several editions (Mexico 1970 and 1986) names none of them
+        self.by_host = {host: es[0] for host, es in hosts.items() if len(es) == 1}
+        self.host_words = max((len(h.split()) for h in self.by_host), default=0)
+
+    def __len__(self):
+        return len(self.editions)
+
+    def warm_up(self):
+        # every partition's indexes now, the default edition's first
+        for edition in self.order([]):
+            edition.engine.warm_up()
+        return self
+
+    def detect(self, text):
+        # the loaded editions the question names, years before hosts, in the order named
+        found = []
+        for m in YEAR_RE.finditer(text):
+            edition = self.by_year.get(int(m.group()))
+            if edition is not None and edition not in found:
+                found.append(edition)
+        if found or not self.host_words:
+            return found
+        words = WORD_RE.findall(text.lower())
+        for i in range(len(words)):
+            for n in range(min(self.host_words, len(words) - i), 0, -1):
+                edition = self.by_host.get(" ".join(words[i:i + n]))
+                if edition is not None and edition not in found:
+                    found.append(edition)
+        return found
+
+    def route(self, text):
+        # (question without the edition years, the editions it names)
+        named = self.detect(text)
+        if named:
+            text = " ".join(YEAR_RE.sub(lambda m: "" if int(m.group()) in self.by_year else m.group(), text).split())
+        return text, named
+
+    def missing(self, text):
+        # the World Cup years the question names that no loaded edition is for
+        return [year for year in map(int, YEAR_RE.findall(text)) if world_cup_year(year) and year not in self.by_year]
+
+    def lead(self, text, named):
+        # the edition the question leads to: the first one it names, the default
+        # one when it names none, None when it names only World Cup years not loaded
+        if named:
+            return named[0]
+        return None if self.missing(text) else self.default
+
+    def unanswered(self, text, lead):
+        # no edition has an answer: a question about one not loaded is told so, anything else gets ELIZA
+        if lead is not None or not self.by_year:
+            return eliza_reply(text)
+        years = [str(year) for year in sorted(self.by_year, reverse=True)]
+        loaded = ", ".join(years[:-1]) + " and " + years[-1] if len(years) > 1 else years[0]
+        return f"Sorry, I don't know about the {self.missing(text)[0]} World Cup, only {loaded}."
+
+    def order(self, named):
+        # editions to ask, lazily: the named ones, the default, then the rest newest first
+        yield from named
+        if self.default not in named:
+            yield self.default
+        for edition in self.editions:
+            if edition is not self.default and edition not in named:
+                yield edition
+
+    def _labelled(self, answer, edition, lead):
+        # an answer from an edition the question did not lead to says which one it is
+        return answer if edition is lead else f"({edition.name}) {answer}"
+
+    def answer(self, text):
+        query, named = self.route(text)
+        lead = self.lead(text, named)
+        for edition in self.order(named):
+            answer, follow_up = edition.engine.answer(query, fallback=None)
+            if answer is not None:
+                return self._labelled(answer, edition, lead), follow_up
+        return self.unanswered(text, lead), None
+
+    async def answer_async(self, text, budget=None):
+        # answer() over each partition's async cascade, all within one budget
+        from harif.async_cascade import LATENCY_BUDGET, get_executor
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (LATENCY_BUDGET if budget is None else budget)
+        query, named = self.route(text)
+        lead = self.lead(text, named)
+        for edition in self.order(named):
+            if not edition.engine.warm:
+                # a cold partition builds its indexes first, off the event loop
+                # and, like the gates of the async cascade, outside the budget
+                started = loop.time()
+                await loop.run_in_executor(get_executor(), edition.engine.warm_up)
+                deadline += loop.time() - started
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            answer, follow_up = await edition.engine.answer_async(query, budget=remaining, fallback=None)
+            if answer is not None:
+                return self._labelled(answer, edition, lead), follow_up
+        return self.unanswered(text, lead), None
+
+
+_editions = None
+_editions_lock = threading.Lock()
+_warm_up_thread = None
+
+
+def get_editions():
+    # every edition next to the knowledge file, the default one served by get_engine()
+    global _editions
+    if _editions is None:
+        with _editions_lock:
+            if _editions is None:
+                _editions = EditionStore(default_engine=get_engine())
+    return _editions
+
+
+def warm_up_in_background():
+    # build every edition's indexes on a daemon thread, once per process. The page
+    # starts it after its first render: greetings need none of them, and the first
+    # question that does finds them built (or waits on the engine's lock for the rest)
+    global _warm_up_thread
+    with _editions_lock:
+        if _warm_up_thread is None:
+            _warm_up_thread = threading.Thread(target=lambda: get_editions().warm_up(), name="harif-warm-up",
+                                               daemon=True)
+            _warm_up_thread.start()
+    return _warm_up_thread
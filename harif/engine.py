@@ -0,0 +1,497 @@
+# Headless answer engine: the answer_QA cascade plus the sources it searches.
+# Importing this module does not import streamlit or pandas; the goals table
+# is only read the first time a question falls through to the dataset search.
+import threading
+from collections.abc import Mapping
+from pathlib import Path
+
+from harif.cache import MISSING, ResponseCache
+from harif.fuzzy import FuzzyIndex, vocabulary
+from harif.intents import INTENT_MATCHER
+from harif.knowledge import get_knowledge
+from harif.preprocess import preprocess
+from harif.qa_index import QAIndex
+from harif.replies import (
+    EXTERNAL_KEYWORDS,
+    eliza_reply,
+    get_follow_up,
+    get_random_response,
+    is_external_topic,
+)
+from harif.search import extract_keywords, format_row, search_in_dataset, search_in_qa, search_in_stats
+from harif.tracing import TRACER
+
+APP_DIR = Path(__file__).resolve().parent.parent
+CSV_PATH = APP_DIR / "datasetFIFA.csv"
+NAME_COLUMNS = ("Team", "Player", "Opponent", "Stadium")   # goals-table columns typos are corrected to
+
+
+def flatten_stats(stats_data):
+    # (key, value) for every stats entry, nested dicts like "top scorers" included
+    for key, val in stats_data.items():
+        if isinstance(val, Mapping):
+            yield from val.items()
+        else:
+            yield key, val
+
+
+def name_values(df):
+    # distinct team/player/opponent/stadium names, the words typos are corrected to
+    return [v for col in NAME_COLUMNS if col in df.columns for v in df[col].dropna().unique()]
+
+
+def gate_reply(english, external):
+    # the fixed reply for a non-English or off-topic question, as (answer, wants_follow_up, cacheable)
+    if not english:
+        return ("Sorry, I only understand English and can respond only in English.", False, True)
+
+    if external:
+        return ("That's an interesting topic! But I'm really an expert on the FIFA World Cup 2022. "
+                "What would you like to know about the tournament?", False, True)
+    return None
+
+
+def cache_key(keywords, english, external):
+    # the response cache's key: answers only depend on the keyword set and the gate flags
+    return tuple(sorted(keywords)), english, external
+
+
+def lookup_answer(keywords, english, external, search_qa, search_stats, search_dataset, trace=None,
+                  search_semantic=None, knowledge=None):
+    # the part of the cascade that only depends on the keywords and the gate flags.
+    # returns (answer, wants_follow_up, cacheable); answer None means "let ELIZA reply".
+    # search_semantic: the last source, entries by meaning when no other source has words in common;
+    # knowledge: whose canned replies and follow-ups (an edition's), the shared one when None
+    gated = gate_reply(english, external)
+    if gated:
+        return gated
+
+    answer = search_qa(keywords)
+    if trace is not None:
+        trace.mark("qa", hit=bool(answer))
+    if not answer:
+        answer = search_stats(keywords)
+        if trace is not None:
+            trace.mark("stats", hit=bool(answer))
+    if not answer:
+        answer = get_random_response(keywords, knowledge)
+        if trace is not None:
+            trace.mark("responses", hit=bool(answer))
+        if answer:
+            # canned replies are drawn at random on every call, don't freeze one in a cache
+            return answer, True, False
+    if not answer:
+        answer = search_dataset(keywords)
+        if trace is not None:
+            trace.mark("dataset", hit=bool(answer))
+        if answer:
+            answer = format_row(answer)
+    if not answer and search_semantic is not None:
+        answer = search_semantic(keywords)
+        if trace is not None:
+            trace.mark("semantic", hit=bool(answer))
+
+    if not answer:
+        return None, False, True
+    return answer, True, True
+
+
+def run_cascade(user_input, search_qa, search_stats, search_dataset, cache=None, correct=None,
+                answer_aggregate=None, fallback=eliza_reply, search_semantic=None, knowledge=None):
+    # the cascade, timed stage by stage when harif.tracing is on. fallback replies
+    # when no source has an answer; fallback=None returns (None, None) instead
+    if not TRACER.active:
+        return _cascade(user_input, search_qa, search_stats, search_dataset, cache, correct, answer_aggregate,
+                        fallback, None, search_semantic, knowledge)
+    trace = TRACER.begin(user_input)
+    try:
+        return _cascade(user_input, search_qa, search_stats, search_dataset, cache, correct, answer_aggregate,
+                        fallback, trace, search_semantic, knowledge)
+    finally:
+        TRACER.end(trace)
+
+
+def cascade_gates(user_input, correct, answer_aggregate, trace=None, knowledge=None):
+    # the steps before the sources are searched. Returns (reply, None) when one of them
+    # answers already, else (None, (keywords, english, external)) for the sources
+    message = preprocess(user_input)
+    if trace is not None:
+        trace.mark("preprocess")
+    # ✅ 1) Greeting fast-path → ELIZA first
+    # (never cached: the ELIZA reply depends on the exact wording, not the keywords)
+    reply = INTENT_MATCHER.reply(user_input, fast_path_only=True, tokens=message.words)
+    if trace is not None:
+        trace.mark("greeting", hit=bool(reply))
+    if reply:
+        return (reply, None), None
+
+    # ✅ 2) Your original flow
+    keywords = message.keywords
+    if trace is not None:
+        trace.mark("keywords", hit=not keywords)
+    if not keywords:
+        return ("Please enter more specific keywords.", get_follow_up(['general'], knowledge)), None
+
+    # non-English and off-topic messages get a fixed reply whatever their keywords,
+    # so they skip the typo fixes and aggregates
+    english, external = message.english, message.external
+    if english and not external:
+        if correct is not None:
+            # typo fixes ("goldn" -> "golden") for keywords found nowhere in the data
+            keywords = correct(keywords)
+            # a typo can only have been fixed into an off-topic word
+            external = is_external_topic(keywords)
+            if trace is not None:
+                trace.mark("correct")
+    if trace is not None:
+        trace.mark("gates", hit=not english or external)
+    if answer_aggregate is not None and english and not external:
+        # counts over the goals table ("how many goals did Morocco score", "goals in group C");
+        # ahead of the cache because "group C" and "group D" have the same keywords
+        answer = answer_aggregate(user_input, keywords)
+        if trace is not None:
+            trace.mark("aggregate", hit=bool(answer))
+        if answer:
+            return (answer, get_follow_up(keywords, knowledge)), None
+    return None, (keywords, english, external)
+
+
+def _cascade(user_input, search_qa, search_stats, search_dataset, cache, correct, answer_aggregate, fallback, trace,
+             search_semantic=None, knowledge=None):
+    reply, gates = cascade_gates(user_input, correct, answer_aggregate, trace, knowledge)
+    if reply is not None:
+        return reply
+    keywords, english, external = gates
+    if cache is None:
+        answer, follow, _ = lookup_answer(keywords, english, external, search_qa, search_stats, search_dataset, trace,
+                                          search_semantic, knowledge)
+    else:
+        key = cache_key(keywords, english, external)
+        generation = cache.generation
+        cached = cache.get(key)
+        if trace is not None:
+            trace.mark("cache", hit=cached is not MISSING)
+        if cached is MISSING:
+            answer, follow, cacheable = lookup_answer(keywords, english, external, search_qa, search_stats,
+                                                      search_dataset, trace, search_semantic, knowledge)
+            if cacheable:
+                cache.put(key, (answer, follow), generation)
+        else:
+            answer, follow = cached
+
+    if answer is None:
+        if fallback is None:
+            return None, None
+        reply = fallback(user_input)
+        if trace is not None:
+            trace.mark("eliza", hit=True)
+        return reply, None
+    # the follow-up is drawn fresh every time, cached answer or not
+    follow_up = get_follow_up(keywords, knowledge) if follow else None
+    if trace is not None:
+        trace.mark("follow_up")
+    return answer, follow_up
+
+
+def answer_QA(user_input, qa_data, stats_data, df, qa_index=None, dataset_index=None):
+    # original signature, kept for existing callers; indexes are optional
+    if qa_index is not None:
+        search_qa = qa_index.search
+    else:
+        search_qa = lambda keywords: search_in_qa(keywords, qa_data)
+    if dataset_index is not None:
+        search_dataset = dataset_index.search
+    else:
+        search_dataset = lambda keywords: search_in_dataset(keywords, df)
+    return run_cascade(user_input, search_qa, lambda keywords: search_in_stats(keywords, stats_data), search_dataset)
+
+
+class HarifEngine:
+    """Owns the QA, stats and goals-table sources and builds their indexes on first use.
+
+    Without qa_data/stats_data it answers from the shared knowledge base and
+    follows its edits (see harif.knowledge), rebuilding only what depends on it.
+    """
+
+    def __init__(self, qa_data=None, stats_data=None, csv_path=CSV_PATH, df=None,
+                 cache_size=2048, cache_ttl=600, fuzzy=True, retrieval="cascade", knowledge_path=None):
+        # knowledge_path: another edition's knowledge file (see harif.editions);
+        # csv_path None: no goals table for this edition
+        self.knowledge_path = knowledge_path
+        self.knowledge = get_knowledge(knowledge_path)
+        self.shared_knowledge = qa_data is None and stats_data is None
+        self.qa_data = self.knowledge.qa if qa_data is None else qa_data
+        self.stats_data = self.knowledge.stats if stats_data is None else stats_data
+        self.csv_path = None if csv_path is None else Path(csv_path)
+        self.cache = ResponseCache(maxsize=cache_size, ttl=cache_ttl)
+        self.fuzzy = fuzzy
+        # "cascade": first hit of QA -> stats -> responses -> goals table
+        # "ranked": best BM25 hit over all of them at once
+        # "semantic": the cascade, then the QA/stats entry closest in meaning (harif.semantic)
+        self.retrieval = retrieval
+        self._df = df
+        self._qa_index = None
+        self._dataset_index = None
+        self._fuzzy_index = None
+        self._ranking_index = None
+        self._semantic_index = None
+        self._aggregates = None
+        self._curated_totals = None
+        self._tailers = {}
+        self._lock = threading.Lock()
+        self.warm = False             # warm_up() has run: the first question builds nothing
+
+    @property
+    def qa_index(self):
+        if self._qa_index is None:
+            with self._lock:
+                if self._qa_index is None:
+                    self._qa_index = QAIndex(self.qa_data)
+        return self._qa_index
+
+    @property
+    def dataset_index(self):
+        if self._dataset_index is None:
+            with self._lock:
+                if self._dataset_index is None:
+                    from harif.dataset import DatasetIndex, empty_goals, load_goals
+                    if self._df is not None:
+                        df = self._df
+                    elif self.csv_path is not None:
+                        df = load_goals(self.csv_path)
+                    else:
+                        df = empty_goals()
+                    self._dataset_index = DatasetIndex(df)
+        return self._dataset_index
+
+    @property
+    def df(self):
+        return self.dataset_index.df
+
+    @property
+    def fuzzy_index(self):
+        if self._fuzzy_index is None:
+            index = self.dataset_index
+            with self._lock:
+                if self._fuzzy_index is None:
+                    # read under the lock, so goals being added right now are either in or still to come
+                    df = index.df
+                    stats = list(flatten_stats(self.stats_data))
+                    names = name_values(df)
+                    targets = vocabulary(
+                        list(self.qa_data) + [k for k, _ in stats] + list(self.knowledge.follow_up_questions)
+                        + list(self.knowledge.responses) + names
+                    )
+                    known = vocabulary(list(self.qa_data.values()) + [v for _, v in stats]) | EXTERNAL_KEYWORDS
+                    self._fuzzy_index = FuzzyIndex(targets, known)
+        return self._fuzzy_index
+
+    @property
+    def ranking_index(self):
+        if self._ranking_index is None:
+            index = self.dataset_index
+            with self._lock:
+                if self._ranking_index is None:
+                    df = index.df
+                    from harif.ranking import RankingIndex, build_documents
+                    self._ranking_index = RankingIndex(build_documents(self.qa_data, self.stats_data, df))
+        return self._ranking_index
+
+    @property
+    def semantic_index(self):
+        # QA pairs and stats entries only; goal rows are answered by the cascade
+        if self._semantic_index is None:
+            with self._lock:
+                if self._semantic_index is None:
+                    from harif.ranking import build_documents
+                    from harif.semantic import SemanticIndex, get_encoder
+                    encoder = get_encoder()
+                    path = None
+                    if self.shared_knowledge and self.knowledge.path:
+                        # the vectors next to the knowledge file, read back by every later process
+                        kb_path = Path(self.knowledge.path)
+                        path = kb_path.with_name(f"{kb_path.stem}.{encoder.name}.npy")
+                    self._semantic_index = SemanticIndex(build_documents(self.qa_data, self.stats_data),
+                                                         encoder, path)
+        return self._semantic_index
+
+    @property
+    def aggregates(self):
+        if self._aggregates is None:
+            index = self.dataset_index
+            with self._lock:
+                if self._aggregates is None:
+                    df = index.df
+                    from harif.aggregates import GoalAggregates
+                    self._aggregates = GoalAggregates(df)
+        return self._aggregates
+
+    @property
+    def curated_totals(self):
+        # folded name -> value of its "<name> goals" QA/stats key ("france goals": 16,
+        # "mbappe goals": 8): a team's or player's curated tournament total is
+        # answered instead of the goals table's count
+        if self._curated_totals is None:
+            from harif.ranking import fold
+            totals = {}
+            for key, val in list(self.qa_data.items()) + list(flatten_stats(self.stats_data)):
+                key = fold(key)
+                if key.endswith(" goals"):
+                    totals.setdefault(key[:-len(" goals")], val)
+            self._curated_totals = totals
+        return self._curated_totals
+
+    def refresh_knowledge(self):
+        # pick up an edited knowledge base; the goals table and its indexes stay
+        if not self.shared_knowledge:
+            return self.knowledge
+        knowledge = get_knowledge(self.knowledge_path)
+        if knowledge.version != self.knowledge.version:
+            with self._lock:
+                if knowledge.version != self.knowledge.version:
+                    self.qa_data, self.stats_data = knowledge.qa, knowledge.stats
+                    self._qa_index = self._fuzzy_index = self._ranking_index = self._semantic_index = None
+                    self._curated_totals = None
+                    self.knowledge = knowledge
+            # every cached answer may come from the old version
+            self.cache.clear()
+        return self.knowledge
+
+    def add_goals(self, rows):
+        # append goal rows (a DataFrame or dicts with the goals-table columns) to the
+        # table and to every index already built from it, without rebuilding any;
+        # returns how many rows were added
+        index = self.dataset_index
+        with self._lock:
+            start = len(index)
+            added = index.append(rows)
+            df = index.df
+            new = df.iloc[start:]
+            if self._aggregates is not None:
+                self._aggregates.add(df, start)
+            if self._fuzzy_index is not None:
+                self._fuzzy_index.add(vocabulary(name_values(new)))
+            if self._ranking_index is not None:
+                from harif.ranking import build_documents
+                self._ranking_index.add(build_documents({}, {}, new, first_row=start))
+        self.cache.discard(self._stale_after(added))
+        return len(added)
+
+    def _stale_after(self, added):
+        # which cached answers rows with this text can change; the rest of the cache stays
+        text = " ".join(added)
+        if self.retrieval == "ranked":
+            # any query sharing a term with the new rows may rank one of them first now
+            from harif.ranking import tokenize
+            terms = set(tokenize(text))
+            return lambda key, value: any(t in terms for kw in key[0] for t in tokenize(kw))
+        if self.retrieval == "semantic":
+            # the goals table comes before the semantic match: a new row with every keyword replaces it
+            return lambda key, value: all(kw in text for kw in key[0])
+        # the cascade takes the first matching row, and the table only grows at the
+        # end, so only a "nothing found" answer can change: when a new row has every keyword
+        return lambda key, value: value[0] is None and all(kw in text for kw in key[0])
+
+    def follow(self, path, poll_interval=0.25):
+        # tail an append-only CSV/JSONL of goal events into the table (see
+        # harif.ingest); one tailer per file, however often this is called
+        from harif.ingest import GoalTailer
+        path = Path(path).resolve()
+        with self._lock:
+            tailer = self._tailers.get(path)
+            if tailer is None:
+                tailer = self._tailers[path] = GoalTailer(path, self.add_goals, poll_interval)
+        return tailer.start()
+
+    def warm_up(self):
+        # build every index now instead of on the first question that needs it
+        self.qa_index
+        self.dataset_index
+        if self.fuzzy:
+            self.fuzzy_index
+        if self.retrieval == "ranked":
+            self.ranking_index
+        if self.retrieval == "semantic":
+            self.semantic_index
+        self.aggregates
+        self.warm = True
+        return self
+
+    def correct_keywords(self, keywords):
+        return self.fuzzy_index.correct_keywords(keywords)
+
+    def search_qa(self, keywords):
+        return self.qa_index.search(keywords)
+
+    def search_stats(self, keywords):
+        return search_in_stats(keywords, self.stats_data)
+
+    def search_dataset(self, keywords):
+        return self.dataset_index.search(keywords)
+
+    def answer_aggregate(self, text, keywords):
+        # corrected keywords are appended so a misspelt team name is still found
+        aggregates = self.aggregates
+        return aggregates.answer(f"{text} {' '.join(keywords)}", curated_totals=self.curated_totals)
+
+    def search_semantic(self, keywords):
+        hits = self.semantic_index.search(keywords, k=1)
+        return hits[0].answer if hits else None
+
+    def search_ranked(self, keywords):
+        hits = self.ranking_index.search(keywords, k=1)
+        return hits[0].answer if hits else None
+
+    def rank(self, text, k=5):
+        # top-k scored answers from every source, best first
+        self.refresh_knowledge()
+        keywords = extract_keywords(text)
+        if self.fuzzy:
+            keywords = self.correct_keywords(keywords)
+        return self.ranking_index.search(keywords, k=k)
+
+    def answer(self, text, fallback=eliza_reply):
+        # follow-ups and canned replies come from this engine's knowledge base (its edition's)
+        knowledge = self.refresh_knowledge()
+        correct = self.correct_keywords if self.fuzzy else None
+        if self.retrieval == "ranked":
+            # traced as the "qa" stage: the BM25 search stands in for QA -> goals table
+            nothing = lambda keywords: None
+            return run_cascade(text, self.search_ranked, nothing, nothing, self.cache, correct,
+                               self.answer_aggregate, fallback, knowledge=knowledge)
+        semantic = self.search_semantic if self.retrieval == "semantic" else None
+        return run_cascade(text, self.search_qa, self.search_stats, self.search_dataset, self.cache, correct,
+                           self.answer_aggregate, fallback, semantic, knowledge)
+
+    async def answer_async(self, text, budget=None, timeouts=None, fallback=eliza_reply):
+        # answer() with the sources searched concurrently, each within its timeout
+        # (harif.async_cascade.SOURCE_TIMEOUTS) and all within budget seconds after the gates
+        from harif.async_cascade import LATENCY_BUDGET, default_sources, run_cascade_async
+        knowledge = self.refresh_knowledge()
+        correct = self.correct_keywords if self.fuzzy else None
+        if self.retrieval == "ranked":
+            nothing = lambda keywords: None
+            sources = default_sources(self.search_ranked, nothing, nothing, timeouts)[:1]
+        else:
+            semantic = self.search_semantic if self.retrieval == "semantic" else None
+            sources = default_sources(self.search_qa, self.search_stats, self.search_dataset, timeouts, semantic,
+                                      knowledge)
+        return await run_cascade_async(text, sources, self.cache, correct, self.answer_aggregate,
+                                       LATENCY_BUDGET if budget is None else budget, fallback, knowledge)
+
+    def answer_many(self, texts):
+        return [self.answer(text) for text in texts]
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    # one engine per process, shared by every Streamlit session and rerun
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = HarifEngine()
+    return _engine
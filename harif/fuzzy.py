@@ -0,0 +1,131 @@
+# Typo-tolerant keyword correction ("mbape" -> "mbappe", "goldn" -> "golden").
+#
+# The vocabulary (QA/stats key words, player/team/stadium names) is indexed by
+# padded character trigrams. A misspelt keyword only has to be compared with
+# the few words that share the most trigrams with it, so the cost grows with
+# the number of similar words, not the vocabulary size.
+import re
+import string
+from collections import Counter, defaultdict
+
+WORD_RE = re.compile(r"[^\W\d_]+(?:['’][^\W\d_]+)*")
+
+
+def vocabulary(texts):
+    words = set()
+    for text in texts:
+        words.update(w.lower() for w in WORD_RE.findall(str(text)))
+    return words
+
+
+def _grams(word):
+    padded = f"${word}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b, limit):
+    # optimal string alignment distance (a swap counts as one edit); gives up
+    # and returns limit + 1 as soon as the distance must exceed limit
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2 = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if (prev2 is not None and j > 1 and a[i - 1] == b[j - 2]
+                    and a[i - 2] == b[j - 1]):
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+def max_edits(word):
+    # short words are too easy to "correct" into something else
+    if len(word) <= 4:
+        return 0
+    return 1 if len(word) <= 7 else 2
+
+
+class FuzzyIndex:
+    """Corrects keywords that appear nowhere in the data to the closest known word.
+
+    targets are the words a keyword may be corrected to; known are extra words
+    that are fine as they are (answer text, stop words, ...), so that ordinary
+    English is never "corrected".
+    """
+
+    def __init__(self, targets, known=(), candidates=30):
+        self.words = sorted(set(targets))
+        self.targets = set(self.words)
+        self.known = self.targets | set(known)
+        self.candidates = candidates
+        # (trigram, word length) -> word ids; a word can only be within a few
+        # edits of words of about the same length, so the rest is never counted
+        postings = defaultdict(list)
+        for i, word in enumerate(self.words):
+            for gram in _grams(word):
+                postings[gram, len(word)].append(i)
+        self.postings = dict(postings)
+        self._corrections = {}
+
+    def add(self, targets, known=()):
+        # new words (a player who just scored) become targets without a rebuild
+        new = sorted(set(targets) - self.targets)
+        for word in new:
+            self.words.append(word)
+            for gram in _grams(word):
+                self.postings.setdefault((gram, len(word)), []).append(len(self.words) - 1)
+        self.targets |= set(new)
+        self.known |= set(new) | set(known)
+        if new:
+            # an earlier correction may have a closer target now
+            self._corrections = {}
+
+    def __len__(self):
+        return len(self.words)
+
+    def correct(self, word):
+        # closest target within max_edits(word), or None
+        if word in self.targets:
+            return word
+        if word in self._corrections:
+            return self._corrections[word]
+        limit = max_edits(word)
+        best = None
+        if limit:
+            grams = sorted(_grams(word))
+            shared = Counter()
+            for length in range(len(word) - limit, len(word) + limit + 1):
+                for gram in grams:
+                    shared.update(self.postings.get((gram, length), ()))
+            # each edit breaks at most 3 trigrams, so closer words share at least this many
+            needed = max(1, len(grams) - 3 * limit)
+            candidates = sorted((-count, i) for i, count in shared.items() if count >= needed)
+            best_rank = None
+            for neg_count, i in candidates[:self.candidates]:
+                candidate = self.words[i]
+                distance = edit_distance(word, candidate, limit)
+                rank = (distance, neg_count, candidate)
+                if distance <= limit and (best_rank is None or rank < best_rank):
+                    best, best_rank = candidate, rank
+                    if distance == 1:
+                        # word is not a target, so 1 is the best possible, and
+                        # later candidates share fewer trigrams
+                        break
+        if len(self._corrections) < 100_000:
+            self._corrections[word] = best
+        return best
+
+    def correct_keywords(self, keywords):
+        corrected = []
+        for kw in keywords:
+            word = kw.strip(string.punctuation)
+            if word not in self.known and word.isalpha():
+                kw = self.correct(word) or kw
+            corrected.append(kw)
+        return corrected
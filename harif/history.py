@@ -0,0 +1,131 @@
+# A chat session's messages, kept small however long the conversation runs.
+#
+# The page only renders the latest `window` turns (a turn is a user message and
+# the replies to it); older turns are shown a page at a time on request. Roles
+# are stored as one byte per message and assistant replies are interned, so the
+# same answer given in many sessions is held once. Past `keep` turns in memory,
+# the oldest half is spilled to a per-session JSONL file in the temp folder and
+# read back by offset when a page needs it; the file goes with the session.
+import json
+import os
+import sys
+import tempfile
+import threading
+import uuid
+import weakref
+from array import array
+
+ROLES = ("user", "assistant")
+SPILL_DIR = os.path.join(tempfile.gettempdir(), "harif-history")
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class ChatHistory:
+    """Messages of one chat session: append({"role", "content"}), page(n) to render.
+
+    page(0) is the latest `window` turns; page(1) the ones before, and so on.
+    """
+
+    def __init__(self, window=20, keep=200, spill_dir=SPILL_DIR):
+        self.window = window
+        self.keep = max(keep, window)
+        self.spill_dir = spill_dir
+        self.roles = bytearray()            # one role code per in-memory message
+        self.contents = []
+        self.starts = array("I")            # first in-memory message of each in-memory turn
+        self.spilled = 0                    # turns moved to the spill file
+        self.spill_offsets = array("Q")     # byte offset of each spilled turn
+        self.spill_path = None
+        self.count = 0                      # every message ever appended
+        self._lock = threading.Lock()
+        self._finalizer = None
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def turns(self):
+        return self.spilled + len(self.starts)
+
+    @property
+    def pages(self):
+        return max(1, -(-self.turns // self.window))
+
+    def append(self, message):
+        role, content = message["role"], str(message["content"])
+        if role not in ROLES:
+            raise ValueError(f"unknown role: {role}")
+        if role == "assistant":
+            content = sys.intern(content)
+        with self._lock:
+            if role == "user" or not self.starts:
+                self.starts.append(len(self.contents))
+            self.roles.append(ROLES.index(role))
+            self.contents.append(content)
+            self.count += 1
+            if len(self.starts) > self.keep:
+                self._spill(len(self.starts) - self.keep // 2)
+
+    def _spill(self, n):
+        # move the oldest n in-memory turns to the end of the spill file
+        if self.spill_path is None:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            self.spill_path = os.path.join(self.spill_dir, f"{uuid.uuid4().hex}.jsonl")
+            self._finalizer = weakref.finalize(self, _remove, self.spill_path)
+        cut = self.starts[n]
+        with open(self.spill_path, "ab") as f:
+            offset = f.tell()
+            for t in range(n):
+                lo, hi = self.starts[t], self.starts[t + 1]
+                line = json.dumps([[self.roles[i], self.contents[i]] for i in range(lo, hi)],
+                                  ensure_ascii=False).encode("utf-8") + b"\n"
+                self.spill_offsets.append(offset)
+                offset += len(line)
+                f.write(line)
+        del self.roles[:cut]
+        del self.contents[:cut]
+        self.starts = array("I", (s - cut for s in self.starts[n:]))
+        self.spilled += n
+
+    def _read_spilled(self, first, last):
+        # messages of spilled turns first..last-1
+        messages = []
+        with open(self.spill_path, "rb") as f:
+            f.seek(self.spill_offsets[first])
+            for _ in range(first, last):
+                messages.extend(json.loads(f.readline()))
+        return [{"role": ROLES[r], "content": c} for r, c in messages]
+
+    def turn_range(self, first, last):
+        # messages of turns first..last-1 (0 is the oldest turn ever)
+        with self._lock:
+            first, last = max(first, 0), min(last, self.turns)
+            messages = []
+            if first < self.spilled:
+                messages = self._read_spilled(first, min(last, self.spilled))
+            lo, hi = max(first - self.spilled, 0), last - self.spilled
+            if lo < hi:
+                end = self.starts[hi] if hi < len(self.starts) else len(self.contents)
+                messages += [{"role": ROLES[self.roles[i]], "content": self.contents[i]}
+                             for i in range(self.starts[lo], end)]
+            return messages
+
+    def page(self, n=0):
+        # the messages of the n-th page back from the latest turns
+        last = self.turns - n * self.window
+        return self.turn_range(last - self.window, last)
+
+    def __iter__(self):
+        # every message, oldest first (reads the spill file)
+        return iter(self.turn_range(0, self.turns))
+
+    def close(self):
+        # drop the spill file now instead of when the session is collected
+        if self._finalizer is not None:
+            self._finalizer()
@@ -0,0 +1,114 @@
+# Follow an append-only file of goal events and feed each batch of new goals
+# to the engine while the app keeps running.
+#
+# The file is either a CSV with the goals-table header on its first line, or
+# JSON lines with one goal object (same column names) per line. Only the bytes
+# appended since the last poll are read; a half-written last line waits for
+# the next poll.
+import io
+import json
+import logging
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+log = logging.getLogger(__name__)
+
+JSONL_SUFFIXES = (".jsonl", ".ndjson", ".json")
+
+
+def decode(data):
+    # a chunk always ends on a newline, so a utf-8 character is never cut in half
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError:
+        return data.decode("cp1252")
+
+
+class GoalTailer:
+    """Polls an append-only goal-events file and hands new rows to on_rows.
+
+    on_rows gets a DataFrame per poll that found complete new lines (for
+    example HarifEngine.add_goals). start() runs the polling in a daemon thread.
+    """
+
+    def __init__(self, path, on_rows, poll_interval=0.25):
+        self.path = Path(path)
+        self.on_rows = on_rows
+        self.poll_interval = poll_interval
+        self.jsonl = self.path.suffix.lower() in JSONL_SUFFIXES
+        self.offset = 0
+        self.header = None
+        self.rows_read = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def parse(self, text):
+        if self.jsonl:
+            records = []
+            for line in text.splitlines():
+                if not line.strip():
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    log.warning("skipping a malformed goal event in %s: %r", self.path, line[:200])
+            return pd.DataFrame.from_records(records)
+        if self.header is None:
+            self.header, _, text = text.partition("\n")
+            self.header += "\n"
+        if not text.strip():
+            return pd.DataFrame()
+        # same parser as the bundled CSV, so empty cells become NaN the same way
+        return pd.read_csv(io.StringIO(self.header + text))
+
+    def poll(self):
+        # hand over the complete lines appended since the last poll; returns how many rows
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            return 0
+        if size < self.offset:
+            # an append-only file never shrinks; reading it again from the top would
+            # count every goal twice, so carry on from its new end instead
+            log.warning("%s shrank from %d to %d bytes, skipping to its end", self.path, self.offset, size)
+            self.offset = size
+            return 0
+        if size == self.offset:
+            return 0
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read(size - self.offset)
+        end = data.rfind(b"\n") + 1
+        if not end:
+            return 0
+        self.offset += end
+        rows = self.parse(decode(data[:end]))
+        if len(rows):
+            self.on_rows(rows)
+            self.rows_read += len(rows)
+        return len(rows)
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.poll()
+            except Exception:
+                # a bad batch must not stop the live feed
+                log.exception("failed to ingest goal events from %s", self.path)
+
+    def start(self):
+        # catch up with what is already in the file, then keep polling in the background
+        with self._start_lock:
+            if self._thread is None:
+                self.poll()
+                self._thread = threading.Thread(target=self._run, name=f"goal-tailer:{self.path.name}", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
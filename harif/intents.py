@@ -0,0 +1,131 @@
+# Small-talk intents (greetings, thanks, bye, ...) classified in one pass.
+#
+# Every phrase of every intent goes into one hash table keyed by its words, and a
+# message is scanned once, looking up the word n-grams that start at each word.
+# The cost depends on the message length, not on how many intents exist, and
+# phrases match whole words only ("hi" does not fire on "which").
+# When several intents appear, the one listed first wins, like the old if/elif.
+import re
+from collections import namedtuple
+
+Intent = namedtuple("Intent", "name patterns reply fast_path")
+
+DEFAULT_REPLY = "Tell me more about that..."
+
+WORD_RE = re.compile(r"[\w']+")
+
+# fast_path value of an intent answered before any search only when the whole
+# message is one of its phrases: "exit" is, "belgium group stage exit" is a question
+WHOLE_MESSAGE = "whole message"
+
+# (name, phrases, reply, fast_path). fast_path intents are answered before any
+# search (WHOLE_MESSAGE: see above); the others only when the search found nothing.
+INTENTS = [
+    ("greeting", ["hello", "hi", "hey", "yo"],
+     "Hi there! How are you feeling today?", True),
+    ("how_are_you", ["how are you"],
+     "I'm fine, What was your favorite moment of the World Cup?", True),
+    ("fine", ["fine", "i'm fine", "i am fine"],
+     "I'm fine too, What was your favorite moment of the World Cup?", True),
+    ("name", ["your name", "who are you"],
+     "I'm harif, What was your favorite moment of the World Cup?", True),
+    ("sad", ["sad"],
+     "I'm sorry you're feeling sad. Want to talk about it?", False),
+    ("mission", ["mission", "your mission", "what is your mission"],
+     "My mission is to help you explore and learn about the FIFA World Cup 2022 — teams, matches, players, and moments!", WHOLE_MESSAGE),
+    ("bye", ["bye", "goodbye"],
+     "Goodbye! 👋 Take care.", True),
+    ("exit", ["exit"],
+     "Goodbye! 👋 Take care.", WHOLE_MESSAGE),
+    ("thanks", ["thank", "thanks", "thank you"],
+     "You're welcome!", True),
+]
+
+
+def words(text):
+    return [w.strip("'") for w in WORD_RE.findall(text.lower())]
+
+
+class IntentMatcher:
+    """Classifies a message against every intent in a single pass.
+
+    Patterns are plain phrases (hashed by their words), or regex fragments with
+    regex=True, which share one compiled alternation and must not define named
+    groups. A reply is a string, or a callable taking (match, text) for
+    ELIZA-style replies that reuse the user's words (match is None for phrases).
+    """
+
+    def __init__(self, intents=INTENTS):
+        self.intents = []
+        self.phrases = {}       # tuple of words -> intent index (first intent wins)
+        self.max_words = 0
+        self.regex_intents = []  # indexes of the intents given as regex fragments
+        self._regex = None
+        for name, patterns, reply, fast_path in intents:
+            self.add(name, patterns, reply, fast_path)
+
+    def add(self, name, patterns, reply, fast_path=False, regex=False):
+        i = len(self.intents)
+        self.intents.append(Intent(name, tuple(patterns), reply, fast_path))
+        if regex:
+            self.regex_intents.append(i)
+            self._compile()
+            return
+        for phrase in patterns:
+            key = tuple(words(phrase))
+            if key:
+                self.phrases.setdefault(key, i)
+                self.max_words = max(self.max_words, len(key))
+
+    def _compile(self):
+        groups = [f"(?P<i{i}>{'|'.join(self.intents[i].patterns)})" for i in self.regex_intents]
+        self._regex = re.compile(r"\b(?:" + "|".join(groups) + r")\b", re.IGNORECASE)
+
+    def _fast(self, i, whole):
+        # does intent i, matched on the whole message or on part of it, skip the search?
+        fast_path = self.intents[i].fast_path
+        return fast_path is True or (whole and fast_path == WHOLE_MESSAGE)
+
+    def _scan(self, text, tokens=None):
+        # highest-priority intent (index), its regex match if any, and whether
+        # any fast-path intent showed up. tokens: words(text) when already split
+        best, best_m, fast = None, None, False
+        if tokens is None:
+            tokens = words(text)
+        phrases = self.phrases
+        for start in range(len(tokens)):
+            for n in range(1, min(self.max_words, len(tokens) - start) + 1):
+                i = phrases.get(tuple(tokens[start:start + n]))
+                if i is None:
+                    continue
+                fast = fast or self._fast(i, n == len(tokens))
+                if best is None or i < best:
+                    best = i
+        if self._regex is not None:
+            for m in self._regex.finditer(text):
+                i = int(m.lastgroup[1:])
+                fast = fast or self._fast(i, words(m.group()) == tokens)
+                if best is None or i < best:
+                    best, best_m = i, m
+        return best, best_m, fast
+
+    def match(self, text):
+        # (intent, regex match or None) of the highest-priority intent in text, or None
+        best, m, _ = self._scan(text)
+        return None if best is None else (self.intents[best], m)
+
+    def classify(self, text):
+        best, _, _ = self._scan(text)
+        return None if best is None else self.intents[best].name
+
+    def reply(self, text, fast_path_only=False, tokens=None):
+        # reply of the highest-priority intent; with fast_path_only, None unless
+        # the message contains at least one fast-path intent (or is a WHOLE_MESSAGE one)
+        best, m, fast = self._scan(text, tokens)
+        if best is None or (fast_path_only and not fast):
+            return None
+        reply = self.intents[best].reply
+        return reply(m, text) if callable(reply) else reply
+
+
+INTENT_MATCHER = IntentMatcher()
@@ -0,0 +1,118 @@
+# World Cup 2022 knowledge base: QA pairs, tournament stats, follow-ups and canned replies.
+#
+# The data lives in harif/data/wc2022.json (a .yaml/.yml file works too when
+# PyYAML is installed). get_knowledge() loads it once per process and hands
+# every session the same read-only copy. When the file changes on disk the
+# next call (checked at most every RELOAD_CHECK_SECONDS) swaps in the new
+# version; answers already in progress keep the one they started with.
+#
+# Other World Cup editions live next to it, one file each (wc2018.json, ...),
+# with an "edition" section naming the year, the hosts and the goals CSV; see
+# harif.editions. get_knowledge(path) keeps one copy per file the same way.
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+from pathlib import Path
+from types import MappingProxyType
+
+log = logging.getLogger(__name__)
+
+KNOWLEDGE_PATH = Path(os.environ.get("HARIF_KNOWLEDGE", Path(__file__).resolve().parent / "data" / "wc2022.json"))
+RELOAD_CHECK_SECONDS = 2.0
+SECTIONS = ("qa", "stats", "follow_up_questions", "responses")
+
+Knowledge = namedtuple("Knowledge", "version qa stats follow_up_questions responses path mtime_ns edition")
+
+
+class FrozenList(tuple):
+    """A read-only list: a tuple that prints as the list it was loaded from."""
+
+    __slots__ = ()
+
+    def __repr__(self):
+        # answers show lists as the file has them: ['Joško Gvardiol', 'Mislav Oršić']
+        return repr(list(self))
+
+
+def freeze(value):
+    # read-only views all the way down: dicts become mappingproxies, lists FrozenLists
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(val) for key, val in value.items()})
+    if isinstance(value, list):
+        return FrozenList(freeze(val) for val in value)
+    return value
+
+
+def load_knowledge(path=KNOWLEDGE_PATH):
+    path = Path(path)
+    mtime_ns = path.stat().st_mtime_ns         # before reading, so a later edit is still noticed
+    raw = path.read_bytes()
+    if path.suffix.lower() in (".yaml", ".yml"):
+        import yaml                             # only needed for YAML knowledge files
+        data = yaml.safe_load(raw)
+    else:
+        data = json.loads(raw)
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: expected an object with {', '.join(SECTIONS)}")
+    missing = [s for s in SECTIONS if not isinstance(data.get(s), dict)]
+    if missing:
+        raise ValueError(f"{path}: missing or malformed sections: {', '.join(missing)}")
+    edition = data.get("edition") or {}
+    if not isinstance(edition, dict):
+        raise ValueError(f"{path}: malformed section: edition")
+    # the file's own version plus a content hash, so any edit gives a new version
+    version = f"{data.get('version', '0')}+{hashlib.sha256(raw).hexdigest()[:8]}"
+    return Knowledge(version, *(freeze(data[s]) for s in SECTIONS), path, mtime_ns, freeze(edition))
+
+
+class _Loaded:
+    __slots__ = ("knowledge", "next_check", "failed_mtime")
+
+    def __init__(self, knowledge):
+        self.knowledge = knowledge
+        self.next_check = time.monotonic() + RELOAD_CHECK_SECONDS
+        self.failed_mtime = None
+
+
+_loaded = {}                  # path -> _Loaded
+_knowledge_lock = threading.Lock()
+
+
+def get_knowledge(path=None):
+    # the shared knowledge base (KNOWLEDGE_PATH unless another file is named),
+    # reloaded when its file has changed
+    path = KNOWLEDGE_PATH if path is None else Path(path)
+    entry = _loaded.get(path)
+    if entry is not None and time.monotonic() < entry.next_check:
+        return entry.knowledge
+    with _knowledge_lock:
+        entry = _loaded.get(path)
+        if entry is None:
+            entry = _loaded[path] = _Loaded(load_knowledge(path))
+        elif time.monotonic() >= entry.next_check:
+            try:
+                mtime_ns = path.stat().st_mtime_ns
+            except OSError:
+                mtime_ns = entry.knowledge.mtime_ns
+            if mtime_ns not in (entry.knowledge.mtime_ns, entry.failed_mtime):
+                try:
+                    entry.knowledge = load_knowledge(path)
+                    entry.failed_mtime = None
+                except (OSError, ValueError) as e:
+                    # a half-saved or broken edit: keep answering from the last good version
+                    entry.failed_mtime = mtime_ns
+                    log.warning("keeping knowledge %s, reload failed: %s", entry.knowledge.version, e)
+            entry.next_check = time.monotonic() + RELOAD_CHECK_SECONDS
+    return entry.knowledge
+
+
+# the version loaded at import, for code that reads the tables directly;
+# get_knowledge() is the one that follows edits
+WC_2022_QA = get_knowledge().qa
+WC_2022_STATS = get_knowledge().stats
+FOLLOW_UP_QUESTIONS = get_knowledge().follow_up_questions
+RESPONSES = get_knowledge().responses
@@ -0,0 +1,33 @@
+# One pass over a message before the cascade: lower-cased once, split once
+# into the intent matcher's words and into search keywords, with the language
+# and off-topic flags decided on the same tokens. Every later stage (greeting
+# check, typo fixes, aggregates, sources) gets these instead of re-splitting
+# the text, and the cascade can answer a non-English or off-topic message
+# before correcting any typo.
+#
+# The regexes and word sets are compiled once at import (harif.replies,
+# harif.search, harif.intents); keywords and flags are exactly what
+# extract_keywords, is_english and is_external_topic return.
+from collections import namedtuple
+
+from harif.intents import WORD_RE
+from harif.replies import EXTERNAL_KEYWORDS, is_english
+from harif.search import STOP_WORDS
+
+# words: the intent matcher's tokens; keywords: the search keywords
+Message = namedtuple("Message", "text words keywords english external")
+
+
+def preprocess(text):
+    # the text is split on whitespace once; only tokens with punctuation in them
+    # go through the intent matcher's word regex ("morocco's" -> "morocco's", "u.s." -> "u", "s")
+    words, keywords = [], []
+    for token in text.lower().split():
+        if token.isalnum():
+            words.append(token)
+        else:
+            words += [w.strip("'") for w in WORD_RE.findall(token)]
+            token = token.replace("?", "")
+        if len(token) > 2 and token not in STOP_WORDS:
+            keywords.append(token)
+    return Message(text, words, keywords, is_english(text), not EXTERNAL_KEYWORDS.isdisjoint(keywords))
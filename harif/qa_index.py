@@ -0,0 +1,75 @@
+from collections import Counter, defaultdict
+from functools import lru_cache
+
+NGRAM = 3
+
+
+def _ngrams(text, n=NGRAM):
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class QAIndex:
+    """Inverted index over the QA keys, built once and reused for every question.
+
+    Keys are indexed by character trigrams so that `search` gives exactly the
+    same answer as the linear `search_in_qa` scan (substring matching, first
+    key wins on ties) without looping over every key.
+    """
+
+    def __init__(self, qa_data, cache_size=4096):
+        self.keys = []
+        self.answers = []
+        postings = defaultdict(set)
+        for i, (key, answer) in enumerate(qa_data.items()):
+            key_lower = key.lower()
+            self.keys.append(key_lower)
+            self.answers.append(answer)
+            for gram in _ngrams(key_lower):
+                postings[gram].add(i)
+        self.postings = {gram: frozenset(ids) for gram, ids in postings.items()}
+        self.all_ids = frozenset(range(len(self.keys)))
+        # keyword -> ids of the keys containing it; questions repeat a lot
+        self.matches = lru_cache(maxsize=cache_size)(self._matches)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _matches(self, kw):
+        if not kw:
+            return self.all_ids
+        if len(kw) < NGRAM:
+            # too short for a trigram lookup (extract_keywords never yields these)
+            return frozenset(i for i, key in enumerate(self.keys) if kw in key)
+
+        # intersect the rarest trigrams first, then confirm the real substring
+        candidates = None
+        for gram in sorted(_ngrams(kw), key=lambda g: len(self.postings.get(g, ()))):
+            ids = self.postings.get(gram)
+            if not ids:
+                return frozenset()
+            candidates = ids if candidates is None else candidates & ids
+            if not candidates:
+                return frozenset()
+        return frozenset(i for i in candidates if kw in self.keys[i])
+
+    def search(self, keywords):
+        if not self.keys:
+            return None
+        match_sets = [self.matches(kw) for kw in keywords]
+
+        # بحث دقيق: أول مفتاح يحتوي كل الكلمات المفتاحية
+        if match_sets:
+            common = frozenset.intersection(*sorted(match_sets, key=len))
+        else:
+            common = self.all_ids
+        if common:
+            return self.answers[min(common)]
+
+        # بحث أقل دقة: المفتاح صاحب أكبر عدد من التطابقات (الأول عند التعادل)
+        counts = Counter()
+        for ids in match_sets:
+            counts.update(ids)
+        if not counts:
+            return None
+        best = min(counts, key=lambda i: (-counts[i], i))
+        return self.answers[best]
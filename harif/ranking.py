@@ -0,0 +1,157 @@
+# One BM25 index over every answer source: QA pairs, the flattened stats
+# (nested dicts like "top scorers" included) and the rows of the goals table.
+#
+# Each posting stores its precomputed BM25 weight, so scoring a query is just
+# summing the matched postings per document and picking the top k among those
+# candidates; documents the query shares no term with cost nothing.
+import math
+import re
+import unicodedata
+from collections import Counter, defaultdict, namedtuple
+from collections.abc import Mapping
+
+import numpy as np
+
+from harif.search import STOP_WORDS, format_row
+
+Hit = namedtuple("Hit", "score source key answer")
+
+TOKEN_RE = re.compile(r"\w+")
+
+# question filler on top of the keyword stop words
+RANKING_STOP_WORDS = STOP_WORDS | {
+    "did", "does", "do", "many", "much", "was", "were", "are", "with", "from", "this",
+    "that", "have", "has", "had", "tell", "about", "there", "which", "any", "can", "you",
+}
+
+# a word in the key ("golden boot") counts this many times more than one in the answer text
+KEY_WEIGHT = 2
+
+# how much each source's scores count; QA entries are hand-written answers and
+# win over a raw goal row with the same score
+SOURCE_WEIGHTS = {"qa": 1.0, "stats": 0.9, "goals": 0.8}
+
+
+def fold(text):
+    # lower-case and drop accents, so "mbappe" finds "Mbappé"
+    text = unicodedata.normalize("NFKD", str(text).lower())
+    return "".join(ch for ch in text if not unicodedata.combining(ch))
+
+
+def tokenize(text):
+    return [t for t in TOKEN_RE.findall(fold(text))
+            if t not in RANKING_STOP_WORDS and (len(t) > 2 or t.isdigit())]
+
+
+class RankingIndex:
+    """BM25 over documents given as (source, key, title, body, answer) tuples.
+
+    title words (the QA key, the stats key) count KEY_WEIGHT times, body words once.
+    """
+
+    def __init__(self, documents, k1=1.2, b=0.75, source_weights=SOURCE_WEIGHTS):
+        self.sources, self.keys, self.answers = [], [], []
+        term_docs = defaultdict(list)
+        lengths = []
+        for doc_id, (source, key, title, body, answer) in enumerate(documents):
+            self.sources.append(source)
+            self.keys.append(key)
+            self.answers.append(answer)
+            tokens = tokenize(title) * KEY_WEIGHT + tokenize(body)
+            lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                term_docs[term].append((doc_id, tf))
+
+        n = len(lengths)
+        lengths = np.asarray(lengths, dtype=np.float64)
+        avg = lengths.mean() if n and lengths.mean() else 1.0
+        self.k1, self.b, self.avg_length, self.source_weights = k1, b, avg, source_weights
+        norms = k1 * (1 - b + b * lengths / avg)
+        boost = np.asarray([source_weights.get(s, 1.0) for s in self.sources])
+
+        self.postings = {}
+        for term, docs in term_docs.items():
+            ids = np.fromiter((d for d, _ in docs), dtype=np.int64, count=len(docs))
+            tf = np.fromiter((t for _, t in docs), dtype=np.float64, count=len(docs))
+            idf = math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            weights = idf * tf * (k1 + 1) / (tf + norms[ids]) * boost[ids]
+            self.postings[term] = (ids, weights.astype(np.float32))
+        self.size = n
+
+    def __len__(self):
+        return self.size
+
+    def add(self, documents):
+        # append documents (new goal rows) without a rebuild. Their weights use
+        # the idf and average length as of now; earlier documents keep theirs,
+        # which only drifts once the appended part is a sizeable share of the index
+        k1, b = self.k1, self.b
+        for source, key, title, body, answer in documents:
+            doc_id = self.size
+            self.sources.append(source)
+            self.keys.append(key)
+            self.answers.append(answer)
+            tokens = tokenize(title) * KEY_WEIGHT + tokenize(body)
+            norm = k1 * (1 - b + b * len(tokens) / self.avg_length)
+            boost = self.source_weights.get(source, 1.0)
+            for term, tf in Counter(tokens).items():
+                ids, weights = self.postings.get(term, (None, None))
+                docs = 1 if ids is None else len(ids) + 1
+                idf = math.log(1 + (doc_id + 1 - docs + 0.5) / (docs + 0.5))
+                weight = np.float32(idf * tf * (k1 + 1) / (tf + norm) * boost)
+                if ids is None:
+                    self.postings[term] = (np.array([doc_id], dtype=np.int64), np.array([weight]))
+                else:
+                    self.postings[term] = (np.append(ids, doc_id), np.append(weights, weight))
+            # last, so a search never sees a document id past its score array
+            self.size = doc_id + 1
+
+    def search(self, query, k=5):
+        # top-k hits for a query string or a list of keywords, best first
+        if not isinstance(query, str):
+            query = " ".join(query)
+        terms = [t for t in set(tokenize(query)) if t in self.postings]
+        if not terms:
+            return []
+        size = self.size
+        matched_ids, matched_weights = [], []
+        for term in terms:
+            ids, weights = self.postings[term]
+            if len(ids) and ids[-1] >= size:
+                # added after this search started
+                keep = np.searchsorted(ids, size)
+                ids, weights = ids[:keep], weights[:keep]
+            matched_ids.append(ids)
+            matched_weights.append(weights)
+        # one score per candidate (a document with at least one query term), in id order
+        if len(terms) == 1:
+            candidates, scores = matched_ids[0], matched_weights[0]
+        else:
+            candidates, slots = np.unique(np.concatenate(matched_ids), return_inverse=True)
+            scores = np.bincount(slots, np.concatenate(matched_weights), len(candidates)).astype(np.float32)
+        if not len(candidates):
+            return []
+        k = min(k, len(candidates))
+        # every candidate scoring at least the k-th best, so a tie at the cut
+        # keeps the lower document ids; then best first, the lower id on a tie
+        kth = scores[np.argpartition(-scores, k - 1)[k - 1]]
+        top = np.flatnonzero(scores >= kth)
+        top = top[np.lexsort((candidates[top], -scores[top]))][:k]
+        return [Hit(float(scores[i]), self.sources[c], self.keys[c], self.answers[c])
+                for i, c in zip(top, candidates[top]) if scores[i] > 0]
+
+
+def build_documents(qa_data, stats_data, df=None, first_row=0):
+    for key, answer in qa_data.items():
+        yield "qa", key, key, answer, answer
+    for key, val in stats_data.items():
+        if isinstance(val, Mapping):
+            for subkey, subval in val.items():
+                # the parent key ("top scorers") is searchable too
+                yield "stats", f"{key} / {subkey}", f"{key} {subkey}", subval, f"{subkey.title()}: {subval}"
+        else:
+            yield "stats", key, key, val, f"{key.replace('_', ' ').title()}: {val}"
+    if df is not None:
+        for i, row in enumerate(df.to_dict("records"), first_row):
+            text = " ".join(str(v) for v in row.values())
+            yield "goals", f"row {i}", "", text, format_row(row)
@@ -0,0 +1,46 @@
+# Language/topic gates, follow-ups, canned responses and the ELIZA fallback.
+import random
+import re
+
+from harif.dispatch import phrase_table
+from harif.intents import DEFAULT_REPLY, INTENT_MATCHER
+from harif.knowledge import get_knowledge
+
+
+ARABIC_RE = re.compile(r'[\u0600-\u06FF]')
+LATIN_RE = re.compile(r'[A-Za-z]')
+
+#___________________________________________________________________________
+def is_english(text: str) -> bool:
+    # ASCII text cannot contain Arabic script: only look for Latin letters
+    if text.isascii():
+        return LATIN_RE.search(text) is not None
+    # If it contains Arabic script, treat as non-English
+    if ARABIC_RE.search(text):
+        return False
+    # Otherwise, consider it English if it has any Latin letters
+    return LATIN_RE.search(text) is not None
+
+EXTERNAL_KEYWORDS = frozenset({"basketball", "tennis", "politics", "music", "movie", "weather", "news", "technology", "stock", "economy"})
+
+def is_external_topic(keywords):
+    return not EXTERNAL_KEYWORDS.isdisjoint(keywords)
+
+def random_choice(choices):
+    return random.choice(choices) if choices else None
+
+def get_follow_up(keywords, knowledge=None):
+    # the first phrase of the message with its own follow-ups ("golden boot"), else a general one;
+    # from knowledge (an edition's), the shared knowledge base when None
+    knowledge = knowledge or get_knowledge()
+    choices = phrase_table(knowledge).lookup(keywords, "follow_ups")
+    if choices is None:
+        choices = knowledge.follow_up_questions.get('general', [])
+    return random_choice(choices)
+
+def get_random_response(keywords, knowledge=None):
+    choices = phrase_table(knowledge or get_knowledge()).lookup(keywords, "responses")
+    return random_choice(choices) if choices is not None else None
+
+def eliza_reply(user_input):
+    return INTENT_MATCHER.reply(user_input) or DEFAULT_REPLY
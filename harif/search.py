@@ -0,0 +1,61 @@
+# Plain search helpers shared by the Streamlit page and the benchmarks.
+# Nothing here imports streamlit, so it can be used (and timed) headless.
+from collections.abc import Mapping
+
+
+def clean_text(text):
+    return text.lower().strip()
+
+STOP_WORDS = frozenset({"is", "the", "what", "who", "when", "where", "how", "and", "or", "of", "a", "an", "in", "to", "for"})
+
+def extract_keywords(user_input: str):
+    words = user_input.lower().replace("?", "").split()
+    keywords = [w for w in words if w not in STOP_WORDS and len(w) > 2]
+    return keywords
+
+def search_in_qa(keywords, qa_data):
+    # بحث دقيق: المفاتيح التي تحتوي كل الكلمات المفتاحية
+    for key, answer in qa_data.items():
+        key_lower = key.lower()
+        if all(kw in key_lower for kw in keywords):
+            return answer
+
+    # بحث أقل دقة: المفاتيح التي تحتوي أي كلمة مفتاحية، لكن تحقق أقصى تطابق
+    best_match = None
+    best_match_count = 0
+    for key, answer in qa_data.items():
+        key_lower = key.lower()
+        count = sum(1 for kw in keywords if kw in key_lower)
+        if count > best_match_count:
+            best_match = answer
+            best_match_count = count
+
+    if best_match_count > 0:
+        return best_match
+
+    return None
+
+
+def search_in_stats(keywords, stats_data):
+    for key, val in stats_data.items():
+        if isinstance(val, Mapping):
+            for subkey, subval in val.items():
+                if any(kw in subkey.lower() for kw in keywords):
+                    return f"{subkey.title()}: {subval}"
+        else:
+            if any(kw in key.lower() for kw in keywords):
+                return f"{key.replace('_', ' ').title()}: {val}"
+    return None
+
+
+def format_row(row):
+    # a goals-table row as the "Column: value" lines the chat shows
+    return "\n".join(f"{key}: {val}" for key, val in row.items())
+
+
+def search_in_dataset(keywords, df):
+    df_combined = df.astype(str).fillna("nan").apply(lambda row: ' '.join(row.values).lower(), axis=1)
+    for i, row in enumerate(df_combined):
+        if all(kw in row for kw in keywords):
+            return df.iloc[i].to_dict()
+    return None
@@ -0,0 +1,308 @@
+# Semantic retrieval: every QA pair and stats entry as a vector, so a question
+# finds its answer by meaning rather than by shared words ("who lifted the
+# trophy" -> the "champion" entry).
+#
+# The vectors come from a small sentence-transformers model on the CPU when it
+# is installed (HARIF_EMBEDDING_MODEL, all-MiniLM-L6-v2 by default), otherwise
+# from hashed TF-IDF over words and character trigrams, plus a few football
+# synonyms. The L2-normalised float32 vectors are stored feature by feature in
+# an .npy file next to the knowledge file and opened with mmap_mode="r":
+# processes share the pages, a restart reads nothing until the first query
+# touches them, and a TF-IDF query (a few dozen features) reads only its own
+# features' rows. The file is rebuilt when the entries or the encoder change.
+#
+# A query is one vector-matrix product over every entry. From ANN_MIN_ROWS
+# entries on, an IVF index (k-means lists, stored with the matrix) scores only
+# the NPROBE lists nearest to the query instead.
+import hashlib
+import json
+import logging
+import math
+import os
+import zlib
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+from harif.ranking import Hit, tokenize
+
+log = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "all-MiniLM-L6-v2"
+CACHE_VERSION = 1
+ANN_MIN_ROWS = 100_000        # below this every entry is scored: a few ms at most
+NPROBE = 16                   # IVF lists scored per query
+KMEANS_ITERATIONS = 8
+KMEANS_SAMPLE = 50_000
+
+# words of a question mapped to the words the knowledge base uses for the same
+# thing; only the TF-IDF vectors need this, a sentence model knows it already
+SYNONYMS = {
+    "trophy": "champion", "title": "champion", "lifted": "champion", "winner": "champion",
+    "winners": "champion", "keeper": "goalkeeper glove", "goalkeeper": "glove",
+    "scorer": "boot goals", "striker": "boot goals", "manager": "coach", "ref": "referee",
+    "venue": "stadium", "arena": "stadium", "crowd": "attendance", "spectators": "attendance",
+    "fans": "attendance", "anthem": "songs", "song": "songs", "hosted": "location host",
+}
+
+
+def features(text):
+    # hashed feature ids (words, then character trigrams) of text with their counts
+    counts = Counter()
+    for token in tokenize(text):
+        for word in [token, *SYNONYMS.get(token, "").split()]:
+            counts[f"w:{word}"] += 2
+            padded = f"#{word}#"
+            for i in range(len(padded) - 2):
+                counts[padded[i:i + 3]] += 1
+    return counts
+
+
+class HashingEncoder:
+    """Hashed TF-IDF vectors; no model or extra package needed."""
+
+    min_score = 0.3           # cosine below this is no answer
+
+    def __init__(self, dim=2048):
+        self.dim = dim
+        self.name = f"tfidf{dim}"
+        self.idf = np.ones(dim, dtype=np.float32)
+
+    def _hashed(self, text):
+        # crc32, not hash(): the ids must be the same in every process
+        buckets = Counter()
+        for feature, count in features(text).items():
+            buckets[zlib.crc32(feature.encode("utf-8")) % self.dim] += count
+        return buckets
+
+    def fit(self, texts):
+        df = np.zeros(self.dim, dtype=np.float64)
+        n = 0
+        for text in texts:
+            ids = list(self._hashed(text))
+            df[ids] += 1
+            n += 1
+        self.idf = (np.log((1 + n) / (1 + df)) + 1).astype(np.float32)
+
+    def state(self):
+        return {"idf": self.idf.tolist()}
+
+    def load_state(self, state):
+        self.idf = np.asarray(state["idf"], dtype=np.float32)
+
+    def encode(self, texts):
+        texts = list(texts)
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for i, count in self._hashed(text).items():
+                out[row, i] = (1 + math.log(count)) * self.idf[i]
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        return out / np.where(norms == 0, 1, norms)
+
+
+class SentenceEncoder:
+    """A sentence-transformers model run on the CPU."""
+
+    min_score = 0.45
+
+    def __init__(self, model=DEFAULT_MODEL):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.name = "st-" + model.replace("/", "-")
+
+    def fit(self, texts):
+        pass
+
+    def state(self):
+        return {}
+
+    def load_state(self, state):
+        pass
+
+    def encode(self, texts):
+        vectors = self.model.encode(list(texts), batch_size=64, normalize_embeddings=True, convert_to_numpy=True)
+        return np.asarray(vectors, dtype=np.float32)
+
+
+def get_encoder(model=None):
+    # the sentence model when sentence-transformers (and the model) is available, else hashed TF-IDF
+    model = os.environ.get("HARIF_EMBEDDING_MODEL", DEFAULT_MODEL) if model is None else model
+    if model and model != "tfidf":
+        try:
+            return SentenceEncoder(model)
+        except ImportError:
+            pass
+        except Exception as e:
+            # installed but the model could not be loaded (no network for the first download, ...)
+            log.warning("embedding model %s unavailable, using TF-IDF: %s", model, e)
+    return HashingEncoder()
+
+
+def document_text(title, body):
+    return f"{title}: {body}" if title else str(body)
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get("version") == CACHE_VERSION else None
+
+
+def _write_index(path, matrix, lists, meta):
+    # temp files + rename, meta last, so a reader never sees half an index; returns the memmap
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        np.save(f, matrix)
+    os.replace(tmp, path)
+    if lists is not None:
+        tmp = path.with_name(path.name + ".ivf.tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, centroids=lists[0], order=lists[1], bounds=lists[2])
+        os.replace(tmp, path.with_suffix(".ivf.npz"))
+    meta_path = path.with_suffix(".json")
+    tmp = meta_path.with_name(meta_path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(tmp, meta_path)
+    return np.load(path, mmap_mode="r")
+
+
+def kmeans(matrix, lists, iterations=KMEANS_ITERATIONS, seed=0):
+    # spherical k-means on (a sample of) the rows: unit-length centroids
+    rng = np.random.default_rng(seed)
+    sample = matrix[np.sort(rng.choice(len(matrix), min(len(matrix), KMEANS_SAMPLE), replace=False))]
+    centroids = sample[rng.choice(len(sample), lists, replace=False)].copy()
+    for _ in range(iterations):
+        assign = np.argmax(sample @ centroids.T, axis=1)
+        for c in range(lists):
+            members = sample[assign == c]
+            if len(members):
+                centroids[c] = members.sum(axis=0)
+        centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+    return centroids
+
+
+def ivf_lists(vectors):
+    # (centroids, order, bounds): each row goes to its nearest of about sqrt(n)
+    # centroids; order lists the rows list by list, list c is order[bounds[c]:bounds[c + 1]]
+    lists = max(1, int(math.sqrt(len(vectors))))
+    centroids = kmeans(vectors, lists)
+    assign = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), 8192):
+        assign[start:start + 8192] = np.argmax(vectors[start:start + 8192] @ centroids.T, axis=1)
+    order = np.argsort(assign, kind="stable")
+    bounds = np.searchsorted(assign[order], np.arange(lists + 1))
+    return centroids, order, bounds
+
+
+class SemanticIndex:
+    """Embeddings of (source, key, title, body, answer) documents, searched by cosine similarity.
+
+    The matrix is stored feature by feature (dim x rows), so a sparse TF-IDF
+    query only reads the rows of its own features. path: the .npy file to keep
+    it in (a .json with the same stem records what it was built from); None
+    keeps it in memory only.
+    """
+
+    def __init__(self, documents, encoder=None, path=None, ann_min_rows=ANN_MIN_ROWS, nprobe=NPROBE):
+        self.encoder = encoder or get_encoder()
+        self.sources, self.keys, self.answers, texts = [], [], [], []
+        for source, key, title, body, answer in documents:
+            self.sources.append(source)
+            self.keys.append(key)
+            self.answers.append(answer)
+            texts.append(document_text(title, body))
+        self.nprobe = nprobe
+        # centroids/order/bounds: the IVF lists, None below ann_min_rows
+        ivf = bool(texts) and len(texts) >= ann_min_rows
+        self.matrix, lists = self._load_or_build(texts, None if path is None else Path(path), ivf)
+        self.centroids, self.order, self.bounds = lists or (None, None, None)
+
+    def __len__(self):
+        return len(self.answers)
+
+    def _load_or_build(self, texts, path, ivf):
+        digest = hashlib.sha256("\0".join(texts).encode("utf-8")).hexdigest()
+        meta = {"version": CACHE_VERSION, "encoder": self.encoder.name, "rows": len(texts), "sha256": digest,
+                "ivf": ivf}
+        if path is not None:
+            old = _read_meta(path.with_suffix(".json"))
+            if old and all(old.get(k) == v for k, v in meta.items()):
+                try:
+                    matrix = np.load(path, mmap_mode="r")
+                    lists = None
+                    if ivf:
+                        with np.load(path.with_suffix(".ivf.npz")) as z:
+                            lists = z["centroids"], z["order"], z["bounds"]
+                    if matrix.shape == (self.encoder.dim, len(texts)):
+                        self.encoder.load_state(old.get("encoder_state", {}))
+                        return matrix, lists
+                except (OSError, ValueError, KeyError):
+                    pass
+        self.encoder.fit(texts)
+        vectors = self.encoder.encode(texts) if texts else np.zeros((0, self.encoder.dim), dtype=np.float32)
+        lists = None
+        if ivf:
+            lists = ivf_lists(vectors)
+            # each list's columns side by side, so scoring a list reads one slice
+            vectors = vectors[lists[1]]
+        matrix = np.ascontiguousarray(vectors.T)
+        if path is not None:
+            try:
+                return _write_index(path, matrix, lists, {**meta, "encoder_state": self.encoder.state()}), lists
+            except OSError:
+                # a read-only folder: keep the vectors in memory
+                pass
+        return matrix, lists
+
+    def _dot(self, vector, features, start=0, stop=None):
+        # vector . columns start:stop; with features, only those rows of the matrix are read
+        if features is None:
+            return vector @ self.matrix[:, start:stop]
+        return vector[features] @ self.matrix[features, start:stop]
+
+    def scores(self, vector):
+        # (document ids, cosine scores) of the documents this query is compared with;
+        # ids None: every document, in order
+        features = np.flatnonzero(vector)
+        if len(features) * 4 > len(vector):
+            # a dense embedding: the whole matrix is read either way
+            features = None
+        if self.centroids is None:
+            return None, self._dot(vector, features)
+        probe = min(self.nprobe, len(self.centroids))
+        ids, scores = [], []
+        for c in np.argpartition(-(self.centroids @ vector), probe - 1)[:probe]:
+            start, stop = self.bounds[c], self.bounds[c + 1]
+            ids.append(self.order[start:stop])
+            scores.append(self._dot(vector, features, start, stop))
+        return np.concatenate(ids), np.concatenate(scores)
+
+    def search(self, query, k=5):
+        # top-k hits for a query string or a list of keywords, best first; none below the encoder's min_score
+        if not isinstance(query, str):
+            query = " ".join(query)
+        if not len(self):
+            return []
+        vector = self.encoder.encode([query])[0]
+        if not vector.any():
+            return []
+        ids, scores = self.scores(vector)
+        if not len(scores):
+            return []
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        rows = top if ids is None else ids[top]
+        # best first, the earlier entry on a tie (the QA pair before the stats entry)
+        best = np.lexsort((rows, -scores[top]))
+        hits = []
+        for i, row in zip(top[best], rows[best]):
+            if scores[i] < self.encoder.min_score:
+                break
+            hits.append(Hit(float(scores[i]), self.sources[row], self.keys[row], self.answers[row]))
+        return hits
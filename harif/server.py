@@ -0,0 +1,137 @@
+# HTTP/JSON answers for the mobile app and other bots, without Streamlit.
+#
+#   python -m harif.server --workers 4 --port 8000
+#
+#   POST /answer  {"question": "who won the golden boot?"}
+#              -> {"answer": "...", "follow_up": "..."}
+#   POST /answer  {"questions": ["...", "..."]}       (at most MAX_BATCH)
+#              -> {"answers": [{"answer": ..., "follow_up": ...}, ...]}
+#   GET  /health  -> {"status": "ok", "pid": ..., "editions": [...], ...}
+#
+# Every worker process loads the knowledge base and builds each edition's
+# indexes once, at startup, so its first request costs what the others do.
+# Answers are the chat page's (harif.editions). They are computed in the
+# request handler: the sources are in-memory, and the worker processes give
+# the parallelism. HARIF_ANSWER_BUDGET=seconds uses the async cascade instead,
+# so a hanging source cannot hold a reply past the budget.
+import argparse
+import asyncio
+import os
+import socket
+import time
+from contextlib import asynccontextmanager
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from uvicorn.protocols.http.h11_impl import H11Protocol
+
+from harif.editions import get_editions
+
+MAX_BATCH = 100
+ANSWER_BUDGET = float(os.environ.get("HARIF_ANSWER_BUDGET", 0)) or None
+
+
+@asynccontextmanager
+async def lifespan(app):
+    app.state.editions = get_editions().warm_up()
+    app.state.started = time.time()
+    app.state.answered = 0
+    yield
+
+
+def error(status, message):
+    return JSONResponse({"error": message}, status_code=status)
+
+
+async def answer_one(editions, question):
+    if ANSWER_BUDGET is None:
+        answer, follow_up = editions.answer(question)
+    else:
+        answer, follow_up = await editions.answer_async(question, budget=ANSWER_BUDGET)
+    return {"answer": answer, "follow_up": follow_up}
+
+
+async def answer(request):
+    try:
+        body = await request.json()
+    except ValueError:
+        return error(400, "the body must be JSON")
+    if not isinstance(body, dict) or ("question" in body) == ("questions" in body):
+        return error(400, 'send {"question": "..."} or {"questions": ["...", ...]}')
+    editions = request.app.state.editions
+
+    if "questions" in body:
+        questions = body["questions"]
+        if not isinstance(questions, list) or not all(isinstance(q, str) and q.strip() for q in questions):
+            return error(400, '"questions" must be a list of non-empty strings')
+        if len(questions) > MAX_BATCH:
+            return error(413, f"at most {MAX_BATCH} questions per request")
+        if ANSWER_BUDGET is None:
+            answers = [await answer_one(editions, q) for q in questions]
+        else:
+            # each within its own budget, all at once
+            answers = await asyncio.gather(*(answer_one(editions, q) for q in questions))
+        request.app.state.answered += len(answers)
+        return JSONResponse({"answers": answers})
+
+    question = body["question"]
+    if not isinstance(question, str) or not question.strip():
+        return error(400, '"question" must be a non-empty string')
+    reply = await answer_one(editions, question)
+    request.app.state.answered += 1
+    return JSONResponse(reply)
+
+
+async def health(request):
+    state = request.app.state
+    return JSONResponse({
+        "status": "ok",
+        "pid": os.getpid(),
+        "editions": [e.year for e in state.editions.editions],
+        "knowledge": state.editions.default.engine.knowledge.version,
+        "answered": state.answered,
+        "uptime_s": round(time.time() - state.started, 1),
+    })
+
+
+app = Starlette(routes=[
+    Route("/answer", answer, methods=["POST"]),
+    Route("/health", health, methods=["GET"]),
+], lifespan=lifespan)
+
+
+class HTTPProtocol(H11Protocol):
+    """uvicorn's h11 protocol with Nagle's algorithm off on every connection.
+
+    With several workers uvicorn binds the socket itself, asyncio does not
+    recognise it as TCP and leaves Nagle on, and a response (headers and body
+    written separately) then waits ~40 ms for the client's delayed ACK.
+    """
+
+    def connection_made(self, transport):
+        sock = transport.get_extra_info("socket")
+        if sock is not None and sock.family in (socket.AF_INET, socket.AF_INET6):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        super().connection_made(transport)
+
+
+def main(argv=None):
+    import uvicorn
+    parser = argparse.ArgumentParser(description="Serve Harif's answers over HTTP/JSON.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("-w", "--workers", type=int, default=1, help="worker processes, each with its own indexes")
+    parser.add_argument("--budget", type=float, default=None,
+                        help="answer with the async cascade within this many seconds (HARIF_ANSWER_BUDGET)")
+    parser.add_argument("--log-level", default="warning")
+    args = parser.parse_args(argv)
+    if args.budget:
+        # read by every worker process when it imports this module
+        os.environ["HARIF_ANSWER_BUDGET"] = str(args.budget)
+    uvicorn.run("harif.server:app", host=args.host, port=args.port, workers=args.workers,
+                http=HTTPProtocol, log_level=args.log_level)
+
+
+if __name__ == "__main__":
+    main()
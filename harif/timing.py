@@ -0,0 +1,23 @@
+import math
+
+
+def percentile(values, pct):
+    # nearest-rank percentile, pct in 0..100
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(values):
+    # latency summary (seconds in, milliseconds out) for the debug panel and benchmarks
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "last_ms": values[-1] * 1e3,
+        "p50_ms": percentile(values, 50) * 1e3,
+        "p95_ms": percentile(values, 95) * 1e3,
+        "max_ms": max(values) * 1e3,
+    }
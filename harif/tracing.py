@@ -0,0 +1,219 @@
+# Per-stage timings of the answer cascade: how long each step took (pre-processing,
+# greeting check, keywords, typo fixes, QA, stats, canned replies, goals table, ...)
+# and which step produced the reply.
+#
+# Off by default. run_cascade only asks TRACER.active once per answer and
+# passes trace=None down, so a disabled tracer costs a few `is None` checks.
+# Turn it on with HARIF_TRACE=1 (and HARIF_TRACE_LOG=path.jsonl for one JSON
+# line per answer), or from code with TRACER.enable(). TRACER.prometheus()
+# returns the aggregate counters in Prometheus text format.
+#
+# TRACER.profile_next() profiles the next answer only (cProfile, or
+# pyinstrument when installed and asked for), tracing on or off.
+import io
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+# histogram bucket bounds in seconds, Prometheus "le" labels
+BUCKETS = (0.00001, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+PROFILE_LINES = 30            # functions kept in a cProfile report
+
+
+class Trace:
+    """Timings of one answer; mark(stage) closes the stage that just ran."""
+
+    __slots__ = ("text", "start", "last", "stages", "source", "profiler")
+
+    def __init__(self, text):
+        self.text = text
+        self.start = self.last = time.perf_counter()
+        self.stages = {}
+        self.source = None
+        self.profiler = None
+
+    def mark(self, stage, hit=False):
+        # time since the previous mark goes to stage; hit=True: this stage answered
+        now = time.perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) + now - self.last
+        self.last = now
+        if hit and self.source is None:
+            self.source = stage
+
+
+class Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+
+class Tracer:
+    """Aggregate stage counters for every traced answer, plus the opt-in profiler."""
+
+    def __init__(self, enabled=False, log_path=None):
+        self.tracing = enabled
+        self.log_path = log_path
+        self.stages = {}              # stage -> Histogram
+        self.answers = {}             # source stage -> Histogram of the whole answer
+        self.last_profile = None      # text report of the last profiled answer
+        self._profile = None          # (tool, path) of a pending profile
+        self._lock = threading.Lock()
+        self._log = None
+        self.active = enabled         # the one flag run_cascade reads
+
+    @classmethod
+    def from_env(cls):
+        log_path = os.environ.get("HARIF_TRACE_LOG") or None
+        return cls(enabled=os.environ.get("HARIF_TRACE", "") not in ("", "0") or log_path is not None,
+                   log_path=log_path)
+
+    def _update(self):
+        self.active = self.tracing or self._profile is not None
+
+    def enable(self, log_path=None):
+        with self._lock:
+            if log_path is not None:
+                self._close_log()
+                self.log_path = log_path
+            self.tracing = True
+            self._update()
+        return self
+
+    def disable(self):
+        with self._lock:
+            self.tracing = False
+            self._close_log()
+            self._update()
+        return self
+
+    def reset(self):
+        with self._lock:
+            self.stages, self.answers = {}, {}
+
+    def profile_next(self, path=None, tool="cprofile"):
+        # profile the next answer; the report lands in last_profile (and in path if given)
+        if tool not in ("cprofile", "pyinstrument"):
+            raise ValueError(f"unknown profiler: {tool}")
+        with self._lock:
+            self._profile = (tool, path)
+            self._update()
+
+    def begin(self, text):
+        trace = Trace(text)
+        if self._profile is not None:
+            with self._lock:
+                profile, self._profile = self._profile, None
+                self._update()
+            if profile is not None:
+                trace.profiler = _start_profiler(*profile)
+                trace.start = trace.last = time.perf_counter()
+        return trace
+
+    def end(self, trace):
+        total = time.perf_counter() - trace.start
+        if trace.profiler is not None:
+            self.last_profile = _stop_profiler(*trace.profiler)
+        if not self.tracing:
+            return
+        source = trace.source or "none"
+        with self._lock:
+            for stage, seconds in trace.stages.items():
+                hist = self.stages.get(stage)
+                if hist is None:
+                    hist = self.stages[stage] = Histogram()
+                hist.observe(seconds)
+            hist = self.answers.get(source)
+            if hist is None:
+                hist = self.answers[source] = Histogram()
+            hist.observe(total)
+            if self.log_path:
+                self._write(trace, source, total)
+
+    def _write(self, trace, source, total):
+        if self._log is None:
+            self._log = open(self.log_path, "a", encoding="utf-8")
+        record = {"ts": round(time.time(), 3), "text": trace.text, "source": source,
+                  "total_ms": round(total * 1e3, 4),
+                  "stages_ms": {s: round(v * 1e3, 4) for s, v in trace.stages.items()}}
+        self._log.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._log.flush()
+
+    def _close_log(self):
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+    def snapshot(self):
+        # {"stages": {stage: {count, total_ms, mean_ms}}, "answers": {source: {...}}}
+        def summary(hists):
+            return {name: {"count": h.count, "total_ms": h.total * 1e3, "mean_ms": h.total / h.count * 1e3}
+                    for name, h in sorted(hists.items())}
+        with self._lock:
+            return {"stages": summary(self.stages), "answers": summary(self.answers)}
+
+    def prometheus(self):
+        # the counters in Prometheus text exposition format
+        lines = []
+        with self._lock:
+            for metric, label, hists, help_text in (
+                ("harif_stage_seconds", "stage", self.stages, "Time spent in each step of the answer cascade."),
+                ("harif_answer_seconds", "source", self.answers, "Answer time, by the step that produced the reply."),
+            ):
+                lines.append(f"# HELP {metric} {help_text}")
+                lines.append(f"# TYPE {metric} histogram")
+                for name, h in sorted(hists.items()):
+                    running = 0
+                    for bound, n in zip(BUCKETS + (float("inf"),), h.counts):
+                        running += n
+                        le = "+Inf" if bound == float("inf") else repr(bound)
+                        lines.append(f'{metric}_bucket{{{label}="{name}",le="{le}"}} {running}')
+                    lines.append(f'{metric}_sum{{{label}="{name}"}} {h.total:.9f}')
+                    lines.append(f'{metric}_count{{{label}="{name}"}} {h.count}')
+        return "\n".join(lines) + "\n"
+
+
+def _start_profiler(tool, path):
+    if tool == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            tool = "cprofile"
+        else:
+            profiler = Profiler(interval=0.0001)
+            profiler.start()
+            return tool, path, profiler
+    import cProfile
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return tool, path, profiler
+
+
+def _stop_profiler(tool, path, profiler):
+    if tool == "pyinstrument":
+        profiler.stop()
+        report = profiler.output_text(unicode=True)
+    else:
+        profiler.disable()
+        import pstats
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(PROFILE_LINES)
+        report = out.getvalue()
+        if path:
+            profiler.dump_stats(path)      # for snakeviz / pstats
+    if path and tool == "pyinstrument":
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(report)
+    return report
+
+
+TRACER = Tracer.from_env()
@@ -0,0 +1,32 @@
+# Shared fixtures. The tests import harif from the checkout and the golden
+# corpus helpers from benchmarks/golden.py, as the scripts there do.
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+from harif.dataset import load_goals
+from harif.engine import HarifEngine
+
+
+@pytest.fixture(scope="session")
+def goals():
+    # the goals table shipped with the app, compact dtypes
+    return load_goals(ROOT / "datasetFIFA.csv")
+
+
+@pytest.fixture(scope="session")
+def engine():
+    # the shipped knowledge base and goals table, indexes built, no response
+    # cache; tests must not add goals to it
+    return HarifEngine(cache_size=0).warm_up()
+
+
+@pytest.fixture
+def fresh_engine(goals):
+    # an engine of its own over a copy of the goals table, for tests that change it
+    return HarifEngine(df=goals.copy()).warm_up()
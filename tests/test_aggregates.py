@@ -0,0 +1,54 @@
+# Goal-count questions answered from the goals table.
+import pytest
+
+from harif.aggregates import GoalAggregates
+
+
+@pytest.mark.parametrize("question, expected", [
+    ("how many goals did morocco concede", "Morocco conceded 2 goals in the goals table"),
+    ("how many goals did Morocco score against Canada", "Morocco scored 2 goals against Canada in the goals table"),
+    ("how many goals did ferran torres score", "Ferran Torres (Spain) scored 2 goals in the goals table"),
+    ("how many goals did france score", "France scored 16 goals"),
+    ("how many goals did argentina score", "Argentina scored 15 goals"),
+    # players listed under "top scorers" get the table's count; a "<player> goals" key, its curated total
+    ("how many goals did saka score", "Bukayo Saka (England) scored 1 goal in the goals table"),
+    ("how many goals did giroud score", "Olivier Giroud (France) scored 1 goal in the goals table"),
+    ("how many goals did enner valencia score", "Enner Valencia (Ecuador) scored 3 goals in the goals table"),
+    ("how many goals did mbappé score", "Kylian Mbappé scored 8 goals"),
+    ("how many goals did messi score", "Lionel Messi scored 7 goals"),
+    ("how many goals did Ismaila Sarr score", "Ismaila Sarr (Senegal) scored 2 goals in the goals table"),
+    ("how many goals were scored in group c", "11 goals were scored in group C — most by Argentina (7)"),
+    ("goals at lusail stadium", "14 goals were scored at Lusail Iconic Stadium, Lusail"),
+    ("who scored before the 5th minute",
+     "2 goals were scored before the 5th minute: Alphonso Davies (Canada, 2'), Hakim Zyiech (Morocco, 4')"),
+])
+def test_goal_counts(engine, question, expected):
+    assert engine.answer(question)[0] == expected
+
+
+def test_counts_match_the_table(engine):
+    aggregates = GoalAggregates(engine.df)
+    assert aggregates.team_goals == engine.df["Team"].value_counts().to_dict()
+    assert sum(aggregates.group_goals.values()) == engine.df["Group"].notna().sum()
+
+
+def test_other_questions_fall_through(engine):
+    assert engine.aggregates.answer("who won the golden boot") is None
+    assert engine.aggregates.answer("how many goals did morocco score against") is None
+
+
+def test_score_against_is_not_conceded(engine):
+    assert "conceded" not in str(engine.answer("how many goals were scored against morocco")[0])
+
+
+def test_minute_ranges_say_whether_the_minute_counts(engine):
+    # the table's two latest goals are both in the 90th minute
+    assert engine.aggregates.answer("goals since the 90th minute").startswith(
+        "2 goals were scored from the 90th minute on:")
+    assert engine.aggregates.answer("goals after the 90th minute") == (
+        "No goals in the goals table were scored after the 90th minute")
+
+
+def test_team_top_scorers_list_each_player_once(engine):
+    answer = engine.answer("how many goals did germany score")[0]
+    assert answer.count("Füllkrug") == 1 and "Niclas Füllkrug (2)" in answer
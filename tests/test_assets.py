@@ -0,0 +1,44 @@
+# The sidebar image, resized once to the width it is shown at.
+import io
+import os
+
+from PIL import Image
+
+from harif.assets import cached_path, resized_image
+from harif.editions import warm_up_in_background
+
+
+def image(path, width, height):
+    Image.new("RGBA", (width, height), (200, 30, 30, 255)).save(path, "PNG")
+    return path
+
+
+def test_resized_copy_is_written_once(tmp_path):
+    path = image(tmp_path / "ball.png", 1200, 600)
+    data = resized_image(path, 400)
+    assert Image.open(io.BytesIO(data)).size == (400, 200)
+    copy = cached_path(path, 400)
+    assert copy.read_bytes() == data
+    os.remove(copy)
+    assert resized_image(path, 400) == data and not copy.exists()
+
+
+def test_a_changed_original_is_resized_again(tmp_path):
+    path = image(tmp_path / "ball.png", 800, 800)
+    resized_image(path, 400)
+    image(path, 800, 400)
+    bump = path.stat().st_mtime_ns + 1_000_000
+    os.utime(path, ns=(bump, bump))
+    assert Image.open(io.BytesIO(resized_image(path, 400))).size == (400, 200)
+
+
+def test_small_images_are_not_scaled_up(tmp_path):
+    path = image(tmp_path / "icon.png", 100, 50)
+    assert Image.open(io.BytesIO(resized_image(path, 400))).size == (100, 50)
+
+
+def test_warm_up_runs_once_per_process():
+    thread = warm_up_in_background()
+    assert warm_up_in_background() is thread
+    thread.join(60)
+    assert not thread.is_alive()
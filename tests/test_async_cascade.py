@@ -0,0 +1,57 @@
+# The cascade with its sources searched concurrently, within a latency budget.
+import asyncio
+import time
+
+import pytest
+
+from harif.async_cascade import Source, run_cascade_async
+from harif.cache import ResponseCache
+from harif.intents import DEFAULT_REPLY
+
+
+def slow(answer, seconds):
+    def search(keywords):
+        time.sleep(seconds)
+        return answer
+    return search
+
+
+def run(text, sources, **kwargs):
+    return asyncio.run(run_cascade_async(text, sources, **kwargs))
+
+
+@pytest.mark.parametrize("question", ["hello", "golden boot winner", "total goals", "Enner Valencia Qatar",
+                                      "how many goals did morocco concede", "xyzzy plugh", "the"])
+def test_same_answers_as_the_sync_cascade(engine, question):
+    # the follow-up is drawn at random, and the sources draw too: only its presence compares
+    answer, follow_up = engine.answer(question)
+    answer_async, follow_up_async = asyncio.run(engine.answer_async(question))
+    assert (answer_async, follow_up_async is None) == (answer, follow_up is None)
+
+
+def test_a_late_source_is_skipped_and_not_cached():
+    cache = ResponseCache()
+    sources = [Source("qa", slow("late", 0.2), 0.05), Source("stats", slow("on time", 0), 0.5)]
+    assert run("golden boot", sources, cache=cache)[0] == "on time"
+    assert len(cache) == 0
+
+
+def test_nothing_within_the_budget_falls_back_to_eliza():
+    sources = [Source("qa", slow("late", 0.3), 1.0)]
+    assert run("xyzzy plugh", sources, budget=0.05) == (DEFAULT_REPLY, None)
+
+
+def test_a_failing_source_is_skipped():
+    def broken(keywords):
+        raise RuntimeError("source down")
+    sources = [Source("qa", broken, 0.5), Source("stats", slow("stats answer", 0), 0.5)]
+    assert run("golden boot", sources)[0] == "stats answer"
+
+
+def test_a_slow_gate_does_not_use_up_the_budget():
+    # a cold engine builds its indexes in the gates; the sources still get the whole budget
+    def slow_correct(keywords):
+        time.sleep(0.2)
+        return keywords
+    sources = [Source("qa", slow("on time", 0.02), 0.5)]
+    assert run("golden boot", sources, correct=slow_correct, budget=0.1)[0] == "on time"
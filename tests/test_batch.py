@@ -0,0 +1,27 @@
+# Answering in bulk: the same answers inline and across a process pool.
+import multiprocessing
+
+from harif.batch import answer_batch, read_questions
+
+QUESTIONS = ["golden boot", "hello", "xyzzy plugh", "who won the world cup", "Enner Valencia Qatar"]
+
+
+def answers(**kwargs):
+    return [(r["index"], r["answer"], r["follow_up"]) for r in answer_batch(QUESTIONS, seed=3, **kwargs)]
+
+
+def test_workers_answer_as_inline(engine):
+    assert answers(workers=2, engine=engine) == answers(workers=1, engine=engine)
+
+
+def test_read_questions_from_json_lines():
+    lines = ['"golden boot"', '{"question": "hello"}', '{"content": "host"}', '{"other": 1}', "", '"  "']
+    assert list(read_questions(lines, jsonl=True)) == ["golden boot", "hello", "host"]
+
+
+def test_workers_start_with_spawn(engine, monkeypatch):
+    # nothing is inherited: each worker builds its engine from what it is handed
+    spawn = multiprocessing.get_context("spawn")
+    monkeypatch.setattr(multiprocessing, "get_all_start_methods", lambda: ["spawn"])
+    monkeypatch.setattr(multiprocessing, "get_context", lambda method=None: spawn)
+    assert answers(workers=2, engine=engine) == answers(workers=1, engine=engine)
@@ -0,0 +1,59 @@
+# The response cache in front of the cascade.
+from harif.cache import MISSING, ResponseCache
+from harif.engine import HarifEngine
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert cache.get("b") is MISSING
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+
+def test_entries_expire_after_ttl():
+    clock = Clock()
+    cache = ResponseCache(ttl=10, clock=clock)
+    cache.put("a", 1)
+    clock.now = 9
+    assert cache.get("a") == 1
+    clock.now = 20
+    assert cache.get("a") is MISSING
+    assert len(cache) == 0
+
+
+def test_maxsize_zero_caches_nothing():
+    cache = ResponseCache(maxsize=0)
+    cache.put("a", 1)
+    assert cache.get("a") is MISSING
+    assert cache.stats()["misses"] == 1
+
+
+
+def test_engine_answers_repeat_from_the_cache(engine):
+    cached = HarifEngine(qa_data=engine.qa_data, df=engine.df, cache_size=16)
+    first = cached.answer("golden boot winner")[0]
+    assert cached.answer("Golden boot winner?")[0] == first
+    assert cached.cache.stats()["hits"] == 1
+
+
+def test_discard_drops_matching_entries_and_stale_puts():
+    cache = ResponseCache()
+    cache.put(("x",), None)
+    cache.put(("y",), "answer")
+    generation = cache.generation
+    assert cache.discard(lambda key, value: value is None) == 1
+    # computed before the discard: may be stale, so it is not stored
+    cache.put(("z",), "late", generation)
+    assert cache.get(("z",)) is MISSING
+    assert cache.get(("y",)) == "answer"
@@ -0,0 +1,26 @@
+# Loading the goals table: compact dtypes, the same values, a parquet cache
+# kept while the CSV is unchanged.
+import shutil
+
+from harif.dataset import cache_paths, load_goals, read_csv
+from conftest import ROOT
+
+
+def test_compact_dtypes_keep_the_values(goals):
+    plain = read_csv(ROOT / "datasetFIFA.csv")
+    assert list(goals.columns) == list(plain.columns)
+    assert goals.astype(str).values.tolist() == plain.astype(str).values.tolist()
+    assert goals.memory_usage(deep=True).sum() < plain.memory_usage(deep=True).sum()
+
+
+def test_cache_follows_the_csv(tmp_path):
+    path = tmp_path / "goals.csv"
+    shutil.copy(ROOT / "datasetFIFA.csv", path)
+    first = load_goals(path)
+    parquet_path, meta_path = cache_paths(path)
+    assert parquet_path.exists() and meta_path.exists()
+    assert load_goals(path).equals(first)
+
+    lines = path.read_bytes().splitlines(keepends=True)
+    path.write_bytes(b"".join(lines[:-1]))
+    assert len(load_goals(path)) == len(first) - 1
@@ -0,0 +1,80 @@
+# Several World Cup editions, each answered by its own partition.
+import asyncio
+import json
+import time
+
+import pytest
+
+from harif.editions import EditionStore, get_editions, world_cup_year
+
+
+def knowledge_file(path, year, hosts, qa):
+    data = {"version": "1", "edition": {"year": year, "name": f"World Cup {year}", "hosts": hosts},
+            "qa": qa, "stats": {}, "follow_up_questions": {}, "responses": {}}
+    path.write_text(json.dumps(data), encoding="utf-8")
+    return path
+
+
+@pytest.fixture(scope="module")
+def store(tmp_path_factory):
+    folder = tmp_path_factory.mktemp("editions")
+    current = knowledge_file(folder / "wc2022.json", 2022, ["Qatar"], {"golden boot winner": "Kylian Mbappé"})
+    older = knowledge_file(folder / "wc2018.json", 2018, ["Russia"],
+                           {"golden boot winner": "Harry Kane", "official mascot": "Zabivaka"})
+    return EditionStore([current, older], default_path=current, cache_size=0)
+
+
+@pytest.mark.parametrize("question, expected", [
+    ("golden boot winner", "Kylian Mbappé"),
+    ("golden boot winner 2018", "Harry Kane"),
+    ("golden boot winner in Russia", "Harry Kane"),
+    ("golden boot winner 2022", "Kylian Mbappé"),
+    ("official mascot", "(World Cup 2018) Zabivaka"),
+    ("golden boot winner 2014", "(World Cup 2022) Kylian Mbappé"),
+    ("golden boot winner 2014 or 2018", "Harry Kane"),
+])
+def test_questions_are_routed_by_year_and_host(store, question, expected):
+    assert store.answer(question)[0] == expected
+
+
+def test_edition_is_named_by_year():
+    answer, _ = get_editions().answer("who was the champion 2018")
+    assert answer == "France"
+
+
+def test_an_edition_not_loaded_is_not_answered_silently():
+    editions = get_editions()
+    answer, _ = editions.answer("total goals 2014")
+    assert answer.startswith(f"({editions.default.name}) ")
+    assert asyncio.run(editions.answer_async("total goals 2014"))[0] == answer
+
+
+@pytest.mark.parametrize("question", ["who won the 2014 final", "xyzzy 2014"])
+def test_an_edition_not_loaded_is_named_when_nothing_answers(store, question):
+    assert store.answer(question) == ("Sorry, I don't know about the 2014 World Cup, only 2022 and 2018.", None)
+
+
+def test_other_editions_use_their_own_follow_ups():
+    editions = get_editions()
+    follow_ups_2022 = {q for qs in editions.default.engine.knowledge.follow_up_questions.values() for q in qs}
+    for question in ("who was the champion 2018", "host country 2018"):
+        answer, follow_up = editions.answer(question)
+        assert "2022" not in answer
+        assert follow_up not in follow_ups_2022
+
+
+def test_a_cold_partition_is_warmed_outside_the_budget(tmp_path, monkeypatch):
+    current = knowledge_file(tmp_path / "wc2022.json", 2022, ["Qatar"], {"golden boot winner": "Kylian Mbappé"})
+    older = knowledge_file(tmp_path / "wc2018.json", 2018, ["Russia"], {"official mascot": "Zabivaka"})
+    store = EditionStore([current, older], default_path=current, cache_size=0)
+    for edition in store.editions:
+        warm_up = edition.engine.warm_up
+        monkeypatch.setattr(edition.engine, "warm_up", lambda warm_up=warm_up: time.sleep(0.2) or warm_up())
+    assert asyncio.run(store.answer_async("official mascot", budget=0.1))[0] == "(World Cup 2018) Zabivaka"
+    assert all(edition.engine.warm for edition in store.editions)
+
+
+def test_world_cup_years():
+    assert [y for y in range(1926, 2031) if world_cup_year(y)] == [
+        1930, 1934, 1938, 1950, 1954, 1958, 1962, 1966, 1970, 1974, 1978, 1982, 1986, 1990, 1994, 1998,
+        2002, 2006, 2010, 2014, 2018, 2022, 2026, 2030]
@@ -0,0 +1,26 @@
+# The headless engine answers as the page's answer_QA did.
+import random
+
+import pytest
+
+from harif.engine import answer_QA
+
+QUESTIONS = ["hello", "who won the world cup", "golden boot", "total goals", "argentina coach",
+             "Enner Valencia Qatar", "what do you think about basketball", "مرحبا", "the", "xyzzy plugh"]
+
+
+def seeded(answer, question):
+    random.seed(question)
+    return answer(question)
+
+
+@pytest.mark.parametrize("question", QUESTIONS)
+def test_engine_matches_answer_qa(engine, question):
+    linear = lambda text: answer_QA(text, engine.qa_data, engine.stats_data, engine.df)
+    assert seeded(engine.answer, question) == seeded(linear, question)
+
+
+def test_indexes_are_built_once(engine):
+    qa_index, dataset_index = engine.qa_index, engine.dataset_index
+    engine.answer("golden boot")
+    assert engine.warm_up().qa_index is qa_index and engine.dataset_index is dataset_index
@@ -0,0 +1,27 @@
+# Misspelt keywords corrected to the closest word of the data.
+import pytest
+
+from harif.fuzzy import FuzzyIndex, edit_distance
+
+INDEX = FuzzyIndex(["golden", "boot", "argentina", "mbappé", "championship", "lusail"], known=["tired"])
+
+
+@pytest.mark.parametrize("word, expected", [
+    ("goldn", "golden"), ("argentna", "argentina"), ("champinship", "championship"), ("argentinna", "argentina"),
+    ("boat", None), ("xyzzyplugh", None),
+])
+def test_correct(word, expected):
+    assert INDEX.correct(word) == expected
+
+
+def test_known_words_and_numbers_are_kept():
+    assert INDEX.correct_keywords(["tired", "goldn", "2022", "boot?"]) == ["tired", "golden", "2022", "boot?"]
+
+
+def test_edit_distance_counts_a_swap_once():
+    assert edit_distance("lusial", "lusail", 2) == 1
+    assert edit_distance("abcdef", "uvwxyz", 2) == 3
+
+
+def test_engine_answers_a_typo_like_the_spelt_question(engine):
+    assert engine.answer("goldn boot")[0] == engine.answer("golden boot")[0]
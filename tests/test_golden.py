@@ -0,0 +1,55 @@
+# The golden corpus (benchmarks/golden_answers.jsonl) as test cases: every
+# question answered by the engine and by answer_QA with the plain linear
+# searches, follow-ups seeded per question, must give the recorded replies; and
+# no cascade stage may be slower than benchmarks/golden_timings.json allows.
+#
+# After an intended change: python benchmarks/golden.py --record
+import os
+import platform
+import random
+
+import pytest
+
+import golden
+from harif.engine import answer_QA
+
+GOLDEN = list(golden.read_golden().values())
+TOLERANCE = float(os.environ.get("HARIF_TIMING_TOLERANCE", 0.3))
+
+
+def seeded(answer, question):
+    random.seed(f"{golden.SEED}:{question}")
+    return golden.plain(list(answer(question)))
+
+
+def case_id(item):
+    return f"{item['kind']}:{item['question'][:40]}"
+
+
+def test_corpus_matches_the_data(engine):
+    # a new QA key, stats entry, team or player needs its golden answer recorded
+    assert [q for _, q in golden.corpus(engine)] == [item["question"] for item in GOLDEN]
+
+
+@pytest.mark.parametrize("item", GOLDEN, ids=case_id)
+def test_engine_answer(engine, item):
+    assert seeded(engine.answer, item["question"]) == item["engine"]
+
+
+@pytest.mark.parametrize("item", GOLDEN, ids=case_id)
+def test_answer_qa(engine, item):
+    linear = lambda text: answer_QA(text, engine.qa_data, engine.stats_data, engine.df)
+    assert seeded(linear, item["question"]) == item["answer_QA"]
+
+
+@pytest.mark.skipif(os.environ.get("HARIF_SKIP_TIMINGS", "") not in ("", "0"), reason="HARIF_SKIP_TIMINGS is set")
+def test_stage_timings(engine):
+    baseline = golden.read_timings()
+    recorded = baseline["version"]
+    if (recorded.get("machine"), recorded.get("python")) != (platform.machine(), platform.python_version()):
+        pytest.skip("timings were recorded on another machine: python benchmarks/golden.py --record-timings")
+    items = golden.corpus(engine)
+    linear = lambda text: answer_QA(text, engine.qa_data, engine.stats_data, engine.df)
+    timings = {"engine": golden.stage_timings(items, engine.answer, baseline["rounds"]),
+               "answer_QA": golden.stage_timings(items, linear, baseline["rounds"])}
+    assert golden.timing_regressions(timings, baseline["timings_ms"], TOLERANCE) == []
@@ -0,0 +1,34 @@
+# Chat history: the latest turns in memory, paged; older ones spilled to disk.
+import pytest
+
+from harif.history import ChatHistory
+
+
+def chat(history, turns):
+    for i in range(turns):
+        history.append({"role": "user", "content": f"question {i}"})
+        history.append({"role": "assistant", "content": f"answer {i}"})
+
+
+def test_pages_hold_the_latest_turns_first(tmp_path):
+    history = ChatHistory(window=3, keep=100, spill_dir=str(tmp_path))
+    chat(history, 7)
+    assert (history.turns, history.pages, len(history)) == (7, 3, 14)
+    assert [m["content"] for m in history.page(0)] == [f"{kind} {i}" for i in (4, 5, 6)
+                                                       for kind in ("question", "answer")]
+    assert [m["content"] for m in history.page(2)] == ["question 0", "answer 0"]
+
+
+def test_spilled_turns_read_back_in_order(tmp_path):
+    history = ChatHistory(window=2, keep=4, spill_dir=str(tmp_path))
+    chat(history, 25)
+    assert history.spilled > 0 and history.spill_path is not None
+    assert [m["content"] for m in history] == [f"{kind} {i}" for i in range(25) for kind in ("question", "answer")]
+    path = history.spill_path
+    history.close()
+    assert not (tmp_path / path).exists()
+
+
+def test_unknown_role_is_rejected():
+    with pytest.raises(ValueError):
+        ChatHistory().append({"role": "system", "content": "hi"})
@@ -0,0 +1,47 @@
+# The indexes give the same answers as the linear searches they replace.
+import pytest
+
+from harif.dataset import DatasetIndex
+from harif.dispatch import PhraseTable
+from harif.qa_index import QAIndex
+from harif.search import search_in_dataset, search_in_qa
+
+QA = {
+    "who won the world cup 2022": "Argentina",
+    "golden boot winner": "Kylian Mbappé",
+    "golden ball winner": "Lionel Messi",
+    "argentina coach": "Lionel Scaloni",
+    "host country": "Qatar",
+    "france goals": 16,
+    "most goals in a match": "Portugal 6-1 Switzerland",
+}
+KEYWORDS = [["golden", "boot"], ["golden"], ["argentina", "coach"], ["host"], ["goals", "france", "score"],
+            ["xyzzy"], ["messi", "nothing-like-this"], ["go"], []]
+ROW_KEYWORDS = [["enner", "qatar"], ["morocco"], ["gakpo", "senegal"], ["lusail"], ["90"], ["nobody", "here"]]
+
+
+@pytest.mark.parametrize("keywords", KEYWORDS)
+def test_qa_index_matches_linear_search(keywords):
+    assert QAIndex(QA).search(keywords) == search_in_qa(keywords, QA)
+
+
+@pytest.mark.parametrize("keywords", ROW_KEYWORDS)
+def test_dataset_index_matches_linear_search(goals, keywords):
+    assert DatasetIndex(goals).search(keywords) == search_in_dataset(keywords, goals)
+
+
+def test_dataset_index_append_finds_new_rows(goals):
+    index = DatasetIndex(goals.head(20))
+    row = {**goals.iloc[0].to_dict(), "Player": "Newcomer Striker"}
+    assert index.search(["newcomer"]) is None
+    index.append([row])
+    assert index.search(["newcomer"])["Player"] == "Newcomer Striker"
+    assert len(index) == 21
+
+
+def test_phrase_table_prefers_the_longest_phrase():
+    table = PhraseTable({"golden": ["g?"], "golden boot": ["boot?"]}, {"hello there": ["hi!"]})
+    assert table.lookup(["who", "won", "golden", "boot?"], "follow_ups") == ["boot?"]
+    assert table.lookup(["golden", "goal"], "follow_ups") == ["g?"]
+    assert table.lookup(["hello", "there"], "responses") == ["hi!"]
+    assert table.lookup(["hello"], "responses") is None
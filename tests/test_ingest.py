@@ -0,0 +1,51 @@
+# Goals appended while the app runs: the indexes and counts built from the
+# table take the new rows in without a rebuild, and give what a rebuild gives.
+from harif.aggregates import GoalAggregates
+from harif.ingest import GoalTailer
+
+
+def goal(engine, **changes):
+    return {**engine.df.iloc[0].to_dict(), **changes}
+
+
+def test_added_goals_match_a_rebuild(engine):
+    df = engine.df
+    half = len(df) // 2
+    incremental = GoalAggregates(df.iloc[:half])
+    incremental.add(df, half)
+    rebuilt = GoalAggregates(df)
+    for table in ("team_goals", "team_conceded", "player_goals", "player_team", "team_players", "team_opponents",
+                  "group_goals", "team_scorers"):
+        assert getattr(incremental, table) == getattr(rebuilt, table), table
+    assert incremental.answer("goals after the 85th minute") == rebuilt.answer("goals after the 85th minute")
+
+
+def test_add_goals_shows_up_in_answers(fresh_engine):
+    question = "how many goals did Ismaila Sarr score"
+    assert fresh_engine.answer(question)[0] == "Ismaila Sarr (Senegal) scored 2 goals in the goals table"
+    assert fresh_engine.add_goals([goal(fresh_engine, Player="Ismaila Sarr", Team="Senegal", Minute=88)]) == 1
+    assert fresh_engine.answer(question)[0] == "Ismaila Sarr (Senegal) scored 3 goals in the goals table"
+
+
+def test_add_goals_drops_only_the_cached_misses_it_answers(fresh_engine):
+    fresh_engine.answer("Zzyzx Wanderer")
+    fresh_engine.answer("golden boot")
+    assert len(fresh_engine.cache) == 2
+    fresh_engine.add_goals([goal(fresh_engine, Player="Zzyzx Wanderer")])
+    assert len(fresh_engine.cache) == 1
+    assert "Zzyzx Wanderer" in fresh_engine.answer("Zzyzx Wanderer")[0]
+
+
+def test_tailer_reads_complete_lines_only(engine, tmp_path):
+    path = tmp_path / "live_goals.csv"
+    header = ",".join(engine.df.columns)
+    row = ",".join(f'"{v}"' for v in goal(engine, Player="Late Scorer").values())
+    batches = []
+    tailer = GoalTailer(path, batches.append)
+    path.write_text(f"{header}\n{row}\n{row[:10]}", encoding="utf-8")
+    assert tailer.poll() == 1
+    assert batches[0]["Player"].tolist() == ["Late Scorer"]
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(row[10:] + "\n")
+    assert tailer.poll() == 1
+    assert tailer.rows_read == 2
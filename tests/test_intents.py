@@ -0,0 +1,40 @@
+# Small-talk intents: whole words only, first intent listed wins.
+import pytest
+
+from harif.intents import INTENT_MATCHER, IntentMatcher
+
+
+@pytest.mark.parametrize("text, intent", [
+    ("hello", "greeting"),
+    ("Hi, how are you?", "greeting"),
+    ("how are you", "how_are_you"),
+    ("what is your name", "name"),
+    ("thank you so much", "thanks"),
+    ("which team won", None),
+    ("i feel so sad", "sad"),
+])
+def test_classify(text, intent):
+    assert INTENT_MATCHER.classify(text) == intent
+
+
+def test_only_fast_path_intents_reply_before_the_search():
+    assert INTENT_MATCHER.reply("sad", fast_path_only=True) is None
+    assert INTENT_MATCHER.reply("sad").startswith("I'm sorry you're feeling sad")
+
+
+def test_regex_intents_reuse_the_users_words():
+    matcher = IntentMatcher([])
+    matcher.add("feel", [r"i feel \w+"], lambda m, text: f"Why do you say {m.group(0)}?", regex=True)
+    assert matcher.reply("Well, I feel tired") == "Why do you say I feel tired?"
+
+
+@pytest.mark.parametrize("text, replies", [
+    ("exit", True), ("Exit!", True), ("what is your mission", True), ("mission", True),
+    ("belgium group stage exit", False), ("fifa mission statement", False), ("bye, exit", True),
+])
+def test_whole_message_intents_skip_the_search_only_on_their_own(text, replies):
+    assert (INTENT_MATCHER.reply(text, fast_path_only=True) is not None) == replies
+
+
+def test_qa_question_containing_exit_gets_the_curated_answer(engine):
+    assert engine.answer("belgium group stage exit")[0] == engine.qa_data["belgium group stage exit"] == "Yes"
@@ -0,0 +1,67 @@
+# The knowledge base file: loaded read-only, reloaded when it changes.
+import json
+import os
+
+import pytest
+
+from harif import knowledge
+from harif.engine import HarifEngine
+from harif.search import search_in_stats
+
+
+def write(path, qa, **extra):
+    data = {"version": "1", "qa": qa, "stats": {"champion": "Argentina"},
+            "follow_up_questions": {"general": ["Anything else?"]}, "responses": {}, **extra}
+    path.write_text(json.dumps(data), encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def knowledge_file(tmp_path, monkeypatch):
+    path = write(tmp_path / "kb.json", {"golden boot winner": "Kylian Mbappé"})
+    monkeypatch.setattr(knowledge, "KNOWLEDGE_PATH", path)
+    monkeypatch.setattr(knowledge, "RELOAD_CHECK_SECONDS", 0)
+    monkeypatch.setattr(knowledge, "_loaded", {})
+    return path
+
+
+def test_loaded_tables_are_read_only(knowledge_file):
+    kb = knowledge.load_knowledge(knowledge_file)
+    with pytest.raises(TypeError):
+        kb.qa["golden boot winner"] = "someone else"
+
+
+def test_malformed_file_is_rejected(tmp_path):
+    path = tmp_path / "kb.json"
+    path.write_text(json.dumps({"qa": {}, "stats": []}), encoding="utf-8")
+    with pytest.raises(ValueError):
+        knowledge.load_knowledge(path)
+
+
+def test_edits_reach_the_engine(knowledge_file, goals):
+    engine = HarifEngine(df=goals)
+    first = engine.knowledge.version
+    assert engine.answer("golden boot winner")[0] == "Kylian Mbappé"
+    write(knowledge_file, {"golden boot winner": "Mbappé, 8 goals"})
+    bump = knowledge_file.stat().st_mtime_ns + 1_000_000
+    os.utime(knowledge_file, ns=(bump, bump))
+    assert engine.answer("golden boot winner")[0] == "Mbappé, 8 goals"
+    assert engine.knowledge.version != first
+
+
+def test_broken_edit_keeps_the_last_good_version(knowledge_file):
+    good = knowledge.get_knowledge()
+    knowledge_file.write_text("{not json", encoding="utf-8")
+    bump = knowledge_file.stat().st_mtime_ns + 1_000_000
+    os.utime(knowledge_file, ns=(bump, bump))
+    assert knowledge.get_knowledge() is good
+
+
+def test_frozen_lists_print_as_lists(engine):
+    # freezing must not change what an answer looks like
+    answer = engine.answer("croatia third place goals")[0]
+    assert str(answer) == "['Joško Gvardiol', 'Mislav Oršić']"
+    opening = {"opening match": engine.stats_data["opening match"]}
+    assert search_in_stats(["teams"], opening) == "Teams: ['Qatar', 'Ecuador']"
+    with pytest.raises(AttributeError):
+        answer.append("someone else")
@@ -0,0 +1,19 @@
+# One pass over a message gives what the separate helpers gave.
+import pytest
+
+from harif.intents import words
+from harif.preprocess import preprocess
+from harif.replies import is_english, is_external_topic
+from harif.search import extract_keywords
+
+MESSAGES = ["Who won the World Cup?", "morocco's goals vs u.s.", "hello there!", "مرحبا", "what about basketball",
+            "  golden   boot ", "is it?", "Mbappé scored 3 in the final", "¿quién ganó el mundial?", ""]
+
+
+@pytest.mark.parametrize("text", MESSAGES)
+def test_same_tokens_and_flags_as_the_helpers(text):
+    message = preprocess(text)
+    assert message.words == words(text)
+    assert message.keywords == extract_keywords(text)
+    assert message.english == is_english(text)
+    assert message.external == is_external_topic(extract_keywords(text))
@@ -0,0 +1,64 @@
+# BM25 ranking over the QA pairs, the stats and the goal rows.
+import numpy as np
+import pandas as pd
+import pytest
+
+from harif.ranking import RankingIndex, build_documents, fold, tokenize
+from harif.search import format_row
+
+QA = {"golden boot winner": "Kylian Mbappé", "golden ball winner": "Lionel Messi", "argentina coach": "Lionel Scaloni"}
+STATS = {"champion": "Argentina", "top scorers": {"kylian mbappé": 8, "lionel messi": 7}}
+
+
+@pytest.fixture(scope="module")
+def index():
+    return RankingIndex(build_documents(QA, STATS))
+
+
+def test_key_words_rank_first(index):
+    hits = index.search("who won the golden boot")
+    assert (hits[0].source, hits[0].key, hits[0].answer) == ("qa", "golden boot winner", "Kylian Mbappé")
+    assert [h.score for h in hits] == sorted((h.score for h in hits), reverse=True)
+
+
+def test_nested_stats_are_searchable_without_accents(index):
+    hit = index.search(["mbappe", "scorers"], k=1)[0]
+    assert (hit.source, hit.answer) == ("stats", "Kylian Mbappé: 8")
+
+
+def test_no_known_terms_no_hits(index):
+    assert index.search("what is the") == []
+    assert index.search("xyzzy") == []
+
+
+def test_k_limits_the_hits(index):
+    assert len(index.search("lionel", k=1)) == 1
+    assert len(index.search("lionel", k=50)) == 3
+
+
+def test_fold():
+    assert fold("Julián ÁLVAREZ") == "julian alvarez"
+
+
+def test_goal_rows_rank_by_player(engine):
+    index = RankingIndex(build_documents({}, {}, engine.df))
+    assert "Enner Valencia" in index.search("enner valencia qatar", k=1)[0].answer
+
+
+@pytest.mark.parametrize("query", ["enner valencia qatar", "argentina france final", "own goal", "penalty 90"])
+def test_only_candidates_are_scored(engine, query):
+    # same hits as adding every matched posting into one score per document
+    index = RankingIndex(build_documents(engine.knowledge.qa, engine.knowledge.stats, engine.df))
+    scores = np.zeros(len(index), dtype=np.float32)
+    for term in set(tokenize(query)) & index.postings.keys():
+        ids, weights = index.postings[term]
+        scores[ids] += weights
+    top = sorted(np.flatnonzero(scores), key=lambda i: (-scores[i], i))[:5]
+    hits = index.search(query)
+    assert [h.key for h in hits] == [index.keys[i] for i in top]
+    assert [h.score for h in hits] == pytest.approx([scores[i] for i in top])
+
+
+def test_goal_rows_show_as_in_the_cascade():
+    row = {"Player": "Enner Valencia", "Minute": 16}
+    assert next(build_documents({}, {}, pd.DataFrame([row])))[4] == format_row(row) == "Player: Enner Valencia\nMinute: 16"
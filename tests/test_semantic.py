@@ -0,0 +1,34 @@
+# Semantic retrieval with the TF-IDF encoder (no model download needed).
+from harif.ranking import build_documents
+from harif.semantic import HashingEncoder, SemanticIndex
+
+QA = {"champion": "Argentina", "golden boot winner": "Kylian Mbappé", "argentina coach": "Lionel Scaloni",
+      "final stadium": "Lusail Iconic Stadium"}
+
+
+def index(path=None, **kwargs):
+    return SemanticIndex(build_documents(QA, {}), encoder=HashingEncoder(), path=path, **kwargs)
+
+
+def test_synonyms_find_the_entry():
+    assert index().search("who lifted the trophy", k=1)[0].answer == "Argentina"
+    assert index().search("who was the manager of argentina", k=1)[0].answer == "Lionel Scaloni"
+
+
+def test_unrelated_question_has_no_hit():
+    assert index().search("xyzzy plugh") == []
+
+
+def test_stored_index_is_reused(tmp_path):
+    path = tmp_path / "kb.npy"
+    first = index(path)
+    mtime = path.stat().st_mtime_ns
+    again = index(path)
+    assert path.stat().st_mtime_ns == mtime
+    assert again.search("golden boot")[0].answer == first.search("golden boot")[0].answer == "Kylian Mbappé"
+
+
+def test_ivf_lists_give_the_exact_best_hit():
+    exact, ivf = index(), index(ann_min_rows=1, nprobe=10)
+    for question in ("golden boot", "who lifted the trophy", "final stadium"):
+        assert ivf.search(question, k=1) == exact.search(question, k=1)
@@ -0,0 +1,55 @@
+# The HTTP/JSON service, driven through its ASGI interface (no client package needed).
+import asyncio
+import json
+
+import pytest
+
+from harif.server import MAX_BATCH, app
+
+
+async def request(method, path, body=None):
+    messages = [{"type": "http.request", "body": b"" if body is None else body, "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method, "path": path,
+             "raw_path": path.encode(), "query_string": b"", "headers": [(b"content-type", b"application/json")],
+             "scheme": "http", "server": ("test", 80), "client": ("test", 1), "root_path": "", "app": app,
+             "state": {}}
+    await app(scope, receive, send)
+    status = next(m["status"] for m in sent if m["type"] == "http.response.start")
+    return status, json.loads(b"".join(m.get("body", b"") for m in sent if m["type"] == "http.response.body"))
+
+
+def call(*requests):
+    async def run():
+        async with app.router.lifespan_context(app):
+            return [await request(*r) for r in requests]
+    return asyncio.run(run())
+
+
+def test_answers_a_question_and_a_batch():
+    one, batch, health = call(
+        ("POST", "/answer", json.dumps({"question": "who was the champion 2018"}).encode()),
+        ("POST", "/answer", json.dumps({"questions": ["who was the champion 2018", "hello"]}).encode()),
+        ("GET", "/health"),
+    )
+    assert one == (200, {"answer": "France", "follow_up": one[1]["follow_up"]})
+    assert batch[0] == 200 and [a["answer"] for a in batch[1]["answers"]][0] == "France"
+    assert health[0] == 200 and health[1]["answered"] == 3
+
+
+@pytest.mark.parametrize("body, status", [
+    (b"not json", 400),
+    (json.dumps({"question": "  "}).encode(), 400),
+    (json.dumps({"question": "a", "questions": ["b"]}).encode(), 400),
+    (json.dumps({"questions": ["q"] * (MAX_BATCH + 1)}).encode(), 413),
+])
+def test_bad_requests_get_an_error(body, status):
+    [(code, reply)] = call(("POST", "/answer", body))
+    assert code == status and "error" in reply
@@ -0,0 +1,42 @@
+# Per-stage timings of the cascade, and the one-shot profiler.
+import json
+
+import pytest
+
+from harif.tracing import TRACER, Tracer
+
+
+@pytest.fixture
+def tracer():
+    TRACER.reset()
+    yield TRACER
+    TRACER.disable()
+    TRACER.reset()
+
+
+def test_answers_are_counted_by_the_stage_that_replied(engine, tracer, tmp_path):
+    log = tmp_path / "trace.jsonl"
+    tracer.enable(log_path=str(log))
+    engine.answer("hello")
+    engine.answer("golden boot winner")
+    tracer.disable()
+    snapshot = tracer.snapshot()
+    assert snapshot["answers"]["greeting"]["count"] == 1
+    assert snapshot["stages"]["greeting"]["count"] == 2
+    records = [json.loads(line) for line in log.read_text(encoding="utf-8").splitlines()]
+    assert [r["text"] for r in records] == ["hello", "golden boot winner"]
+    assert 'harif_answer_seconds_count{source="greeting"} 1' in tracer.prometheus()
+
+
+def test_disabled_tracer_records_nothing(engine, tracer):
+    engine.answer("golden boot winner")
+    assert tracer.snapshot() == {"stages": {}, "answers": {}}
+
+
+def test_profile_next_profiles_one_answer(engine, tracer):
+    tracer.profile_next()
+    engine.answer("golden boot winner")
+    assert "function calls" in tracer.last_profile
+    assert not tracer.active
+    with pytest.raises(ValueError):
+        Tracer().profile_next(tool="perf")